@@ -47,9 +47,11 @@ DROP TABLE IF EXISTS `messages`;
 CREATE TABLE `messages` (
   `message_id` int NOT NULL AUTO_INCREMENT,
   `username` varchar(255) DEFAULT NULL,
+  `channel` varchar(64) DEFAULT NULL,
   `content` text,
   `timestamp` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
-  PRIMARY KEY (`message_id`)
+  PRIMARY KEY (`message_id`),
+  KEY `idx_messages_channel_id` (`channel`,`message_id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=415 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -74,7 +76,9 @@ CREATE TABLE `user` (
   `username` varchar(255) DEFAULT NULL,
   `password` varchar(255) DEFAULT NULL,
   `date_inscription` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
-  PRIMARY KEY (`id`)
+  `username_lower` varchar(255) GENERATED ALWAYS AS (lower(`username`)) VIRTUAL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_user_username_lower` (`username_lower`)
 ) ENGINE=InnoDB AUTO_INCREMENT=6 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -84,7 +88,7 @@ CREATE TABLE `user` (
 
 LOCK TABLES `user` WRITE;
 /*!40000 ALTER TABLE `user` DISABLE KEYS */;
-INSERT INTO `user` VALUES (1,'admin','admin','2023-12-30 12:41:57'),(2,'e','$2b$12$egpwvJhCZl2rXEsINW/xEeB0QaQfZbC3Pr5l9.FY3ds2WQ.E5g4w6','2023-12-31 13:56:13'),(3,'mahe1','$2b$12$9Uwj2Dl5YV160s0tuChyUOZqBKkhEoYA.z69RxSWAiFx2TfH4n5hO','2023-12-31 14:09:19'),(4,'mahe2','$2b$12$HWUa65LTSrDuY2MfVSsEYuxNj9Lwvj7O1sTqTrvVbrvkLIH4oJHNa','2023-12-31 14:12:41'),(5,'mahe3','$2b$12$5yVRS0cdXEajoRIEnR6FfeHoad0a3M/HIRpW39TYTIsCf.Ps7Qxra','2023-12-31 14:14:22');
+INSERT INTO `user` (`id`, `username`, `password`, `date_inscription`) VALUES (1,'admin','admin','2023-12-30 12:41:57'),(2,'e','$2b$12$egpwvJhCZl2rXEsINW/xEeB0QaQfZbC3Pr5l9.FY3ds2WQ.E5g4w6','2023-12-31 13:56:13'),(3,'mahe1','$2b$12$9Uwj2Dl5YV160s0tuChyUOZqBKkhEoYA.z69RxSWAiFx2TfH4n5hO','2023-12-31 14:09:19'),(4,'mahe2','$2b$12$HWUa65LTSrDuY2MfVSsEYuxNj9Lwvj7O1sTqTrvVbrvkLIH4oJHNa','2023-12-31 14:12:41'),(5,'mahe3','$2b$12$5yVRS0cdXEajoRIEnR6FfeHoad0a3M/HIRpW39TYTIsCf.Ps7Qxra','2023-12-31 14:14:22');
 /*!40000 ALTER TABLE `user` ENABLE KEYS */;
 UNLOCK TABLES;
 
@@ -0,0 +1,42 @@
+# Durée de bcrypt selon le facteur de coût
+#
+# Mesure le hachage (inscription) et la vérification (connexion) d'un mot de passe
+# pour chaque facteur de coût, afin de choisir --bcrypt-rounds pour client_main.py.
+# Ce calcul est fait hors du thread de l'interface : il retarde la réponse, mais
+# ne fige plus la fenêtre.
+#
+#   python benchmarks/bcrypt_bench.py --min-rounds 10 --max-rounds 14 --repeat 5
+import time
+import argparse
+import statistics
+
+import bcrypt
+
+
+def measure(function, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durée de bcrypt selon le facteur de coût")
+    parser.add_argument("--min-rounds", type=int, default=10, help="Plus petit facteur de coût mesuré")
+    parser.add_argument("--max-rounds", type=int, default=14, help="Plus grand facteur de coût mesuré")
+    parser.add_argument("--repeat", type=int, default=5, help="Mesures par facteur de coût (médiane)")
+    args = parser.parse_args()
+
+    password = "Motdepasse1!".encode('utf-8')
+    print(f"{'coût':>4} {'hachage':>12} {'vérification':>14}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+        hash_time = measure(lambda: bcrypt.hashpw(password, bcrypt.gensalt(rounds)), args.repeat)
+        check_time = measure(lambda: bcrypt.checkpw(password, hashed), args.repeat)
+        print(f"{rounds:>4} {hash_time * 1e3:>9.1f} ms {check_time * 1e3:>11.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# Microbenchmark de la diffusion d'un message à tous les membres d'un canal
+#
+# Compare l'ancienne diffusion (message encodé et analysé pour chaque destinataire,
+# file vidée par concaténation) à la diffusion actuelle (trame encodée une seule
+# fois, même memoryview dans toutes les files, envoi vectorisé par send_buffers).
+#
+# Mesure aussi une rafale de reconnexions dans le canal, entrecoupée de diffusions :
+# l'ancien index recopiait le frozenset du canal à chaque abonnement (O(n) par
+# abonnement), ChannelIndex ne le reconstruit qu'à la diffusion suivante.
+#
+#   python benchmarks/broadcast_bench.py --recipients 2000 --broadcasts 200 --size 200
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.channel_index import ChannelIndex
+from classes.outbound_queue import OutboundQueue, send_buffers
+from classes.protocol import encode_frame, MSG_CHAT
+
+
+# Lit et jette tout ce qui arrive sur un socket, jusqu'à sa fermeture
+def drain(sock):
+    while sock.recv(1 << 20):
+        pass
+
+
+# Ancienne diffusion : encodage et analyse du message pour chaque destinataire
+def legacy_broadcast(message, queues):
+    copied = 0
+    for queue in queues:
+        message.split(':', 2)
+        data = message.encode('utf-8')
+        copied += len(data)
+        queue.put(data)
+    return copied
+
+
+# Diffusion actuelle : une trame encodée une fois, partagée par toutes les files
+def shared_broadcast(message, queues):
+    data = memoryview(encode_frame(MSG_CHAT, message))
+    for queue in queues:
+        queue.put(data)
+    return len(data)
+
+
+# Ancien écrivain : les messages en attente sont concaténés avant l'envoi
+def legacy_flush(sock, queue):
+    data = b"".join(queue.take())
+    sock.sendall(data)
+    return len(data)
+
+
+# Écrivain actuel : les tampons partagés sont envoyés sans copie
+def shared_flush(sock, queue):
+    buffers = queue.take()
+    send_buffers(sock, buffers)
+    # Sans sendmsg, send_buffers concatène les tampons avant l'envoi
+    if hasattr(sock, "sendmsg"):
+        return 0
+    return sum(len(buffer) for buffer in buffers)
+
+
+def run(name, broadcast, flush, args):
+    message = "Général:" + "x" * args.size
+    queues = [OutboundQueue(maxsize=args.broadcasts) for _ in range(args.recipients)]
+    sink, peer = socket.socketpair()
+    reader = threading.Thread(target=drain, args=(peer,), daemon=True)
+    reader.start()
+
+    copied = 0
+    started = time.perf_counter()
+    for _ in range(args.broadcasts):
+        copied += broadcast(message, queues)
+    fanout = time.perf_counter() - started
+    for queue in queues:
+        copied += flush(sink, queue)
+    total = time.perf_counter() - started
+
+    sink.close()
+    reader.join()
+    peer.close()
+    print(f"{name:<8} diffusion {fanout / args.broadcasts * 1e6:9.1f} µs   "
+          f"diffusion + envoi {total / args.broadcasts * 1e6:9.1f} µs   "
+          f"octets copiés par diffusion {copied // args.broadcasts:>10}")
+
+
+# Ancien index : frozenset du canal recopié à chaque abonnement
+class LegacyChannelIndex:
+    def __init__(self):
+        self.subscribers = frozenset()
+        self.lock = threading.Lock()
+
+    def subscribe(self, client, channel):
+        with self.lock:
+            self.subscribers = self.subscribers | {client}
+
+    def members(self, channel):
+        return self.subscribers
+
+
+# Rafale de reconnexions : tous les membres rejoignent le canal, avec une diffusion tous les `every` abonnements
+def run_reconnect_storm(name, index, args):
+    started = time.perf_counter()
+    for client in range(args.recipients):
+        index.subscribe(client, "Général")
+        if client % args.storm_broadcast_every == 0:
+            index.members("Général")
+    elapsed = time.perf_counter() - started
+    assert len(index.members("Général")) == args.recipients
+    print(f"{name:<8} rafale de {args.recipients} abonnements {elapsed * 1000:9.1f} ms   "
+          f"par abonnement {elapsed / args.recipients * 1e6:7.2f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark de la diffusion")
+    parser.add_argument("--recipients", type=int, default=2000, help="Nombre de membres du canal")
+    parser.add_argument("--broadcasts", type=int, default=200, help="Nombre de messages diffusés")
+    parser.add_argument("--size", type=int, default=200, help="Taille du message, en caractères")
+    parser.add_argument("--storm-broadcast-every", type=int, default=10,
+                        help="Abonnements entre deux diffusions pendant la rafale de reconnexions")
+    args = parser.parse_args()
+
+    print(f"{args.recipients} destinataires, {args.broadcasts} messages de {args.size} caractères")
+    run("ancienne", legacy_broadcast, legacy_flush, args)
+    run("actuelle", shared_broadcast, shared_flush, args)
+    run_reconnect_storm("ancienne", LegacyChannelIndex(), args)
+    run_reconnect_storm("actuelle", ChannelIndex(), args)
+
+
+if __name__ == '__main__':
+    main()
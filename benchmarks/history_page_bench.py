@@ -0,0 +1,85 @@
+# Microbenchmark de la pagination de l'historique d'un canal
+#
+# Compare la requête de page sur l'index (channel, message_id) à la même requête
+# sur un index (channel, timestamp), à différentes profondeurs. La table
+# est reproduite dans SQLite (module standard) : le nombre de lignes lues par
+# page et le plan de chaque requête montrent la forme du parcours, pas les
+# performances de MySQL.
+#
+# Plan attendu sous MySQL (EXPLAIN de la requête actuelle, page profonde) :
+#   type: range   key: idx_messages_channel_id   rows: ~limit   Extra: Using where; Backward index scan
+# Sur un index (channel, timestamp), rows croît avec la profondeur de la page.
+#
+#   python benchmarks/history_page_bench.py --messages 200000 --limit 50
+import time
+import sqlite3
+import argparse
+
+# Sur l'index (channel, timestamp), le curseur message_id n'est qu'un filtre
+TIMESTAMP_QUERY = ("SELECT message_id, username, content, timestamp FROM messages INDEXED BY idx_messages_channel_timestamp "
+                "WHERE channel = ? AND counted(message_id) AND message_id < ? "
+                "ORDER BY timestamp DESC, message_id DESC LIMIT ?")
+# Requête des pages d'historique du serveur (server.py)
+CURSOR_QUERY = ("SELECT message_id, username, content, timestamp FROM messages INDEXED BY idx_messages_channel_id "
+                "WHERE channel = ? AND counted(message_id) AND message_id < ? "
+                "ORDER BY message_id DESC LIMIT ?")
+
+
+# Crée la table messages et ses deux index, remplie de messages répartis sur plusieurs canaux
+def build_database(messages, channels):
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE messages (message_id INTEGER PRIMARY KEY, username TEXT, channel TEXT, "
+               "content TEXT, timestamp INTEGER)")
+    db.executemany(
+        "INSERT INTO messages VALUES (?, ?, ?, ?, ?)",
+        ((i, f"user{i % 100}", f"canal{i % channels}", f"message {i}", 1700000000 + i) for i in range(1, messages + 1)),
+    )
+    db.execute("CREATE INDEX idx_messages_channel_timestamp ON messages (channel, timestamp)")
+    db.execute("CREATE INDEX idx_messages_channel_id ON messages (channel, message_id)")
+    return db
+
+
+# Lit une page et retourne (durée, lignes lues)
+def read_page(db, counter, query, before_id, limit):
+    counter[0] = 0
+    started = time.perf_counter()
+    rows = db.execute(query, ("canal0", before_id, limit)).fetchall()
+    elapsed = time.perf_counter() - started
+    assert len(rows) == limit
+    return elapsed, counter[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark de la pagination de l'historique")
+    parser.add_argument("--messages", type=int, default=200000, help="Nombre de messages de la table")
+    parser.add_argument("--channels", type=int, default=4, help="Nombre de canaux")
+    parser.add_argument("--limit", type=int, default=50, help="Messages par page")
+    args = parser.parse_args()
+
+    db = build_database(args.messages, args.channels)
+    # Chaque ligne lue dans l'index est comptée, avant le filtre du curseur
+    counter = [0]
+
+    def counted(_):
+        counter[0] += 1
+        return 1
+
+    db.create_function("counted", 1, counted, deterministic=False)
+
+    for name, query in (("timestamp", TIMESTAMP_QUERY), ("curseur", CURSOR_QUERY)):
+        plan = db.execute("EXPLAIN QUERY PLAN " + query, ("canal0", 1, 1)).fetchall()
+        print(f"{name:<9} plan : {' / '.join(row[-1] for row in plan)}")
+
+    per_channel = args.messages // args.channels
+    print(f"{'profondeur':>10}  {'timestamp lignes':>16} {'timestamp ms':>12}  {'curseur lignes':>14} {'curseur ms':>10}")
+    for fraction in (0.0, 0.25, 0.5, 0.75, 0.95):
+        # Curseur situé après `fraction` du canal, en partant des messages les plus récents
+        before_id = args.messages - int(fraction * args.messages) + 1
+        timestamp_time, timestamp_rows = read_page(db, counter, TIMESTAMP_QUERY, before_id, args.limit)
+        cursor_time, cursor_rows = read_page(db, counter, CURSOR_QUERY, before_id, args.limit)
+        depth = int(fraction * per_channel)
+        print(f"{depth:>10}  {timestamp_rows:>16} {timestamp_time * 1000:>12.2f}  {cursor_rows:>14} {cursor_time * 1000:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
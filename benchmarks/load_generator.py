@@ -0,0 +1,171 @@
+# Générateur de charge : des milliers de sessions simulées dans un seul processus
+#
+# Chaque session est un AsyncChatClient (classes/chat_client.py), sans Qt ni thread :
+# une seule boucle asyncio ouvre les connexions au rythme demandé, envoie des
+# messages horodatés et mesure le délai de réception de chaque message chez les
+# autres membres du canal.
+#
+# Sans --password, les sessions n'envoient que leur nom : le serveur doit être
+# lancé avec --allow-unauthenticated. Avec --password, les comptes
+# <préfixe>0 à <préfixe>N-1 doivent exister avec ce mot de passe.
+#
+#   python server_main.py --headless --engine asyncio --allow-unauthenticated
+#   python benchmarks/load_generator.py --clients 2000 --duration 30 --rate 0.2
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.chat_client import AsyncChatClient, EVENT_LINE
+from classes.fd_limit import raise_fd_limit
+from classes.metrics import LatencyStats
+from classes.protocol import ProtocolError
+
+# Marqueur des messages du générateur, suivi de l'instant d'envoi
+PROBE = " lg "
+
+
+class LoadStats:
+    """
+    Compteurs partagés par toutes les sessions (une seule boucle : pas de verrou).
+    """
+    def __init__(self):
+        self.connected = 0
+        self.refused = 0
+        self.failed = 0
+        self.closed = 0
+        self.sent = 0
+        self.received = 0
+        self.connect_latency = LatencyStats(window=100000)
+        self.delivery_latency = LatencyStats(window=100000)
+
+
+# Compte les messages reçus par une session et mesure leur délai
+async def receive(client, stats):
+    async for events in client.events():
+        now = time.time()
+        for event in events:
+            if event[0] != EVENT_LINE:
+                continue
+            stats.received += 1
+            _, probe, sent_at = event[2].rpartition(PROBE)
+            if probe:
+                try:
+                    stats.delivery_latency.record(now - float(sent_at))
+                except ValueError:
+                    pass
+    stats.closed += 1
+
+
+# Une session simulée : connexion, envois au rythme demandé, puis déconnexion
+async def session(index, args, stats, deadline, connect_slots):
+    client = AsyncChatClient(f"{args.prefix}{index}", args.host, args.port, password=args.password)
+    async with connect_slots:
+        started = time.perf_counter()
+        try:
+            error = await client.open_session()
+        except (OSError, ProtocolError, asyncio.TimeoutError) as e:
+            stats.failed += 1
+            if stats.failed <= 5:
+                print(f"Connexion de {client.username} impossible: {e!r}")
+            return
+        if error is not None:
+            stats.refused += 1
+            if stats.refused <= 5:
+                print(f"Connexion de {client.username} refusée: {error}")
+            return
+        stats.connect_latency.record(time.perf_counter() - started)
+        stats.connected += 1
+
+    receiver = asyncio.ensure_future(receive(client, stats))
+    generator = random.Random(index)
+    try:
+        while args.rate > 0:
+            # Envois indépendants (processus de Poisson) : pas de rafales synchronisées
+            await asyncio.sleep(generator.expovariate(args.rate))
+            if time.time() >= deadline or receiver.done():
+                break
+            client.send_message(f"{args.channel}:{PROBE.strip()} {time.time():.6f}")
+            stats.sent += 1
+        await asyncio.sleep(max(0, deadline - time.time()))
+        # Laisse arriver les derniers messages avant de fermer
+        await asyncio.sleep(args.linger)
+    finally:
+        # La réception est arrêtée d'abord : la fermeture par la session n'est pas une coupure
+        receiver.cancel()
+        await client.close()
+
+
+# Affiche l'avancement une fois par seconde
+async def report(stats, deadline):
+    started = time.time()
+    last_sent = last_received = 0
+    while time.time() < deadline:
+        await asyncio.sleep(1.0)
+        print(f"{time.time() - started:5.0f} s  connectés {stats.connected:>6}  échecs {stats.failed + stats.refused:>5}  "
+              f"envoyés {stats.sent - last_sent:>7}/s  reçus {stats.received - last_received:>8}/s")
+        last_sent, last_received = stats.sent, stats.received
+
+
+async def run(args):
+    stats = LoadStats()
+    # Les sessions ouvertes après l'échéance ne servent à rien : la montée en charge est incluse
+    deadline = time.time() + args.clients / args.ramp + args.duration
+    connect_slots = asyncio.Semaphore(args.connect_concurrency)
+    reporter = asyncio.ensure_future(report(stats, deadline))
+    sessions = []
+    for index in range(args.clients):
+        sessions.append(asyncio.ensure_future(session(index, args, stats, deadline, connect_slots)))
+        await asyncio.sleep(1 / args.ramp)
+    await asyncio.gather(*sessions, return_exceptions=True)
+    reporter.cancel()
+    return stats
+
+
+def format_latency(name, latency):
+    snapshot = latency.snapshot()
+    print(f"{name:<12} {snapshot['count']:>9} mesures   moyenne {snapshot['mean_ms']:8.1f} ms   "
+          f"p50 {snapshot['p50_ms']:8.1f} ms   p95 {snapshot['p95_ms']:8.1f} ms   "
+          f"p99 {snapshot['p99_ms']:8.1f} ms   max {snapshot['max_ms']:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générateur de charge pour le serveur PyChat")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse du serveur")
+    parser.add_argument("--port", type=int, default=5566, help="Port du serveur")
+    parser.add_argument("--clients", type=int, default=1000, help="Nombre de sessions simulées")
+    parser.add_argument("--ramp", type=float, default=200, help="Sessions ouvertes par seconde")
+    parser.add_argument("--connect-concurrency", type=int, default=100,
+                        help="Nombre maximal de connexions en cours d'authentification")
+    parser.add_argument("--duration", type=float, default=30, help="Durée de la charge, après la montée, en secondes")
+    parser.add_argument("--rate", type=float, default=0.2, help="Messages envoyés par session et par seconde")
+    parser.add_argument("--channel", default="Général", help="Canal des messages envoyés")
+    parser.add_argument("--prefix", default="bot", help="Préfixe des noms d'utilisateur")
+    parser.add_argument("--password", help="Mot de passe commun aux comptes simulés")
+    parser.add_argument("--linger", type=float, default=2.0,
+                        help="Attente des derniers messages avant la déconnexion, en secondes")
+    args = parser.parse_args()
+    if args.clients < 1 or args.ramp <= 0 or args.connect_concurrency < 1:
+        sys.exit("--clients, --ramp et --connect-concurrency doivent être positifs.")
+
+    limit = raise_fd_limit()
+    if limit is not None and limit < args.clients + 100:
+        print(f"Attention : la limite de descripteurs ({limit}) est inférieure au nombre de sessions.")
+
+    print(f"{args.clients} sessions sur {args.host}:{args.port}, {args.ramp:g} par seconde, "
+          f"{args.rate:g} message(s) par session et par seconde pendant {args.duration:g} s")
+    stats = asyncio.run(run(args))
+
+    print(f"sessions ouvertes {stats.connected}   refusées {stats.refused}   en échec {stats.failed}   "
+          f"coupées par le serveur {stats.closed}")
+    print(f"messages envoyés {stats.sent}   reçus {stats.received}")
+    format_latency("connexion", stats.connect_latency)
+    format_latency("réception", stats.delivery_latency)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# Débit de la recherche de mots interdits dans les messages
+#
+# Compare une recherche naïve (un test "mot in message" par mot de la liste, sur le
+# message normalisé) à l'automate d'Aho-Corasick de classes/moderation.py, qui
+# parcourt chaque message une seule fois. Affiche le débit en Mo/s.
+#
+#   python benchmarks/moderation_bench.py --languages all --messages 20000 --size 200
+import os
+import sys
+import time
+import random
+import string
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.moderation import ProfanityFilter, available_languages, fold_word, load_word_lists
+
+
+# Génère des messages de mots aléatoires, dont une partie contient un mot interdit
+def make_messages(words, count, size, ratio):
+    generator = random.Random(42)
+    messages = []
+    for _ in range(count):
+        parts = []
+        while sum(len(part) + 1 for part in parts) < size:
+            parts.append("".join(generator.choices(string.ascii_lowercase, k=generator.randint(2, 9))))
+        if generator.random() < ratio:
+            parts[generator.randrange(len(parts))] = generator.choice(words)
+        messages.append(" ".join(parts))
+    return messages
+
+
+# Recherche naïve : un test d'inclusion par mot de la liste
+def naive_scan(words, messages):
+    matched = 0
+    for message in messages:
+        folded = fold_word(message)
+        if any(word in folded for word in words):
+            matched += 1
+    return matched
+
+
+# Recherche par l'automate : un seul passage par message
+def automaton_scan(profanity_filter, messages):
+    return sum(1 for message in messages if profanity_filter.find(message))
+
+
+def run(name, scan, messages):
+    volume = sum(len(message.encode('utf-8')) for message in messages)
+    started = time.perf_counter()
+    matched = scan(messages)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<9} {volume / elapsed / 1e6:8.2f} Mo/s   "
+          f"{elapsed / len(messages) * 1e6:9.1f} µs par message   messages signalés {matched}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de la recherche de mots interdits")
+    parser.add_argument("--languages", default="fr,en", help="Langues chargées, séparées par des virgules, ou \"all\"")
+    parser.add_argument("--messages", type=int, default=20000, help="Nombre de messages analysés")
+    parser.add_argument("--size", type=int, default=200, help="Taille d'un message, en caractères")
+    parser.add_argument("--ratio", type=float, default=0.05, help="Part des messages qui contiennent un mot interdit")
+    args = parser.parse_args()
+
+    languages = available_languages() if args.languages == "all" else args.languages.split(",")
+    words = load_word_lists(languages)
+    started = time.perf_counter()
+    profanity_filter = ProfanityFilter(words)
+    compiled = time.perf_counter() - started
+    folded_words = [word for word in set(fold_word(word) for word in words) if word]
+    messages = make_messages(words, args.messages, args.size, args.ratio)
+
+    print(f"{profanity_filter.patterns} mots ({', '.join(languages)}), automate compilé en {compiled * 1e3:.1f} ms, "
+          f"{args.messages} messages de {args.size} caractères")
+    # La recherche naïve reconnaît aussi les mots au milieu d'autres mots : elle signale davantage
+    run("naïve", lambda batch: naive_scan(folded_words, batch), messages)
+    run("automate", lambda batch: automaton_scan(profanity_filter, batch), messages)
+
+
+if __name__ == '__main__':
+    main()
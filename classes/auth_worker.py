@@ -0,0 +1,178 @@
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QLabel, QProgressBar, QPushButton
+
+
+# Levée dans une tâche annulée, à l'étape suivante
+class TaskCancelled(Exception):
+    pass
+
+
+class AuthSignals(QObject):
+    """
+    Signaux d'une tâche d'authentification, reçus dans le thread de l'interface.
+
+    Attributes:
+        progress (pyqtSignal): Émis au début de chaque étape, avec son libellé.
+        finished (pyqtSignal): Émis avec le résultat de la tâche.
+        failed (pyqtSignal): Émis avec le message d'erreur si la tâche échoue.
+    """
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class AuthTask(QRunnable):
+    """
+    Tâche exécutée par le pool de threads de Qt, hors du thread de l'interface.
+
+    La fonction reçoit la tâche en premier argument et appelle step() avant chaque
+    étape longue (requête, bcrypt). Une tâche annulée s'arrête à l'étape suivante ;
+    une étape en cours (bcrypt) ne peut pas être interrompue, mais son résultat
+    n'est pas transmis.
+
+    Attributes:
+        signals (AuthSignals): Les signaux de la tâche.
+    """
+    def __init__(self, function, *args):
+        """
+        Prépare la tâche.
+
+        Args:
+            function (callable): La fonction exécutée, appelée avec (tâche, *args).
+            *args: Les arguments de la fonction.
+        """
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = AuthSignals()
+        self.cancelled = threading.Event()
+
+    # Demande l'arrêt de la tâche
+    def cancel(self):
+        self.cancelled.set()
+
+    # Signale le début d'une étape, ou arrête une tâche annulée
+    def step(self, label):
+        if self.cancelled.is_set():
+            raise TaskCancelled()
+        self.signals.progress.emit(label)
+
+    def run(self):
+        try:
+            result = self.function(self, *self.args)
+        except TaskCancelled:
+            return
+        except Exception as e:
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(str(e))
+            return
+        if not self.cancelled.is_set():
+            self.signals.finished.emit(result)
+
+
+class AuthProgress(QObject):
+    """
+    Indicateur de progression d'une tâche d'authentification dans une fenêtre.
+
+    Affiche une barre d'activité, le libellé de l'étape en cours et un bouton
+    d'annulation ; les boutons de la fenêtre sont désactivés pendant la tâche.
+
+    Attributes:
+        task (AuthTask or None): La tâche en cours.
+    """
+    def __init__(self, dialog, buttons, top=40):
+        """
+        Ajoute l'indicateur à une fenêtre.
+
+        Args:
+            dialog (QDialog): La fenêtre.
+            buttons (list): Les boutons désactivés pendant une tâche.
+            top (int): Position verticale de l'indicateur.
+        """
+        super().__init__(dialog)
+        self.buttons = buttons
+        self.task = None
+        self.on_finished = None
+        self.on_failed = None
+        self.label = QLabel(dialog)
+        self.label.setGeometry(10, top, 300, 20)
+        self.bar = QProgressBar(dialog)
+        self.bar.setGeometry(10, top + 22, 300, 16)
+        # Barre d'activité : la durée de bcrypt n'est pas connue à l'avance
+        self.bar.setRange(0, 0)
+        self.cancel_button = QPushButton("Annuler", dialog)
+        self.cancel_button.setGeometry(320, top + 12, 100, 26)
+        self.cancel_button.clicked.connect(self.cancel)
+        self.hide()
+
+    # Lance une tâche dans le pool de threads
+    def start(self, task, on_finished, on_failed):
+        """
+        Lance une tâche et affiche sa progression.
+
+        Args:
+            task (AuthTask): La tâche.
+            on_finished (callable): Appelée avec le résultat de la tâche.
+            on_failed (callable): Appelée avec le message d'erreur.
+        """
+        self.task = task
+        self.on_finished = on_finished
+        self.on_failed = on_failed
+        # Slots d'un QObject du thread de l'interface : les signaux émis par le pool y sont remis
+        task.signals.progress.connect(self.show_progress)
+        task.signals.finished.connect(self.task_finished)
+        task.signals.failed.connect(self.task_failed)
+        for button in self.buttons:
+            button.setEnabled(False)
+        self.label.show()
+        self.bar.show()
+        self.cancel_button.show()
+        QThreadPool.globalInstance().start(task)
+
+    # Indique si un signal provient de la tâche en cours, et non d'une tâche annulée
+    def from_current_task(self):
+        return self.task is not None and self.sender() is self.task.signals
+
+    # Affiche l'étape en cours
+    @pyqtSlot(str)
+    def show_progress(self, label):
+        if self.from_current_task():
+            self.label.setText(label)
+
+    # Transmet le résultat de la tâche en cours
+    @pyqtSlot(object)
+    def task_finished(self, result):
+        if self.from_current_task():
+            callback = self.on_finished
+            self.hide()
+            callback(result)
+
+    # Transmet l'erreur de la tâche en cours
+    @pyqtSlot(str)
+    def task_failed(self, error):
+        if self.from_current_task():
+            callback = self.on_failed
+            self.hide()
+            callback(error)
+
+    # Annule la tâche en cours
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+        self.hide()
+        self.label.setText("Opération annulée.")
+        self.label.show()
+
+    # Masque l'indicateur et réactive les boutons
+    def hide(self):
+        self.task = None
+        self.label.hide()
+        self.bar.hide()
+        self.cancel_button.hide()
+        for button in self.buttons:
+            button.setEnabled(True)
+
+    # Indique si une tâche est en cours
+    def busy(self):
+        return self.task is not None
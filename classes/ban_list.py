@@ -0,0 +1,143 @@
+import threading
+import unicodedata
+
+
+# Intervalle de resynchronisation avec la table banned_users (en secondes)
+BAN_RESYNC_INTERVAL = 30.0
+
+
+# Normalise un nom d'utilisateur comme la collation utf8mb4_0900_ai_ci de MySQL
+def normalize_username(username):
+    """
+    Normalise un nom d'utilisateur pour les comparaisons.
+
+    La colonne banned_users.username utilise une collation insensible à la casse
+    et aux accents : "Éric" et "eric" désignent le même utilisateur.
+
+    Args:
+        username (str): Le nom d'utilisateur.
+
+    Returns:
+        str: Le nom sans accents et en minuscules.
+    """
+    decomposed = unicodedata.normalize("NFKD", username)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+class BanList:
+    """
+    Liste des utilisateurs bannis, gardée en mémoire.
+
+    La liste est chargée au démarrage, mise à jour par les bannissements faits sur
+    ce serveur et resynchronisée périodiquement avec la table banned_users pour
+    prendre en compte ceux faits ailleurs. La vérification d'un nom d'utilisateur
+    est une simple recherche dans un ensemble, sans accès à la base de données.
+
+    Attributes:
+        db_manager (DatabaseManager): Le gestionnaire de base de données utilisé.
+        resync_interval (float): Intervalle de resynchronisation, en secondes.
+    """
+    def __init__(self, db_manager, resync_interval=BAN_RESYNC_INTERVAL):
+        """
+        Initialise une liste vide.
+
+        Args:
+            db_manager (DatabaseManager): Le gestionnaire de base de données utilisé.
+            resync_interval (float): Intervalle de resynchronisation, en secondes.
+        """
+        self.db_manager = db_manager
+        self.resync_interval = resync_interval
+        self.banned = frozenset()
+        self.lock = threading.Lock()
+        # Modifications locales faites pendant un chargement, réappliquées à la fin
+        self.changes = None
+        self.stopped = threading.Event()
+        self.thread = None
+        self.resyncs = 0
+
+    # Vérifie si un utilisateur est banni
+    def __contains__(self, username):
+        return normalize_username(username) in self.banned
+
+    # Charge la liste depuis la base de données
+    def load(self):
+        """
+        Remplace la liste par le contenu de la table banned_users.
+
+        En cas d'erreur de la base de données, la liste actuelle est conservée.
+        """
+        with self.lock:
+            self.changes = {}
+        rows = self.db_manager.get_banned_users()
+        with self.lock:
+            changes, self.changes = self.changes, None
+            if rows is None:
+                return
+            banned = {normalize_username(username) for (username,) in rows}
+            # Un bannissement fait pendant la requête n'en fait peut-être pas partie
+            for name, is_banned in changes.items():
+                if is_banned:
+                    banned.add(name)
+                else:
+                    banned.discard(name)
+            self.banned = frozenset(banned)
+            self.resyncs += 1
+
+    # Ajoute ou retire un utilisateur de la liste
+    def _update(self, username, is_banned):
+        name = normalize_username(username)
+        with self.lock:
+            self.banned = self.banned | {name} if is_banned else self.banned - {name}
+            if self.changes is not None:
+                self.changes[name] = is_banned
+
+    # Ajoute un utilisateur à la liste
+    def add(self, username):
+        """
+        Ajoute un utilisateur à la liste des bannis.
+
+        Args:
+            username (str): Le nom d'utilisateur banni.
+        """
+        self._update(username, True)
+
+    # Retire un utilisateur de la liste
+    def remove(self, username):
+        """
+        Retire un utilisateur de la liste des bannis.
+
+        Args:
+            username (str): Le nom d'utilisateur débanni.
+        """
+        self._update(username, False)
+
+    # Démarre la resynchronisation périodique
+    def start(self):
+        """
+        Charge la liste puis démarre sa resynchronisation périodique.
+        """
+        self.load()
+        self.thread = threading.Thread(target=self.run, name="ban-list", daemon=True)
+        self.thread.start()
+
+    # Boucle de resynchronisation
+    def run(self):
+        while not self.stopped.wait(self.resync_interval):
+            self.load()
+
+    # Arrête la resynchronisation périodique
+    def stop(self):
+        """
+        Arrête la resynchronisation périodique.
+        """
+        self.stopped.set()
+
+    # Retourne les statistiques de la liste
+    def stats(self):
+        """
+        Retourne les statistiques de la liste.
+
+        Returns:
+            dict: Nombre d'utilisateurs bannis et de resynchronisations.
+        """
+        return {'banned': len(self.banned), 'resyncs': self.resyncs}
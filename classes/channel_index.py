@@ -0,0 +1,148 @@
+import threading
+
+from classes.protocol import CHANNELS
+
+
+# Détermine les canaux accessibles à un utilisateur à partir de user_channel_access
+def allowed_channels(rows, channels=CHANNELS):
+    """
+    Détermine les canaux accessibles à un utilisateur à partir de ses lignes de
+    la table user_channel_access.
+
+    Un utilisateur sans aucune ligne a accès à tous les canaux. Si des canaux lui
+    sont explicitement accordés (access_granted = 1), il n'a accès qu'à ceux-là ;
+    les canaux refusés (access_granted = 0 ou NULL) lui sont toujours retirés.
+
+    Args:
+        rows (list or None): Les lignes (channel_name, access_granted) de l'utilisateur.
+        channels (iterable): Les canaux proposés par le serveur.
+
+    Returns:
+        tuple: Les canaux accessibles, dans l'ordre de `channels`.
+    """
+    if not rows:
+        return tuple(channels)
+    granted = {channel for channel, access in rows if access}
+    denied = {channel for channel, access in rows if not access}
+    base = granted or set(channels)
+    return tuple(channel for channel in channels if channel in base and channel not in denied)
+
+
+class ChannelIndex:
+    """
+    Index des abonnés de chaque canal.
+
+    Les abonnés d'un canal sont conservés dans un set modifié sous verrou : un
+    abonnement ou un désabonnement coûte O(1), même dans un grand canal. La
+    diffusion lit un frozenset publié à partir de ce set, qu'elle parcourt sans
+    verrou ni copie pendant que des clients rejoignent ou quittent le canal.
+
+    Le frozenset n'est reconstruit (O(n)) qu'à la première lecture qui suit une
+    modification du canal : une rafale de reconnexions dans un canal de n abonnés
+    coûte une reconstruction par diffusion, et non une par abonnement.
+
+    Attributes:
+        subscribers (dict): Les abonnés de chaque canal (canal -> set de clients), modifiés sous verrou.
+        memberships (dict): Les canaux de chaque client (client -> set de canaux).
+    """
+    def __init__(self, channels=CHANNELS):
+        """
+        Initialise un index sans abonnés.
+
+        Args:
+            channels (iterable): Les canaux du serveur.
+        """
+        self.subscribers = {channel: set() for channel in channels}
+        # canal -> dernier frozenset publié pour la diffusion
+        self.snapshots = dict.fromkeys(self.subscribers, frozenset())
+        # Canaux modifiés depuis leur dernière publication
+        self.dirty = set()
+        self.memberships = {}
+        self.lock = threading.Lock()
+        self.rebuilds = 0
+
+    # Abonne un client à un canal
+    def subscribe(self, client, channel):
+        """
+        Abonne un client à un canal.
+
+        Args:
+            client: Le socket ou le flux d'écriture du client.
+            channel (str): Le canal.
+
+        Returns:
+            bool: False si le canal n'existe pas.
+        """
+        with self.lock:
+            if channel not in self.subscribers:
+                return False
+            self.subscribers[channel].add(client)
+            self.dirty.add(channel)
+            self.memberships.setdefault(client, set()).add(channel)
+            return True
+
+    # Désabonne un client d'un canal
+    def unsubscribe(self, client, channel):
+        """
+        Désabonne un client d'un canal.
+
+        Args:
+            client: Le socket ou le flux d'écriture du client.
+            channel (str): Le canal.
+        """
+        with self.lock:
+            if channel in self.subscribers:
+                self.subscribers[channel].discard(client)
+                self.dirty.add(channel)
+            self.memberships.get(client, set()).discard(channel)
+
+    # Retire un client de tous ses canaux
+    def remove(self, client):
+        """
+        Retire un client de tous ses canaux, lors de sa déconnexion.
+
+        Args:
+            client: Le socket ou le flux d'écriture du client.
+        """
+        with self.lock:
+            for channel in self.memberships.pop(client, ()):
+                self.subscribers[channel].discard(client)
+                self.dirty.add(channel)
+
+    # Retourne les abonnés d'un canal
+    def members(self, channel):
+        """
+        Retourne les abonnés d'un canal.
+
+        Sans modification depuis la dernière lecture, le frozenset publié est
+        retourné sans verrou ; sinon il est d'abord reconstruit.
+
+        Args:
+            channel (str): Le canal.
+
+        Returns:
+            frozenset: Les clients abonnés, vide si le canal n'existe pas.
+        """
+        if channel not in self.dirty:
+            return self.snapshots.get(channel, frozenset())
+        with self.lock:
+            if channel in self.dirty:
+                self.snapshots[channel] = frozenset(self.subscribers[channel])
+                self.dirty.discard(channel)
+                self.rebuilds += 1
+            return self.snapshots[channel]
+
+    # Vérifie si un client est abonné à un canal
+    def is_member(self, client, channel):
+        return channel in self.memberships.get(client, ())
+
+    # Retourne les statistiques de l'index
+    def stats(self):
+        """
+        Retourne le nombre d'abonnés de chaque canal.
+
+        Returns:
+            dict: Nombre d'abonnés par canal.
+        """
+        with self.lock:
+            return {channel: len(members) for channel, members in self.subscribers.items()}
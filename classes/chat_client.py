@@ -0,0 +1,633 @@
+import codecs
+import socket
+import asyncio
+import datetime
+from classes.protocol import (
+    FrameDecoder, ProtocolError, decode_auth_reply, decode_history_page, encode_frame, encode_hello, encode_message,
+    MSG_AUTH, MSG_CHAT, MSG_COMMAND, MSG_HELLO, MSG_HISTORY, MSG_NOTICE, PROTOCOL_FRAMED,
+)
+
+
+# Délai maximal pour obtenir la réponse d'authentification du serveur (en secondes)
+SESSION_TIMEOUT = 10.0
+# Taille lue en une fois sur le socket en mode encadré
+READ_SIZE = 65536
+# Taille lue en une fois en mode texte : chaque lecture y est traitée comme un message
+TEXT_READ_SIZE = 1024
+
+# Événements produits par la réception, dans l'ordre des messages du serveur
+EVENT_LINE = "line"        # (EVENT_LINE, canal ou None pour tous les canaux, message formaté)
+EVENT_PAGE = "page"        # (EVENT_PAGE, canal, curseur de la page précédente, messages)
+EVENT_CLOSED = "closed"    # (EVENT_CLOSED,) : fin de la connexion, après ses derniers messages
+
+
+# Découpe un message reçu du serveur en canal et ligne affichée
+def parse_message(message, current_time):
+    """
+    Découpe un message reçu du serveur en canal et ligne affichée.
+
+    Args:
+        message (str): Le message ("utilisateur:canal:message", "Server:message" ou "canal:message").
+        current_time (str): L'heure de réception, au format HH:MM.
+
+    Returns:
+        tuple or None: L'événement (EVENT_LINE, canal, ligne), ou None si le format est incorrect.
+    """
+    parts = message.split(':', 2)
+    if len(parts) == 3:
+        username, channel, msg = parts
+        return EVENT_LINE, channel, f"{current_time} - {username}: {msg}"
+    if len(parts) == 2:
+        # Messages du serveur, à tous les canaux ou à un seul
+        source_or_channel, msg = parts
+        channel = None if source_or_channel == "Server" else source_or_channel
+        return EVENT_LINE, channel, f"{current_time} - Server: {msg}"
+    print(f"Format de message incorrect: {message}")
+    return None
+
+
+# Découpe une ligne d'historique du mode texte en canal et ligne affichée
+def parse_history_line(line):
+    """
+    Découpe une ligne d'historique du mode texte ("history HH:MM - utilisateur: canal:message").
+
+    Args:
+        line (str): La ligne reçue.
+
+    Returns:
+        tuple or None: L'événement (EVENT_LINE, canal, ligne), ou None si le format est incorrect.
+    """
+    line = line[len("history"):].lstrip()
+    try:
+        if " - " in line and ":" in line:
+            time_user, rest = line.split(" - ", 1)
+            username, channel_msg = rest.split(": ", 1)
+            channel, msg = channel_msg.split(":", 1)
+            return EVENT_LINE, channel.strip(), f"{time_user} - {username}: {msg}"
+        print(f"Message non affiché :{line}")
+    except ValueError as e:
+        print(f"Erreur lors du traitement du message historique: {line}, Erreur: {e}")
+    return None
+
+
+class ClientSession:
+    """
+    État et décodage d'une session de discussion, sans entrées-sorties ni Qt.
+
+    La session produit les octets à envoyer et transforme les octets reçus en
+    événements (EVENT_LINE, EVENT_PAGE, EVENT_CLOSED) ; ChatClient (sockets
+    bloquants) et AsyncChatClient (asyncio) n'y ajoutent que la lecture et
+    l'écriture sur le réseau.
+
+    Attributes:
+        username (str): Le nom d'utilisateur, confirmé par le serveur à l'ouverture.
+        protocol (str): PROTOCOL_FRAMED ou PROTOCOL_TEXT.
+        password (str): Le mot de passe, oublié une fois la session ouverte.
+        session_token (str): Jeton délivré par le serveur, présenté à la place du mot
+            de passe pour reprendre la session.
+    """
+    def __init__(self, username, protocol=PROTOCOL_FRAMED, password=None):
+        """
+        Initialise la session.
+
+        Args:
+            username (str): Nom d'utilisateur pour la session de chat.
+            protocol (str): Mode de communication, PROTOCOL_FRAMED ou PROTOCOL_TEXT
+                pour les serveurs qui ne connaissent que le format texte.
+            password (str, optional): Mot de passe, vérifié par le serveur à l'ouverture de la session.
+        """
+        self.username = username
+        self.protocol = protocol
+        self.password = password
+        self.session_token = None
+        self.decoder = None
+        # Événements reçus avec la réponse d'authentification, remis à la première lecture
+        self.pending_events = []
+        self.text_buffer = ""
+        self.text_decoder = None
+
+    # Taille à lire en une fois sur la connexion
+    @property
+    def read_size(self):
+        return READ_SIZE if self.protocol == PROTOCOL_FRAMED else TEXT_READ_SIZE
+
+    # Prépare une nouvelle connexion et retourne sa première trame
+    def hello(self):
+        """
+        Réinitialise le décodage pour une nouvelle connexion et retourne sa première trame.
+
+        Returns:
+            bytes: Les données à envoyer dès la connexion établie.
+        """
+        self.decoder = FrameDecoder()
+        self.pending_events = []
+        self.text_buffer = ""
+        # Un caractère multi-octets peut être coupé entre deux lectures
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        if self.protocol != PROTOCOL_FRAMED:
+            # Le mode texte historique n'a pas d'authentification
+            return encode_message(self.protocol, MSG_CHAT, f"Username:{self.username}")
+        return encode_frame(MSG_HELLO, encode_hello(self.username, self.password, self.session_token))
+
+    # Indique si la connexion attend la réponse d'authentification
+    def awaits_auth(self):
+        return self.protocol == PROTOCOL_FRAMED
+
+    # Traite les octets reçus en attendant la réponse d'authentification
+    def accept_auth(self, data):
+        """
+        Traite les octets reçus en attendant la réponse d'authentification.
+
+        Args:
+            data (bytes): Les octets reçus.
+
+        Returns:
+            tuple: (False, None) si la réponse n'est pas complète, sinon (True, motif du
+            refus ou None si la session est ouverte).
+
+        Raises:
+            ConnectionError: Si le serveur a fermé la connexion.
+            ProtocolError: Si le serveur ne répond pas par une trame MSG_AUTH.
+        """
+        if not data:
+            raise ConnectionError("connexion fermée par le serveur")
+        frames = self.decoder.feed(data)
+        if not frames:
+            return False, None
+        msg_type, payload = frames[0]
+        if msg_type != MSG_AUTH:
+            raise ProtocolError(f"réponse d'authentification attendue, type {msg_type} reçu")
+        accepted, value, token = decode_auth_reply(payload.decode('utf-8'))
+        if not accepted:
+            return True, value
+        self.username = value
+        self.session_token = token
+        # Le mot de passe n'est plus nécessaire : les reconnexions présentent le jeton
+        self.password = None
+        self.pending_events = self.parse_frames(frames[1:])
+        return True, None
+
+    # Retire les événements reçus avec la réponse d'authentification
+    def take_pending(self):
+        events, self.pending_events = self.pending_events, []
+        return events
+
+    # Transforme les octets reçus en événements
+    def feed(self, data):
+        """
+        Transforme les octets reçus en événements.
+
+        Args:
+            data (bytes): Les octets reçus ; vide lorsque le serveur a fermé la connexion.
+
+        Returns:
+            list: Les événements, dans l'ordre de réception ; le dernier est
+            (EVENT_CLOSED,) si la connexion est fermée.
+
+        Raises:
+            ProtocolError: Si le serveur envoie une trame invalide.
+        """
+        if not data:
+            return [(EVENT_CLOSED,)]
+        if self.protocol == PROTOCOL_FRAMED:
+            return self.parse_frames(self.decoder.feed(data))
+        return self.parse_text(data)
+
+    # Décode les trames reçues en événements
+    def parse_frames(self, frames):
+        """
+        Décode les trames reçues du serveur en événements.
+
+        Args:
+            frames (list): Les trames (type, charge utile).
+
+        Returns:
+            list: Les événements, dans l'ordre des trames.
+        """
+        events = []
+        current_time = datetime.datetime.now().strftime("%H:%M")
+        for msg_type, payload in frames:
+            text = payload.decode('utf-8', errors='replace')
+            if msg_type == MSG_HISTORY:
+                events.append((EVENT_PAGE, *decode_history_page(text)))
+            elif msg_type in (MSG_CHAT, MSG_NOTICE):
+                event = parse_message(text, current_time)
+                if event is not None:
+                    events.append(event)
+            else:
+                print(f"Trame inattendue du serveur: type {msg_type}")
+        return events
+
+    # Décode une lecture du mode texte historique en événements
+    def parse_text(self, data):
+        """
+        Décode une lecture du mode texte, sans délimitation des messages.
+
+        Les lignes d'historique sont reconnues à leur préfixe ; le reste d'une
+        lecture est traité comme un seul message.
+
+        Args:
+            data (bytes): Les octets reçus.
+
+        Returns:
+            list: Les événements de cette lecture.
+        """
+        # Concaténer les données reçues avec le tampon
+        self.text_buffer += self.text_decoder.decode(data)
+        events = []
+
+        # Traiter les messages d'historique spécialement
+        while "history" in self.text_buffer:
+            line_end = self.text_buffer.find("\n") + 1
+            if line_end == 0:  # Pas de retour à la ligne trouvé
+                line_end = len(self.text_buffer)
+
+            line = self.text_buffer[:line_end].strip()
+            self.text_buffer = self.text_buffer[line_end:]
+
+            if line.startswith("history"):
+                event = parse_history_line(line)
+                if event is not None:
+                    events.append(event)
+
+        # Si le tampon ne commence pas par 'history', transmettre le message complet
+        if self.text_buffer and not self.text_buffer.startswith("history"):
+            event = parse_message(self.text_buffer, datetime.datetime.now().strftime("%H:%M"))
+            if event is not None:
+                events.append(event)
+            self.text_buffer = ""  # Vider le tampon
+        return events
+
+    # Encode un message de discussion
+    def encode_chat(self, message):
+        return encode_message(self.protocol, MSG_CHAT, message)
+
+    # Encode une commande
+    def encode_command(self, command):
+        """
+        Encode une commande (mode encadré uniquement).
+
+        Args:
+            command (str): La commande et ses arguments.
+
+        Returns:
+            bytes or None: La trame, ou None en mode texte, qui n'a pas de commandes.
+        """
+        if self.protocol != PROTOCOL_FRAMED:
+            print("Les commandes nécessitent le protocole encadré.")
+            return None
+        return encode_frame(MSG_COMMAND, command)
+
+
+class ChatClient(ClientSession):
+    """
+    Client de discussion à sockets bloquants, sans Qt.
+
+    Les appels bloquent le thread appelant : l'interface Qt (classes/client.py)
+    les fait dans un thread de réception ou le pool de threads. Un outil en ligne
+    de commande ou un robot peut les appeler directement :
+
+        client = ChatClient("alice", password="...")
+        error = client.open_session()
+        client.send_message("Général:bonjour")
+        client.run(print)
+
+    Attributes:
+        host (str): Adresse IP du serveur.
+        port (int): Port du serveur.
+        client_socket (socket): La connexion au serveur.
+    """
+    def __init__(self, username, host='127.0.0.1', port=5566, protocol=PROTOCOL_FRAMED, password=None):
+        """
+        Initialise le client.
+
+        Args:
+            username (str): Nom d'utilisateur pour la session de chat.
+            host (str): Adresse IP du serveur. Par défaut à '127.0.0.1'.
+            port (int): Port du serveur. Par défaut à 5566.
+            protocol (str): Mode de communication, PROTOCOL_FRAMED ou PROTOCOL_TEXT.
+            password (str, optional): Mot de passe, vérifié par le serveur à l'ouverture de la session.
+        """
+        super().__init__(username, protocol, password)
+        self.host = host
+        self.port = port
+        self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Vrai après close_connection() : la fin de la réception n'est pas une coupure
+        self.closed = False
+
+    # Se connecte au serveur et s'authentifie
+    def open_session(self):
+        """
+        Se connecte au serveur et s'authentifie, par mot de passe ou par jeton de session.
+
+        L'appel est bloquant jusqu'à la réponse du serveur (vérification bcrypt
+        comprise). Les messages reçus avec la réponse sont remis par la première
+        lecture.
+
+        Returns:
+            str or None: Le motif du refus du serveur, ou None si la session est ouverte.
+
+        Raises:
+            OSError: Si le serveur est injoignable ou ferme la connexion.
+            ProtocolError: Si le serveur ne répond pas par une trame MSG_AUTH.
+        """
+        self.closed = False
+        self.client_socket.settimeout(SESSION_TIMEOUT)
+        self.client_socket.connect((self.host, self.port))
+        self.client_socket.sendall(self.hello())
+        error = None
+        if self.awaits_auth():
+            done = False
+            while not done:
+                done, error = self.accept_auth(self.client_socket.recv(READ_SIZE))
+        self.client_socket.settimeout(None)
+        if error is not None:
+            self.client_socket.close()
+        return error
+
+    # Reprend la session après une coupure
+    def resume_session(self):
+        """
+        Rouvre une connexion et reprend la session avec le jeton délivré par le serveur,
+        sans nouvelle vérification du mot de passe.
+
+        Returns:
+            str or None: Le motif du refus du serveur, ou None si la session a repris.
+
+        Raises:
+            OSError: Si le serveur est injoignable.
+        """
+        self.client_socket.close()
+        self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        return self.open_session()
+
+    # Attend et retourne les prochains événements
+    def receive_events(self):
+        """
+        Attend des données du serveur et retourne les événements reçus.
+
+        Returns:
+            list or None: Les événements (éventuellement aucun si la lecture ne complète
+            pas de message), terminés par (EVENT_CLOSED,) si la connexion est perdue ;
+            None si elle a été fermée par close_connection().
+        """
+        pending = self.take_pending()
+        if pending:
+            return pending
+        try:
+            data = self.client_socket.recv(self.read_size)
+            if self.closed:
+                return None
+            return self.feed(data)
+        except ProtocolError as e:
+            print("Erreur de protocole:", e)
+            self.client_socket.close()
+        except OSError as e:
+            if self.closed:
+                return None
+            print("Erreur lors de la réception du message:", e)
+        return [(EVENT_CLOSED,)]
+
+    # Reçoit les événements jusqu'à la fin de la connexion
+    def run(self, on_events):
+        """
+        Reçoit les événements jusqu'à la fin de la connexion et les transmet par lots.
+
+        Args:
+            on_events (callable): Appelée avec chaque lot d'événements non vide ; le
+                dernier lot se termine par (EVENT_CLOSED,), sauf après close_connection().
+        """
+        while True:
+            events = self.receive_events()
+            if events is None:
+                return
+            if events:
+                on_events(events)
+                if events[-1][0] == EVENT_CLOSED:
+                    return
+
+    # Envoie un message au serveur
+    def send_message(self, message):
+        """
+        Envoie un message au serveur.
+
+        Args:
+            message (str): Le message à envoyer ("canal:message").
+        """
+        try:
+            self.client_socket.sendall(self.encode_chat(message))
+        except Exception as e:
+            print("Erreur lors de l'envoi du message:", e)
+
+    # Ancien nom de send_message(), conservé pour les appelants existants
+    send_messages = send_message
+
+    def send_command(self, command):
+        """
+        Envoie une commande au serveur (mode encadré uniquement).
+
+        Args:
+            command (str): La commande et ses arguments.
+        """
+        data = self.encode_command(command)
+        if data is None:
+            return
+        try:
+            self.client_socket.sendall(data)
+        except Exception as e:
+            print("Erreur lors de l'envoi de la commande:", e)
+
+    def request_history(self, channel, before_id):
+        """
+        Demande au serveur la page d'historique précédant un message.
+
+        Args:
+            channel (str): Le canal concerné.
+            before_id (int): Le curseur reçu avec la dernière page.
+        """
+        self.send_command(f"history {before_id} {channel}")
+
+    def join_channel(self, channel):
+        """
+        Abonne le client à un canal : le serveur lui enverra ses messages.
+
+        Args:
+            channel (str): Le canal à rejoindre.
+        """
+        self.send_command(f"join {channel}")
+
+    def leave_channel(self, channel):
+        """
+        Désabonne le client d'un canal : le serveur ne lui enverra plus ses messages.
+
+        Args:
+            channel (str): Le canal à quitter.
+        """
+        self.send_command(f"leave {channel}")
+
+    def close_connection(self):
+        """
+        Ferme la connexion avec le serveur.
+        """
+        self.closed = True
+        try:
+            # Réveille le thread de réception, bloqué dans recv()
+            self.client_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.client_socket.close()
+
+
+class AsyncChatClient(ClientSession):
+    """
+    Client de discussion asyncio, sans Qt ni thread.
+
+    Une session coûte deux flux asyncio et un décodeur : une seule boucle peut en
+    conduire des milliers (voir benchmarks/load_generator.py).
+
+        client = AsyncChatClient("bot", password="...")
+        error = await client.open_session()
+        client.send_message("Général:bonjour")
+        async for events in client.events():
+            ...
+
+    Les envois sont mis en mémoire tampon par le transport ; drain() attend qu'ils
+    soient transmis.
+
+    Attributes:
+        host (str): Adresse IP du serveur.
+        port (int): Port du serveur.
+    """
+    def __init__(self, username, host='127.0.0.1', port=5566, protocol=PROTOCOL_FRAMED, password=None):
+        """
+        Initialise le client.
+
+        Args:
+            username (str): Nom d'utilisateur pour la session de chat.
+            host (str): Adresse IP du serveur. Par défaut à '127.0.0.1'.
+            port (int): Port du serveur. Par défaut à 5566.
+            protocol (str): Mode de communication, PROTOCOL_FRAMED ou PROTOCOL_TEXT.
+            password (str, optional): Mot de passe, vérifié par le serveur à l'ouverture de la session.
+        """
+        super().__init__(username, protocol, password)
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    # Se connecte au serveur et s'authentifie
+    async def open_session(self):
+        """
+        Se connecte au serveur et s'authentifie, par mot de passe ou par jeton de session.
+
+        Returns:
+            str or None: Le motif du refus du serveur, ou None si la session est ouverte.
+
+        Raises:
+            OSError: Si le serveur est injoignable ou ferme la connexion.
+            ProtocolError: Si le serveur ne répond pas par une trame MSG_AUTH.
+            asyncio.TimeoutError: Si le serveur ne répond pas dans SESSION_TIMEOUT.
+        """
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), SESSION_TIMEOUT
+        )
+        self.writer.write(self.hello())
+        error = None
+        if self.awaits_auth():
+            done = False
+            while not done:
+                data = await asyncio.wait_for(self.reader.read(READ_SIZE), SESSION_TIMEOUT)
+                done, error = self.accept_auth(data)
+        if error is not None:
+            await self.close()
+        return error
+
+    # Reprend la session après une coupure
+    async def resume_session(self):
+        """
+        Rouvre une connexion et reprend la session avec le jeton délivré par le serveur.
+
+        Returns:
+            str or None: Le motif du refus du serveur, ou None si la session a repris.
+        """
+        await self.close()
+        return await self.open_session()
+
+    # Attend et retourne les prochains événements
+    async def receive_events(self):
+        """
+        Attend des données du serveur et retourne les événements reçus.
+
+        Returns:
+            list: Les événements (éventuellement aucun), terminés par (EVENT_CLOSED,)
+            si la connexion est fermée.
+        """
+        pending = self.take_pending()
+        if pending:
+            return pending
+        try:
+            return self.feed(await self.reader.read(self.read_size))
+        except ProtocolError as e:
+            print("Erreur de protocole:", e)
+            self.writer.close()
+        except OSError as e:
+            print("Erreur lors de la réception du message:", e)
+        return [(EVENT_CLOSED,)]
+
+    # Itère sur les lots d'événements jusqu'à la fin de la connexion
+    async def events(self):
+        """
+        Produit les lots d'événements non vides jusqu'à la fin de la connexion ; le
+        dernier se termine par (EVENT_CLOSED,).
+        """
+        while True:
+            events = await self.receive_events()
+            if events:
+                yield events
+                if events[-1][0] == EVENT_CLOSED:
+                    return
+
+    # Envoie un message au serveur
+    def send_message(self, message):
+        """
+        Envoie un message au serveur, sans attendre sa transmission.
+
+        Args:
+            message (str): Le message à envoyer ("canal:message").
+        """
+        self.writer.write(self.encode_chat(message))
+
+    # Envoie une commande au serveur
+    def send_command(self, command):
+        """
+        Envoie une commande au serveur (mode encadré uniquement), sans attendre sa transmission.
+
+        Args:
+            command (str): La commande et ses arguments.
+        """
+        data = self.encode_command(command)
+        if data is not None:
+            self.writer.write(data)
+
+    def request_history(self, channel, before_id):
+        self.send_command(f"history {before_id} {channel}")
+
+    def join_channel(self, channel):
+        self.send_command(f"join {channel}")
+
+    def leave_channel(self, channel):
+        self.send_command(f"leave {channel}")
+
+    # Attend la transmission des envois en mémoire tampon
+    async def drain(self):
+        await self.writer.drain()
+
+    # Ferme la connexion avec le serveur
+    async def close(self):
+        if self.writer is None:
+            return
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
@@ -1,28 +1,65 @@
-import socket
 import threading
-import datetime
-from PyQt5.QtWidgets import QMainWindow, QTextEdit, QLineEdit, QPushButton, QVBoxLayout, QWidget, QTabWidget, QMessageBox
-from PyQt5.QtCore import pyqtSlot, QObject, pyqtSignal, QEvent, Qt
+from collections import deque
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QMainWindow, QListView, QLineEdit, QPushButton, QVBoxLayout, QWidget, QTabWidget, QMessageBox,
+)
+from PyQt5.QtCore import pyqtSlot, QObject, pyqtSignal, QEvent, Qt, QThreadPool, QTimer
+from classes.auth_worker import AuthTask
+from classes.chat_client import ChatClient, EVENT_CLOSED, EVENT_PAGE
+from classes.message_list import MessageListModel, MAX_CHANNEL_MESSAGES, OLDER_HISTORY_MARKER
+from classes.protocol import CHANNELS, PROTOCOL_FRAMED
+
+
+# Intervalle de remise des messages reçus à l'interface (en millisecondes, une image à 60 Hz)
+FLUSH_INTERVAL_MS = 16
+# Nombre maximal d'événements remis à l'interface par intervalle
+MAX_BATCH_SIZE = 500
+
+
+# Reprend la session d'un client, dans le pool de threads
+def resume_session(task, client):
+    """
+    Reprend la session d'un client après une coupure. Exécutée hors du thread de l'interface.
+
+    Args:
+        task (AuthTask): La tâche, pour signaler les étapes.
+        client (Client): Le client dont la connexion a été perdue.
+
+    Returns:
+        str or None: Le motif du refus, ou None si la session a repris.
+    """
+    task.step("Reprise de la session...")
+    return client.resume_session()
+
 
 class Client(QObject):
     """
-    Gère la communication réseau côté client pour une application de chat.
+    Adaptateur Qt du client de discussion (classes/chat_client.py).
+
+    La connexion, l'authentification et le décodage sont faits par un ChatClient,
+    sans Qt. Le thread de réception dépose ses événements dans une file ; ils
+    sont remis à l'interface par lots, au plus un lot par intervalle de
+    FLUSH_INTERVAL_MS. Une rafale (historique de milliers de lignes) ne produit
+    donc qu'un événement Qt par image, et non un par message.
 
     Attributes:
-        message_received (pyqtSignal): Signal émis lors de la réception d'un message.
+        connection (ChatClient): La connexion au serveur.
+        messages_received (pyqtSignal): Signal émis dans le thread de l'interface avec
+            un lot d'événements (EVENT_LINE, EVENT_PAGE), dans l'ordre de réception.
         connection_failed (pyqtSignal): Signal émis lors d'une erreur de connexion.
         connection_success (pyqtSignal): Signal émis lors d'une connexion réussie.
-        formatted_message_received (pyqtSignal): Signal émis pour les messages formatés reçus.
-        connection_closed (pyqtSignal): Signal émis lors de la fermeture de la connexion.
+        connection_closed (pyqtSignal): Signal émis lors de la fermeture de la connexion,
+            après la remise des derniers messages.
     """
     # Définition des signaux pour la communication avec l'interface utilisateur
-    message_received = pyqtSignal(str)
+    messages_received = pyqtSignal(list)
     connection_failed = pyqtSignal(str)
     connection_success = pyqtSignal()
-    formatted_message_received = pyqtSignal(str)
     connection_closed = pyqtSignal()
+    # Émis par le thread de réception lorsque la file cesse d'être vide
+    inbox_ready = pyqtSignal()
 
-    def __init__(self, username, host='127.0.0.1', port=5566):
+    def __init__(self, username, host='127.0.0.1', port=5566, protocol=PROTOCOL_FRAMED, password=None):
         """
         Initialise le client avec un nom d'utilisateur, une adresse hôte et un port.
 
@@ -30,13 +67,27 @@ class Client(QObject):
             username (str): Nom d'utilisateur pour la session de chat.
             host (str): Adresse IP du serveur. Par défaut à '127.0.0.1'.
             port (int): Port du serveur. Par défaut à 5566.
+            protocol (str): Mode de communication, PROTOCOL_FRAMED ou PROTOCOL_TEXT
+                pour les serveurs qui ne connaissent que le format texte.
+            password (str, optional): Mot de passe, vérifié par le serveur à l'ouverture de la session.
         """
-        # Initialisation du client avec nom d'utilisateur, adresse hôte et port
         super().__init__()
-        self.username = username
-        self.host = host
-        self.port = port
-        self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.connection = ChatClient(username, host, port, protocol, password)
+        # Événements reçus, pas encore remis à l'interface
+        self.inbox = deque()
+        self.inbox_lock = threading.Lock()
+        self.flush_pending = False
+        self.inbox_ready.connect(self.schedule_flush)
+
+    # Nom d'utilisateur, confirmé par le serveur à l'ouverture de la session
+    @property
+    def username(self):
+        return self.connection.username
+
+    # Jeton de session délivré par le serveur, None avant l'ouverture ou en mode texte
+    @property
+    def session_token(self):
+        return self.connection.session_token
 
     def connect_to_server(self):
         """
@@ -44,75 +95,101 @@ class Client(QObject):
         """
         # Tente de se connecter au serveur et lance un thread pour recevoir des messages
         try:
-            self.client_socket.connect((self.host, self.port))
-            # Envoyer le nom d'utilisateur au serveur après la connexion
-            self.send_messages(f"Username:{self.username}")
-            # Demander l'historique des messages
-            threading.Thread(target=self.receive_messages, daemon=True).start()
-            self.connection_success.emit()
+            error = self.open_session()
         except Exception as e:
             self.connection_failed.emit(f"Erreur lors de la connexion au serveur: {e}")
-            
-    def receive_messages(self):
-        """
-        Reçoit les messages du serveur dans une boucle continue.
-        """
-        # Boucle pour recevoir des messages du serveur et les traiter
-        message_buffer = ""  # Tampon pour stocker les données partielles
-
-        while True:
-            try:
-                data = self.client_socket.recv(1024).decode('utf-8')
-
-                if not data:
-                    self.connection_closed.emit()  # Émettre le signal si aucune donnée n'est reçue (connexion fermée)
-                    break
-
-                # Concaténer les données reçues avec le tampon
-                message_buffer += data
-
-                # Traiter les messages d'historique spécialement
-                while "history" in message_buffer:
-                    line_end = message_buffer.find("\n") + 1
-                    if line_end == 0:  # Pas de retour à la ligne trouvé
-                        line_end = len(message_buffer)
-
-                    line = message_buffer[:line_end].strip()
-                    message_buffer = message_buffer[line_end:]
+            return
+        if error is not None:
+            self.connection_failed.emit(error)
+            return
+        # L'interface est prévenue avant le démarrage de la réception : les
+        # premières trames (historique) arrivent une fois ses signaux connectés
+        self.connection_success.emit()
+        self.start_receiving()
 
-                    if line.startswith("history"):
-                        self.formatted_message_received.emit(line)
+    # Se connecte au serveur et s'authentifie (appel bloquant, hors du thread de l'interface)
+    def open_session(self):
+        return self.connection.open_session()
 
-                # Si le tampon ne commence pas par 'history', émettre le message complet
-                if message_buffer and not message_buffer.startswith("history"):
-                    self.message_received.emit(message_buffer)
-                    message_buffer = ""  # Vider le tampon
+    # Reprend la session après une coupure (appel bloquant, hors du thread de l'interface)
+    def resume_session(self):
+        return self.connection.resume_session()
 
-            except Exception as e:
-                print("Erreur lors de la réception du message:", e)
-                break
-        
-        
-    def send_messages(self, message):
+    # Démarre la réception des messages
+    def start_receiving(self):
         """
-        Envoie un message au serveur.
+        Démarre le thread de réception des messages d'une session ouverte.
+        """
+        threading.Thread(target=self.connection.run, args=(self.post_events,), daemon=True).start()
 
-        Args:
-            message (str): Le message à envoyer.
+    # Dépose des événements dans la file de l'interface
+    def post_events(self, events):
         """
-         # Envoie un message au serveur
-        try:
-            self.client_socket.send(message.encode('utf-8'))
-        except Exception as e:
-            print("Erreur lors de l'envoi du message:", e)
+        Dépose des événements dans la file de l'interface, depuis le thread de réception.
+
+        Seul le premier dépôt dans une file vide réveille l'interface : les suivants
+        rejoignent le lot en attente.
 
+        Args:
+            events (list): Les événements.
+        """
+        if not events:
+            return
+        with self.inbox_lock:
+            self.inbox.extend(events)
+            if self.flush_pending:
+                return
+            self.flush_pending = True
+        self.inbox_ready.emit()
+
+    # Planifie la remise du prochain lot, dans le thread de l'interface
+    @pyqtSlot()
+    def schedule_flush(self):
+        # Attendre une image laisse les messages d'une rafale rejoindre le même lot
+        QTimer.singleShot(FLUSH_INTERVAL_MS, self.flush_inbox)
+
+    # Remet un lot d'événements à l'interface
+    def flush_inbox(self):
+        """
+        Remet à l'interface au plus MAX_BATCH_SIZE événements, puis planifie le lot
+        suivant si la file n'est pas vide.
+        """
+        with self.inbox_lock:
+            batch = [self.inbox.popleft() for _ in range(min(len(self.inbox), MAX_BATCH_SIZE))]
+            more = bool(self.inbox)
+            if not more:
+                self.flush_pending = False
+        # La fin de connexion est toujours le dernier événement de son thread de réception
+        closed = bool(batch) and batch[-1][0] == EVENT_CLOSED
+        if closed:
+            batch.pop()
+        if batch:
+            self.messages_received.emit(batch)
+        if closed:
+            self.connection_closed.emit()
+        if more:
+            QTimer.singleShot(FLUSH_INTERVAL_MS, self.flush_inbox)
+
+    # Envois : transmis tels quels à la connexion
+    def send_message(self, message):
+        self.connection.send_message(message)
+
+    send_messages = send_message
+
+    def send_command(self, command):
+        self.connection.send_command(command)
+
+    def request_history(self, channel, before_id):
+        self.connection.request_history(channel, before_id)
+
+    def join_channel(self, channel):
+        self.connection.join_channel(channel)
+
+    def leave_channel(self, channel):
+        self.connection.leave_channel(channel)
 
     def close_connection(self):
-        """
-        Ferme la connexion avec le serveur.
-        """
-        # Ferme la connexion avec le serveur
-        self.client_socket.close()
+        self.connection.close_connection()
 
 class ClientUI(QMainWindow):
     """
@@ -120,23 +197,35 @@ class ClientUI(QMainWindow):
 
     Attributes:
         client_logic (Client): Logique client pour la communication avec le serveur.
-        textAreas (dict): Dictionnaire des zones de texte pour chaque canal.
+        chatModels (dict): Les messages affichés, par canal.
+        chatViews (dict): La liste qui affiche les messages, par canal.
+        historyCursors (dict): Curseur de la page d'historique précédente, par canal
+            (0 lorsque tout l'historique est affiché ou que la liste est pleine).
     """
-    def __init__(self, username):
+    def __init__(self, username, client=None, max_messages=MAX_CHANNEL_MESSAGES):
         """
         Initialise l'interface utilisateur avec la logique client spécifiée.
 
         Args:
             username (str): Nom d'utilisateur pour la session de chat.
+            client (Client, optional): Client déjà connecté au serveur. S'il est absent,
+                l'interface ouvre sa propre connexion.
+            max_messages (int): Nombre maximal de messages gardés par canal.
         """
          # Initialisation de l'interface utilisateur avec la logique client
         super().__init__()
-        self.client_logic = Client(username)
-        self.textAreas = {}  # Dictionnaire pour les zones de texte
+        self.client_logic = client or Client(username)
+        self.max_messages = max_messages
+        self.chatModels = {}
+        self.chatViews = {}
+        self.historyCursors = {}
+        self.pendingHistory = set()  # Canaux dont une page d'historique est en cours de chargement
+        self.resumeTask = None  # Reprise de session en cours après une coupure
         self.initUI()
         self.connect_client_signals()
         self.installEventFilter(self)
-        self.client_logic.connect_to_server()
+        if client is None:
+            self.client_logic.connect_to_server()
         
 
     def initUI(self):
@@ -154,11 +243,8 @@ class ClientUI(QMainWindow):
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
 
-        self.createChannelTab("Général")
-        self.createChannelTab("Blabla")
-        self.createChannelTab("Comptabilité")
-        self.createChannelTab("Informatique")
-        self.createChannelTab("Marketing")
+        for channel_name in CHANNELS:
+            self.createChannelTab(channel_name)
         
     def createChannelTab(self, channel_name):
         """
@@ -171,17 +257,28 @@ class ClientUI(QMainWindow):
         tab = QWidget()
         tabLayout = QVBoxLayout()
 
-        textArea = QTextEdit()
-        textArea.setReadOnly(True)
-        tabLayout.addWidget(textArea)
-        self.textAreas[channel_name] = textArea
+        # Liste à modèle borné : seules les lignes visibles sont mises en page, par lots
+        model = MessageListModel(self.max_messages, self)
+        chatView = QListView()
+        chatView.setModel(model)
+        chatView.setWordWrap(True)
+        chatView.setLayoutMode(QListView.Batched)
+        chatView.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        chatView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        tabLayout.addWidget(chatView)
+        self.chatModels[channel_name] = model
+        self.chatViews[channel_name] = chatView
+        # Remonter en haut de la liste charge les messages plus anciens
+        chatView.verticalScrollBar().valueChanged.connect(
+            lambda value: self.onHistoryScroll(channel_name, value)
+        )
 
         inputField = QLineEdit()
         inputField.setPlaceholderText("Tapez votre message ici...")
         tabLayout.addWidget(inputField)
 
         sendButton = QPushButton("Envoyer")
-        sendButton.clicked.connect(lambda: self.sendMessage(channel_name, inputField.text(), textArea, inputField))
+        sendButton.clicked.connect(lambda: self.sendMessage(channel_name, inputField.text(), inputField))
         tabLayout.addWidget(sendButton)
 
         # Installer l'eventFilter directement sur le QLineEdit
@@ -206,72 +303,97 @@ class ClientUI(QMainWindow):
             if isinstance(obj, QLineEdit):
                 index = self.tabs.currentIndex()
                 channel_name = self.tabs.tabText(index)
-                self.sendMessage(channel_name, obj.text(), self.textAreas[channel_name], obj)
+                self.sendMessage(channel_name, obj.text(), obj)
                 return True
         return super(ClientUI, self).eventFilter(obj, event)
 
-    def sendMessage(self, channel_name, message, textArea, inputField):
+    def sendMessage(self, channel_name, message, inputField):
         """
         Envoie un message au serveur et met à jour l'interface utilisateur.
 
         Args:
             channel_name (str): Le canal de chat où envoyer le message.
             message (str): Le message à envoyer.
-            textArea (QTextEdit): La zone de texte du canal pour afficher le message.
             inputField (QLineEdit): Le champ de saisie pour le message.
         """
         # Envoie un message au serveur et met à jour l'interface utilisateur
         if message:
             formatted_message = f"{channel_name}:{message}"
-            self.client_logic.send_messages(formatted_message)
+            self.client_logic.send_message(formatted_message)
             # Efface le contenu du champ de saisie après l'envoi du message
             inputField.clear()
-            
 
-    @pyqtSlot(str)
-    def logMessage(self, message):
+    # Ajoute des messages à la fin d'un canal
+    def appendMessages(self, channel, lines):
         """
-        Traite et affiche un message reçu du serveur.
+        Ajoute des messages à la fin d'un canal et suit la conversation si l'utilisateur
+        est en bas de la liste.
+
+        Lorsque la liste est pleine, les messages les plus anciens sont retirés et
+        l'historique plus ancien n'est plus chargé dans cet onglet (truncateHistory()).
 
         Args:
-            message (str): Le message reçu à traiter.
+            channel (str): Le canal.
+            lines (list): Les messages formatés, du plus ancien au plus récent.
         """
-        # Log et affiche les messages reçus du serveur
-        try:
-            # Obtenez l'heure actuelle pour l'horodatage
-            current_time = datetime.datetime.now().strftime("%H:%M")
-
-            # Gère les messages avec les informations d'en-tête et le contenu du message
-            parts = message.split(':', 2)
-            if len(parts) == 3:
-                username, channel, msg = parts
-                formatted_message = f"{current_time} - {username}: {msg}"  # Ajoutez l'horodatage ici
-                if channel in self.textAreas:
-                    self.textAreas[channel].append(formatted_message)
-
-            elif len(parts) == 2:
-                # Gère les autres types de messages, comme les messages du serveur
-                source_or_channel, msg = parts
-                if source_or_channel == "Server":
-                    for textArea in self.textAreas.values():
-                        textArea.append(f"{current_time} - Server: {msg}")  # Ajoutez l'horodatage aussi pour les messages du serveur
-                elif source_or_channel in self.textAreas:
-                    self.textAreas[source_or_channel].append(f"{current_time} - Server: {msg}")
-                else:
-                    print(f"Source ou canal inconnu: {source_or_channel}")
+        chatView = self.chatViews[channel]
+        scrollBar = chatView.verticalScrollBar()
+        at_bottom = scrollBar.value() >= scrollBar.maximum()
+        if self.chatModels[channel].append_lines(lines):
+            # Les pages plus anciennes ne seraient plus contiguës aux messages gardés
+            self.truncateHistory(channel)
+        if at_bottom:
+            chatView.scrollToBottom()
+
+    # Affiche un lot de messages reçus du serveur
+    @pyqtSlot(list)
+    def showMessages(self, batch):
+        """
+        Affiche un lot d'événements reçus du serveur.
+
+        Les messages sont regroupés par canal : chaque canal ne reçoit qu'un ajout
+        par lot, quel que soit le nombre de messages. Les pages d'historique sont
+        affichées à leur place dans le flux, après les messages qui les précèdent.
+
+        Args:
+            batch (list): Les événements (EVENT_LINE, EVENT_PAGE), dans l'ordre de réception.
+        """
+        pending = {}
+        for event in batch:
+            if event[0] == EVENT_PAGE:
+                self.flushMessages(pending)
+                self.logHistoryPage(*event[1:])
+                continue
+            _, channel, line = event
+            if channel is None:
+                # Message du serveur, affiché dans tous les canaux
+                for name in self.chatModels:
+                    pending.setdefault(name, []).append(line)
+            elif channel in self.chatModels:
+                pending.setdefault(channel, []).append(line)
             else:
-                print(f"Format de message incorrect: {message}")
-        except ValueError:
-            print(f"Erreur lors du traitement du message: {message}")
+                print(f"Canal inconnu: {channel}")
+        self.flushMessages(pending)
+
+    # Ajoute les messages regroupés par canal
+    def flushMessages(self, pending):
+        """
+        Ajoute les messages regroupés par canal, puis vide le regroupement.
+
+        Args:
+            pending (dict): canal -> messages formatés, du plus ancien au plus récent.
+        """
+        for channel, lines in pending.items():
+            self.appendMessages(channel, lines)
+        pending.clear()
 
     def connect_client_signals(self):
         """
         Connecte les signaux du client aux slots appropriés pour la gestion des messages.
         """
         # Connecte les signaux du client aux slots appropriés
-        self.client_logic.message_received.connect(self.logMessage)
-        self.client_logic.formatted_message_received.connect(self.logHistoryMessage)
-        self.client_logic.connection_closed.connect(self.close_client)
+        self.client_logic.messages_received.connect(self.showMessages)
+        self.client_logic.connection_closed.connect(self.onConnectionClosed)
         
     def close_client(self):
         """
@@ -279,48 +401,69 @@ class ClientUI(QMainWindow):
         """
         self.close()  # Ferme la fenêtre principale   
         
-     # Traite et affiche les messages historiques reçus du serveur
-    @pyqtSlot(str)
-    def logHistoryMessage(self, message):
+    @pyqtSlot(str, int, list)
+    def logHistoryPage(self, channel, cursor, lines):
         """
-        Traite et affiche les messages historiques reçus du serveur.
+        Affiche une page d'historique d'un canal.
+
+        La première page reçue est ajoutée à la liste ; les pages suivantes,
+        demandées en remontant dans la conversation, sont insérées au début, dans
+        la limite de la taille de la liste. Une fois la liste pleine, plus aucune
+        page n'est demandée et une ligne signale l'historique non affiché.
+
+        Args:
+            channel (str): Le canal de la page.
+            cursor (int): Le curseur de la page précédente, 0 s'il n'y en a plus.
+            lines (list): Les messages formatés, du plus ancien au plus récent.
+        """
+        model = self.chatModels.get(channel)
+        if model is None:
+            print(f"Canal inconnu: {channel}")
+            return
+
+        chatView = self.chatViews[channel]
+        truncated = False
+        if channel not in self.historyCursors:
+            truncated = model.append_lines(lines) > 0
+            chatView.scrollToBottom()
+        elif lines:
+            # Insère la page au début sans déplacer la vue : la ligne affichée en haut y reste
+            inserted = model.prepend_lines(lines)
+            truncated = inserted < len(lines)
+            chatView.scrollTo(model.message_index(inserted), QAbstractItemView.PositionAtTop)
+
+        self.historyCursors[channel] = cursor
+        self.pendingHistory.discard(channel)
+        if truncated or (cursor and model.full()):
+            # Liste pleine : la page suivante ne pourrait pas être affichée
+            self.truncateHistory(channel)
+
+    # Cesse de charger l'historique plus ancien d'un canal et le signale
+    def truncateHistory(self, channel):
+        """
+        Cesse de charger l'historique plus ancien d'un canal, dont la liste est pleine,
+        et affiche une ligne qui le signale en haut de la liste.
 
         Args:
-            message (str): Les messages historiques reçus.
+            channel (str): Le canal.
         """
-        # Diviser le message en lignes individuelles
-        lines = message.split('\n')
-        
+        if channel in self.historyCursors:
+            self.historyCursors[channel] = 0
+        self.chatModels[channel].set_marker(OLDER_HISTORY_MARKER)
 
-        for line in lines:
-            # Supprimez le préfixe "history" de chaque ligne
-            if line.startswith("history"):
-                line = line[len("history"):].lstrip()
-
-            try:
-                # Vérifiez si la ligne contient les séparateurs attendus
-                if " - " in line and ":" in line:
-                    time_user, rest = line.split(" - ", 1)
-                    username, channel_msg = rest.split(": ", 1)
-                    channel, msg = channel_msg.split(":", 1)
-
-                    channel = channel.strip()
-
-                    # Formatez le message
-                    formatted_message = f"{time_user} - {username}: {msg}"
-
-                    # Vérifiez si le canal existe dans l'interface utilisateur
-                    if channel in self.textAreas:
-                        self.textAreas[channel].append(formatted_message)
-                    else:
-                        print(f"Canal inconnu: {channel}")
-                else:
-                    print(f"Message non affiché :{message}")
-                    continue  # Passez au message suivant en cas de format non reconnu
-                
-            except ValueError as e:
-                print(f"Erreur lors du traitement du message historique: {line}, Erreur: {e}")
-                continue  # Passez au message suivant en cas d'erreur
+    def onHistoryScroll(self, channel, value):
+        """
+        Demande la page d'historique précédente lorsque l'utilisateur atteint le haut d'un canal.
+
+        Args:
+            channel (str): Le canal affiché.
+            value (int): La position de la barre de défilement.
+        """
+        scrollBar = self.chatViews[channel].verticalScrollBar()
+        cursor = self.historyCursors.get(channel)
+        if value == scrollBar.minimum() and cursor and channel not in self.pendingHistory:
+            self.pendingHistory.add(channel)
+            self.client_logic.request_history(channel, cursor)
 
     # Configure le client avec la logique client existante
     def setupClient(self, client):
@@ -330,14 +473,64 @@ class ClientUI(QMainWindow):
         Args:
             client (Client): Le client à configurer.
         """
-        self.client_logic = client
-        self.client_logic.connection_closed.connect(self.onConnectionClosed)
+        if client is not self.client_logic:
+            self.client_logic = client
+            self.connect_client_signals()
 
     @pyqtSlot()
     def onConnectionClosed(self):
         """
-        Gère la fermeture de la connexion avec le serveur.
+        Gère la fermeture de la connexion avec le serveur : la session est reprise
+        avec son jeton, sans nouvelle saisie du mot de passe.
+        """
+        if self.client_logic.session_token is None or self.resumeTask is not None:
+            self.onSessionLost()
+            return
+        self.statusBar().showMessage("Connexion perdue, reprise de la session...")
+        self.resumeTask = AuthTask(resume_session, self.client_logic)
+        self.resumeTask.signals.finished.connect(self.onSessionResumed)
+        self.resumeTask.signals.failed.connect(self.onResumeFailed)
+        QThreadPool.globalInstance().start(self.resumeTask)
+
+    @pyqtSlot(object)
+    def onSessionResumed(self, error):
+        """
+        Reprend l'affichage une fois la session reprise, ou ferme la fenêtre si le serveur la refuse.
+
+        Args:
+            error (str or None): Le motif du refus du serveur.
+        """
+        self.resumeTask = None
+        if error is not None:
+            self.statusBar().clearMessage()
+            QMessageBox.warning(self, "Connexion perdue", error)
+            self.close()
+            return
+        # Le serveur renvoie la page la plus récente de chaque canal
+        for model in self.chatModels.values():
+            model.clear()
+        self.historyCursors.clear()
+        self.pendingHistory.clear()
+        self.statusBar().showMessage("Session reprise.", 3000)
+        self.client_logic.start_receiving()
+
+    @pyqtSlot(str)
+    def onResumeFailed(self, error_message):
+        """
+        Ferme la fenêtre si le serveur reste injoignable.
+
+        Args:
+            error_message (str): Le message d'erreur.
+        """
+        print(f"Erreur lors de la reprise de la session: {error_message}")
+        self.resumeTask = None
+        self.onSessionLost()
+
+    # Signale la perte définitive de la connexion
+    def onSessionLost(self):
+        """
+        Signale la perte de la connexion avec le serveur et ferme la fenêtre.
         """
-        # Gère la fermeture de la connexion avec le serveur
+        self.statusBar().clearMessage()
         QMessageBox.warning(self, "Connexion perdue", "La connexion avec le serveur a été perdue.")
         self.close()  # Ferme la fenêtre
\ No newline at end of file
@@ -0,0 +1,125 @@
+import threading
+
+from classes.ban_list import normalize_username
+
+
+class ClientRegistry:
+    """
+    Registre des clients connectés, partagé entre les threads du serveur.
+
+    Chaque client (socket ou flux d'écriture) est associé au dictionnaire de ses
+    informations, et chaque nom d'utilisateur à l'ensemble de ses sessions : un
+    même utilisateur peut être connecté plusieurs fois. Les modifications se font
+    sous verrou ; les parcours se font sur un instantané immuable, reconstruit au
+    plus une fois après chaque modification, qui ne bloque pas et reste valide
+    pendant les connexions et déconnexions simultanées.
+
+    Attributes:
+        sessions_by_name (dict): Les sessions de chaque utilisateur (nom normalisé -> set de clients).
+    """
+    def __init__(self):
+        """
+        Initialise un registre vide.
+        """
+        self.infos = {}
+        self.sessions_by_name = {}
+        self.lock = threading.Lock()
+        self._snapshot = ()
+
+    def __len__(self):
+        return len(self.infos)
+
+    def __contains__(self, client):
+        return client in self.infos
+
+    # Enregistre un client
+    def add(self, client, info):
+        """
+        Enregistre un client.
+
+        Args:
+            client: Le socket ou le flux d'écriture du client.
+            info (dict): Les informations du client, dont 'username'.
+        """
+        with self.lock:
+            self.infos[client] = info
+            self.sessions_by_name.setdefault(normalize_username(info['username']), set()).add(client)
+            self._snapshot = None
+
+    # Retire un client
+    def remove(self, client):
+        """
+        Retire un client du registre.
+
+        Args:
+            client: Le socket ou le flux d'écriture du client.
+
+        Returns:
+            dict or None: Les informations du client, ou None s'il n'était pas enregistré.
+        """
+        with self.lock:
+            info = self.infos.pop(client, None)
+            if info is None:
+                return None
+            name = normalize_username(info['username'])
+            sessions = self.sessions_by_name.get(name)
+            if sessions is not None:
+                sessions.discard(client)
+                if not sessions:
+                    del self.sessions_by_name[name]
+            self._snapshot = None
+            return info
+
+    # Retourne les informations d'un client
+    def get(self, client, default=None):
+        """
+        Retourne les informations d'un client.
+
+        Args:
+            client: Le socket ou le flux d'écriture du client.
+            default: La valeur retournée si le client n'est pas enregistré.
+
+        Returns:
+            dict: Les informations du client, ou `default`.
+        """
+        return self.infos.get(client, default)
+
+    # Retourne les sessions d'un utilisateur
+    def sessions(self, username):
+        """
+        Retourne les sessions d'un utilisateur, sans parcourir tous les clients.
+
+        Args:
+            username (str): Le nom d'utilisateur, sans distinction de casse ni d'accents.
+
+        Returns:
+            tuple: Les clients connectés sous ce nom.
+        """
+        with self.lock:
+            return tuple(self.sessions_by_name.get(normalize_username(username), ()))
+
+    # Retourne un instantané des clients connectés
+    def snapshot(self):
+        """
+        Retourne un instantané des clients connectés, à utiliser pour les parcours.
+
+        Returns:
+            tuple: Les couples (client, informations) au moment de l'appel.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self.lock:
+                if self._snapshot is None:
+                    self._snapshot = tuple(self.infos.items())
+                snapshot = self._snapshot
+        return snapshot
+
+    # Retire tous les clients
+    def clear(self):
+        """
+        Retire tous les clients du registre.
+        """
+        with self.lock:
+            self.infos.clear()
+            self.sessions_by_name.clear()
+            self._snapshot = ()
@@ -0,0 +1,315 @@
+import time
+import socket
+import threading
+from classes.hash_ring import HashRing
+from classes.shard_bus import BUS_READ_SIZE, EventDecoder, encode_event
+from classes.protocol import CHANNELS
+
+
+# Intervalle entre deux battements de cœur envoyés aux autres nœuds (en secondes)
+HEARTBEAT_INTERVAL = 1.0
+# Délai sans nouvelles au-delà duquel un nœud est considéré comme parti (en secondes)
+PEER_TIMEOUT = 5.0
+# Délai de connexion à un autre nœud (en secondes)
+CONNECT_TIMEOUT = 1.0
+# Nombre maximal de nœuds : chacun attribue les identifiants de message de son rang
+CLUSTER_SLOTS = 64
+
+
+# Découpe une adresse "hôte:port"
+def parse_address(address):
+    """
+    Découpe une adresse de nœud au format "hôte:port".
+
+    Args:
+        address (str): L'adresse.
+
+    Returns:
+        tuple: L'hôte et le port.
+    """
+    host, _, port = address.rpartition(':')
+    return host, int(port)
+
+
+class ClusterNode:
+    """
+    Nœud d'une grappe de serveurs indépendants.
+
+    Chaque canal appartient à un seul nœud, choisi par hachage cohérent de son nom :
+    les messages d'un canal sont transmis à ce nœud, qui leur attribue un identifiant,
+    les enregistre et les diffuse à tous les nœuds pour leurs propres clients. Les
+    nœuds se connectent en TCP à partir d'une liste d'adresses connues, s'échangent
+    la liste de leurs membres et des battements de cœur ; l'anneau est recalculé dès
+    qu'un nœud rejoint la grappe ou la quitte.
+
+    Le nœud s'utilise comme le bus du mode multi-processus (voir shard_bus.py) : il
+    est affecté à ServerBackend.bus et transmet les événements reçus à `on_event`.
+
+    Attributes:
+        address (str): L'adresse d'écoute de ce nœud, qui l'identifie dans la grappe.
+        on_event (callable): Appelée avec chaque événement reçu d'un autre nœud.
+        ring (HashRing): L'anneau des nœuds actifs, y compris celui-ci.
+        peers (dict): Les connexions ouvertes vers chaque nœud actif.
+    """
+    def __init__(self, address, seeds, on_event, channels=CHANNELS):
+        """
+        Initialise le nœud.
+
+        Args:
+            address (str): L'adresse d'écoute de ce nœud, au format "hôte:port".
+            seeds (iterable): Les adresses des autres nœuds connus au démarrage.
+            on_event (callable): Appelée avec chaque événement reçu d'un autre nœud.
+            channels (iterable): Les canaux dont la répartition est suivie.
+        """
+        self.address = address
+        self.on_event = on_event
+        self.channels = list(channels)
+        # Adresses auxquelles se connecter, apprises au démarrage ou des autres nœuds
+        self.known = set(seeds) - {address}
+        self.peers = {}
+        self.send_locks = {}
+        self.last_seen = {}
+        self.ring = HashRing([address])
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.sock = None
+        self.published = 0
+        self.forwarded = 0
+        self.received = 0
+        self.rebalances = 0
+
+    # Ouvre le port du nœud et rejoint la grappe
+    def start(self):
+        """
+        Ouvre le port d'écoute du nœud, puis se connecte aux nœuds connus.
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(parse_address(self.address))
+        self.sock.listen()
+        threading.Thread(target=self.accept_peers, name="cluster-accept", daemon=True).start()
+        threading.Thread(target=self.maintain, name="cluster-heartbeat", daemon=True).start()
+
+    # Accepte les connexions des autres nœuds
+    def accept_peers(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                break
+            if self.stopped.is_set():
+                conn.close()
+                break
+            self.open_connection(conn)
+
+    # Se connecte à un autre nœud
+    def connect(self, address):
+        try:
+            conn = socket.create_connection(parse_address(address), timeout=CONNECT_TIMEOUT)
+        except OSError:
+            return
+        conn.settimeout(None)
+        self.open_connection(conn)
+
+    # Se présente sur une nouvelle connexion et commence à la lire
+    def open_connection(self, conn):
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.send_locks[conn] = threading.Lock()
+        if not self.send(conn, {'event': 'hello', 'node': self.address, 'members': sorted(self.ring.nodes)}):
+            self.send_locks.pop(conn, None)
+            conn.close()
+            return
+        threading.Thread(target=self.read_peer, args=(conn,), name="cluster-peer", daemon=True).start()
+
+    # Reçoit les événements d'un autre nœud
+    def read_peer(self, conn):
+        decoder = EventDecoder()
+        node = None
+        while True:
+            try:
+                data = conn.recv(BUS_READ_SIZE)
+            except OSError:
+                break
+            if not data:
+                break
+            for event in decoder.feed(data):
+                kind = event.get('event')
+                if kind == 'hello':
+                    node = event['node']
+                    self.add_peer(node, conn, event['members'])
+                    continue
+                if node is None:
+                    continue
+                self.last_seen[node] = time.monotonic()
+                if kind == 'heartbeat':
+                    continue
+                self.received += 1
+                try:
+                    self.on_event(event)
+                except Exception as e:
+                    print(f"Erreur lors du traitement d'un événement de la grappe: {e}")
+        self.remove_peer(node, conn)
+
+    # Enregistre la connexion d'un nœud et l'ajoute à l'anneau
+    def add_peer(self, node, conn, members):
+        with self.lock:
+            # Deux nœuds qui se connectent l'un à l'autre en même temps ont deux connexions
+            self.peers.setdefault(node, []).append(conn)
+            self.last_seen[node] = time.monotonic()
+            self.known.update(member for member in members if member != self.address)
+            if node in self.ring.nodes:
+                return
+            before = self.owners()
+            self.ring.add(node)
+            self.rebalanced(before)
+        print(f"Le nœud {node} a rejoint la grappe.")
+
+    # Retire la connexion d'un nœud, et le nœud de l'anneau s'il n'en a plus
+    def remove_peer(self, node, conn):
+        self.send_locks.pop(conn, None)
+        conn.close()
+        if node is None:
+            return
+        with self.lock:
+            connections = self.peers.get(node, [])
+            if conn in connections:
+                connections.remove(conn)
+            if connections:
+                return
+            self.peers.pop(node, None)
+            self.last_seen.pop(node, None)
+            if node not in self.ring.nodes:
+                return
+            before = self.owners()
+            self.ring.remove(node)
+            self.rebalanced(before)
+        if not self.stopped.is_set():
+            print(f"Le nœud {node} a quitté la grappe.")
+
+    # Signale les canaux qui ont changé de nœud propriétaire
+    def rebalanced(self, before):
+        self.rebalances += 1
+        after = self.owners()
+        for channel in self.channels:
+            if before[channel] != after[channel]:
+                print(f"Canal {channel} : {before[channel]} -> {after[channel]}")
+
+    # Envoie les battements de cœur, rejoint les nœuds connus et écarte les nœuds muets
+    def maintain(self):
+        while not self.stopped.wait(HEARTBEAT_INTERVAL):
+            self.publish({'event': 'heartbeat'}, count=False)
+            with self.lock:
+                missing = self.known - set(self.peers)
+                silent = [
+                    conn
+                    for node, seen in self.last_seen.items()
+                    if time.monotonic() - seen > PEER_TIMEOUT
+                    for conn in self.peers.get(node, ())
+                ]
+            # La fermeture réveille le thread de lecture, qui retire le nœud de l'anneau
+            for conn in silent:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            for address in missing:
+                self.connect(address)
+
+    # Envoie un événement sur une connexion
+    def send(self, conn, event):
+        lock = self.send_locks.get(conn)
+        if lock is None:
+            return False
+        try:
+            with lock:
+                conn.sendall(encode_event(event))
+            return True
+        except OSError as e:
+            print(f"Erreur lors de l'envoi à un nœud de la grappe: {e}")
+            return False
+
+    # Publie un événement vers tous les autres nœuds
+    def publish(self, event, count=True):
+        """
+        Publie un événement vers tous les autres nœuds de la grappe.
+
+        Args:
+            event (dict): L'événement, sérialisable en JSON.
+            count (bool): Compter l'événement dans les statistiques.
+        """
+        with self.lock:
+            connections = [conns[0] for conns in self.peers.values() if conns]
+        for conn in connections:
+            if self.send(conn, event) and count:
+                self.published += 1
+
+    # Transmet un événement au nœud propriétaire d'un canal
+    def forward(self, node, event):
+        """
+        Transmet un événement à un seul nœud.
+
+        Args:
+            node (str): L'adresse du nœud destinataire.
+            event (dict): L'événement, sérialisable en JSON.
+
+        Returns:
+            bool: True si l'événement a été envoyé.
+        """
+        with self.lock:
+            connections = self.peers.get(node)
+            conn = connections[0] if connections else None
+        if conn is None or not self.send(conn, event):
+            return False
+        self.forwarded += 1
+        return True
+
+    # Retourne le nœud propriétaire d'un canal, s'il s'agit d'un autre nœud
+    def owner_of(self, channel):
+        """
+        Retourne le nœud propriétaire d'un canal.
+
+        Args:
+            channel (str): Le canal.
+
+        Returns:
+            str or None: L'adresse du nœud propriétaire, ou None si c'est ce nœud.
+        """
+        owner = self.ring.owner(channel)
+        return None if owner == self.address else owner
+
+    # Retourne le nœud propriétaire de chaque canal
+    def owners(self):
+        return {channel: self.ring.owner(channel) for channel in self.channels}
+
+    # Quitte la grappe
+    def close(self):
+        """
+        Ferme le port d'écoute et les connexions vers les autres nœuds.
+        """
+        self.stopped.set()
+        if self.sock is not None:
+            # shutdown() réveille le thread bloqué dans accept(), ce que close() seul ne fait pas
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+        with self.lock:
+            connections = [conn for conns in self.peers.values() for conn in conns]
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    # Retourne les statistiques du nœud
+    def stats(self):
+        return {
+            'node': self.address,
+            'members': sorted(self.ring.nodes),
+            'owners': self.owners(),
+            'published': self.published,
+            'forwarded': self.forwarded,
+            'received': self.received,
+            'rebalances': self.rebalances,
+        }
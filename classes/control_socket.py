@@ -0,0 +1,171 @@
+import os
+import socket
+import tempfile
+import threading
+from classes.shard_bus import EventDecoder, encode_event
+
+
+# Commandes d'administration acceptées sur le socket de contrôle ; les trois premières ont un argument
+CONTROL_COMMANDS = ("kick", "ban", "deban", "kill", "stats")
+# Délai maximal d'une commande, côté outil de contrôle (en secondes)
+CONTROL_TIMEOUT = 10.0
+# Taille lue en une fois sur une connexion de contrôle
+CONTROL_READ_SIZE = 4096
+
+
+# Retourne le chemin par défaut du socket de contrôle d'un serveur
+def default_control_path(port):
+    """
+    Retourne le chemin par défaut du socket de contrôle du serveur qui écoute sur un port.
+
+    Args:
+        port (int): Le port d'écoute du serveur.
+
+    Returns:
+        str: Le chemin du socket.
+    """
+    return os.path.join(tempfile.gettempdir(), f"pychat-control-{port}.sock")
+
+
+class ControlServer:
+    """
+    Socket Unix local qui reçoit les commandes d'administration d'un serveur sans interface.
+
+    Il remplace les commandes /kick, /ban, /deban, /kill et /stats de la fenêtre
+    du serveur. Chaque connexion envoie une requête JSON sur une ligne
+    ({"command": ..., "args": ...}) et reçoit une réponse JSON sur une ligne
+    ({"ok": ..., "result": ...} ou {"ok": false, "error": ...}). Le socket n'est
+    accessible qu'à l'utilisateur qui a lancé le serveur.
+
+    Attributes:
+        path (str): Le chemin du socket Unix.
+        backend (ServerBackend): Le serveur administré.
+    """
+    def __init__(self, path, backend):
+        """
+        Initialise le socket de contrôle.
+
+        Args:
+            path (str): Le chemin du socket Unix.
+            backend (ServerBackend): Le serveur administré.
+        """
+        self.path = path
+        self.backend = backend
+        self.sock = None
+
+    # Ouvre le socket et accepte les commandes
+    def start(self):
+        """
+        Ouvre le socket Unix et commence à accepter les commandes.
+        """
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Créé directement avec les droits 0600 : les autres utilisateurs ne peuvent pas s'y connecter
+        previous_umask = os.umask(0o177)
+        try:
+            self.sock.bind(self.path)
+        finally:
+            os.umask(previous_umask)
+        self.sock.listen()
+        threading.Thread(target=self.accept_commands, name="control-accept", daemon=True).start()
+
+    # Accepte les connexions de contrôle
+    def accept_commands(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self.serve, args=(conn,), name="control", daemon=True).start()
+
+    # Traite la requête d'une connexion de contrôle
+    def serve(self, conn):
+        """
+        Lit une requête, l'exécute et envoie la réponse.
+
+        Args:
+            conn (socket): La connexion de l'outil de contrôle.
+        """
+        decoder = EventDecoder()
+        requests = []
+        try:
+            conn.settimeout(CONTROL_TIMEOUT)
+            while not requests:
+                data = conn.recv(CONTROL_READ_SIZE)
+                if not data:
+                    return
+                requests = decoder.feed(data)
+            request = requests[0]
+            reply = self.execute(request.get('command'), request.get('args'))
+            conn.sendall(encode_event(reply))
+            # L'arrêt ferme le socket de contrôle : il n'a lieu qu'après l'envoi de la réponse
+            if request.get('command') == "kill" and reply['ok']:
+                threading.Thread(target=self.backend.kill_server, name="control-kill", daemon=True).start()
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Erreur sur le socket de contrôle: {e}")
+        finally:
+            conn.close()
+
+    # Exécute une commande d'administration
+    def execute(self, command, args):
+        """
+        Exécute une commande d'administration, sauf l'arrêt, laissé à l'appelant.
+
+        Args:
+            command (str): La commande (CONTROL_COMMANDS).
+            args (str): L'argument de la commande, pour kick, ban et deban.
+
+        Returns:
+            dict: La réponse envoyée à l'outil de contrôle.
+        """
+        if command not in CONTROL_COMMANDS:
+            return {'ok': False, 'error': f"Commande inconnue: {command}"}
+        if command == "stats":
+            return {'ok': True, 'result': self.backend.get_stats()}
+        if command == "kill":
+            print("Arrêt demandé par le socket de contrôle.")
+            return {'ok': True, 'result': None}
+        if not args:
+            return {'ok': False, 'error': f"La commande '{command}' nécessite un argument."}
+        print(f"Commande reçue par le socket de contrôle: {command} {args}")
+        self.backend.handle_command(command, args)
+        return {'ok': True, 'result': None}
+
+    # Ferme le socket de contrôle
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+# Envoie une commande d'administration à un serveur sans interface
+def send_control_command(path, command, args=None, timeout=CONTROL_TIMEOUT):
+    """
+    Envoie une commande d'administration sur le socket de contrôle d'un serveur.
+
+    Args:
+        path (str): Le chemin du socket de contrôle.
+        command (str): La commande (CONTROL_COMMANDS).
+        args (str, optional): L'argument de la commande.
+        timeout (float): Délai maximal d'attente de la réponse, en secondes.
+
+    Returns:
+        dict: La réponse du serveur ({"ok": ..., "result": ...} ou {"ok": false, "error": ...}).
+
+    Raises:
+        OSError: Si le serveur est injoignable ou ne répond pas.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(encode_event({'command': command, 'args': args}))
+        decoder = EventDecoder()
+        while True:
+            data = sock.recv(CONTROL_READ_SIZE)
+            if not data:
+                raise ConnectionError("Le serveur a fermé la connexion sans répondre.")
+            replies = decoder.feed(data)
+            if replies:
+                return replies[0]
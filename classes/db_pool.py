@@ -0,0 +1,251 @@
+import threading
+import time
+from contextlib import contextmanager
+import mysql.connector
+from mysql.connector import errors
+from classes.metrics import LatencyStats
+
+
+# Nombre maximal de connexions ouvertes par pool
+POOL_SIZE = 10
+# Délai maximal d'attente d'une connexion libre (en secondes)
+POOL_TIMEOUT = 10.0
+# Une connexion inutilisée depuis plus longtemps est vérifiée avant d'être réutilisée (en secondes)
+HEALTH_CHECK_INTERVAL = 30.0
+
+# Pools partagés par tous les DatabaseManager du processus, indexés par configuration
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# Retourne le pool partagé correspondant à une configuration de base de données
+def get_pool(db_config, size=POOL_SIZE):
+    """
+    Retourne le pool partagé correspondant à une configuration de base de données.
+
+    Tous les appels avec la même configuration, dans tout le processus,
+    obtiennent le même pool.
+
+    Args:
+        db_config (dict): Configuration de la connexion MySQL.
+        size (int): Nombre maximal de connexions, utilisé à la création du pool.
+
+    Returns:
+        ConnectionPool: Le pool de connexions.
+    """
+    key = tuple(sorted(db_config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_config, size)
+        return pool
+
+
+class ConnectionPool:
+    """
+    Pool de connexions MySQL borné et partagé entre threads.
+
+    Les connexions sont créées à la demande jusqu'à la taille maximale, puis
+    réutilisées. Une connexion restée inutilisée est vérifiée (ping) avant
+    d'être rendue, et une connexion en erreur est remplacée.
+
+    Attributes:
+        db_config (dict): Configuration de la connexion MySQL.
+        size (int): Nombre maximal de connexions ouvertes.
+        wait_time (LatencyStats): Temps d'attente pour obtenir une connexion.
+    """
+    def __init__(self, db_config, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        """
+        Initialise le pool sans ouvrir de connexion.
+
+        Args:
+            db_config (dict): Configuration de la connexion MySQL.
+            size (int): Nombre maximal de connexions ouvertes.
+            timeout (float): Délai maximal d'attente d'une connexion libre, en secondes.
+        """
+        # Chaque requête est validée immédiatement : une connexion réutilisée
+        # ne doit pas garder une transaction (et donc une vue figée) ouverte
+        self.db_config = dict(db_config, autocommit=True)
+        self.size = size
+        self.timeout = timeout
+        self.idle = []
+        self.opened = 0
+        self.checked_out = 0
+        self.condition = threading.Condition()
+        self.wait_time = LatencyStats()
+        self.connects = 0
+        self.reconnects = 0
+        self.failures = 0
+        self.created_at = time.monotonic()
+
+    # Ouvre une nouvelle connexion à la base de données
+    def _connect(self):
+        """
+        Ouvre une nouvelle connexion à la base de données.
+
+        Returns:
+            MySQLConnection: La nouvelle connexion.
+        """
+        connection = mysql.connector.connect(**self.db_config)
+        with self.condition:
+            self.connects += 1
+        return connection
+
+    # Vérifie qu'une connexion inutilisée depuis longtemps est toujours valide
+    def _check(self, connection):
+        """
+        Vérifie qu'une connexion est toujours valide et la remplace si besoin.
+
+        Args:
+            connection (MySQLConnection): La connexion à vérifier.
+
+        Returns:
+            MySQLConnection: La connexion vérifiée, ou une nouvelle connexion.
+        """
+        try:
+            connection.ping()
+            return connection
+        except errors.Error:
+            with self.condition:
+                self.reconnects += 1
+            try:
+                connection.close()
+            except errors.Error:
+                pass
+            return self._connect()
+
+    # Emprunte une connexion au pool
+    def acquire(self, timeout=None):
+        """
+        Emprunte une connexion au pool, en attendant qu'une connexion se libère si besoin.
+
+        Args:
+            timeout (float, optional): Délai maximal d'attente, en secondes.
+
+        Returns:
+            MySQLConnection: Une connexion valide.
+
+        Raises:
+            PoolError: Si aucune connexion ne s'est libérée dans le délai imparti.
+        """
+        started = time.monotonic()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        with self.condition:
+            while True:
+                if self.idle:
+                    connection, last_used = self.idle.pop()
+                    create = False
+                    break
+                if self.opened < self.size:
+                    self.opened += 1
+                    connection, last_used, create = None, None, True
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.failures += 1
+                    raise errors.PoolError("Aucune connexion disponible dans le pool")
+                self.condition.wait(remaining)
+            self.checked_out += 1
+        self.wait_time.record(time.monotonic() - started)
+
+        # Les connexions sont ouvertes et vérifiées hors du verrou
+        try:
+            if create:
+                return self._connect()
+            if time.monotonic() - last_used > HEALTH_CHECK_INTERVAL:
+                return self._check(connection)
+            return connection
+        except errors.Error:
+            with self.condition:
+                self.opened -= 1
+                self.checked_out -= 1
+                self.failures += 1
+                self.condition.notify()
+            raise
+
+    # Rend une connexion au pool
+    def release(self, connection, broken=False):
+        """
+        Rend une connexion au pool.
+
+        Args:
+            connection (MySQLConnection): La connexion empruntée.
+            broken (bool): True si la connexion a rencontré une erreur et doit être fermée.
+        """
+        # is_connected() ferait un aller-retour avec le serveur : on se fie au signalement d'erreur
+        if broken:
+            try:
+                connection.close()
+            except errors.Error:
+                pass
+            with self.condition:
+                self.opened -= 1
+                self.checked_out -= 1
+                self.condition.notify()
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.checked_out -= 1
+            self.condition.notify()
+
+    # Emprunte une connexion le temps d'un bloc with
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Emprunte une connexion le temps d'un bloc with.
+
+        Une erreur de connexion pendant le bloc fait fermer la connexion au lieu
+        de la remettre dans le pool.
+
+        Args:
+            timeout (float, optional): Délai maximal d'attente, en secondes.
+
+        Yields:
+            MySQLConnection: Une connexion valide.
+        """
+        connection = self.acquire(timeout)
+        broken = False
+        try:
+            yield connection
+        except (errors.OperationalError, errors.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.release(connection, broken)
+
+    # Ferme toutes les connexions inutilisées
+    def close(self):
+        """
+        Ferme toutes les connexions inutilisées du pool.
+        """
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.opened -= len(idle)
+        for connection, _ in idle:
+            try:
+                connection.close()
+            except errors.Error:
+                pass
+
+    # Retourne les statistiques du pool
+    def stats(self):
+        """
+        Retourne les statistiques du pool.
+
+        Returns:
+            dict: Connexions ouvertes, empruntées et libres, temps d'attente,
+            connexions établies (au total et par seconde), reconnexions et échecs.
+        """
+        with self.condition:
+            uptime = max(time.monotonic() - self.created_at, 1e-9)
+            return {
+                'size': self.size,
+                'open': self.opened,
+                'checked_out': self.checked_out,
+                'idle': len(self.idle),
+                'connects': self.connects,
+                'connects_per_sec': self.connects / uptime,
+                'reconnects': self.reconnects,
+                'failures': self.failures,
+                'wait': self.wait_time.snapshot(),
+            }
@@ -0,0 +1,28 @@
+try:
+    import resource
+except ImportError:  # Windows : pas de limite de descripteurs à ajuster
+    resource = None
+
+
+# Relève la limite de descripteurs de fichiers ouverts au maximum autorisé
+def raise_fd_limit():
+    """
+    Relève la limite souple de descripteurs de fichiers ouverts jusqu'à la limite dure.
+
+    Chaque connexion consomme un descripteur : avec la limite par défaut (souvent
+    1024), le serveur refuserait des clients, et un générateur de charge ne pourrait
+    plus en ouvrir, bien avant 10 000 connexions.
+
+    Returns:
+        int or None: La nouvelle limite, ou None si elle ne peut pas être ajustée.
+    """
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            soft = hard
+        except (ValueError, OSError) as e:
+            print(f"Impossible d'augmenter la limite de descripteurs: {e}")
+    return soft
@@ -0,0 +1,88 @@
+import bisect
+import hashlib
+
+
+# Nombre de points placés sur l'anneau pour chaque nœud
+VIRTUAL_NODES = 64
+
+
+# Position d'une clé sur l'anneau
+def ring_hash(key):
+    """
+    Calcule la position d'une clé sur l'anneau.
+
+    Le hachage est stable d'un processus à l'autre, contrairement à hash() :
+    tous les nœuds placent les clés au même endroit.
+
+    Args:
+        key (str): La clé.
+
+    Returns:
+        int: La position, sur 64 bits.
+    """
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Anneau de hachage cohérent.
+
+    Chaque nœud occupe `vnodes` points de l'anneau ; une clé appartient au nœud du
+    premier point qui la suit. Lorsqu'un nœud rejoint ou quitte l'anneau, seules
+    les clés de ses points changent de propriétaire.
+
+    Attributes:
+        nodes (set): Les nœuds présents sur l'anneau.
+    """
+    def __init__(self, nodes=(), vnodes=VIRTUAL_NODES):
+        """
+        Initialise l'anneau.
+
+        Args:
+            nodes (iterable): Les nœuds initiaux.
+            vnodes (int): Nombre de points par nœud.
+        """
+        self.vnodes = vnodes
+        self.nodes = set()
+        self.points = []
+        self.owners = {}
+        for node in nodes:
+            self.add(node)
+
+    # Ajoute un nœud à l'anneau
+    def add(self, node):
+        if node in self.nodes:
+            return
+        # Les listes sont remplacées, jamais modifiées : owner() peut être appelée sans verrou
+        owners = dict(self.owners)
+        for index in range(self.vnodes):
+            owners[ring_hash(f"{node}#{index}")] = node
+        self.owners = owners
+        self.points = sorted(owners)
+        self.nodes = self.nodes | {node}
+
+    # Retire un nœud de l'anneau
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes = self.nodes - {node}
+        owners = {point: owner for point, owner in self.owners.items() if owner != node}
+        self.points = sorted(owners)
+        self.owners = owners
+
+    # Retourne le nœud propriétaire d'une clé
+    def owner(self, key):
+        """
+        Retourne le nœud propriétaire d'une clé.
+
+        Args:
+            key (str): La clé, par exemple un nom de canal.
+
+        Returns:
+            str or None: Le nœud propriétaire, ou None si l'anneau est vide.
+        """
+        points, owners = self.points, self.owners
+        if not points:
+            return None
+        index = bisect.bisect(points, ring_hash(key)) % len(points)
+        return owners.get(points[index])
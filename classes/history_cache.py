@@ -0,0 +1,135 @@
+import threading
+from collections import deque
+
+
+# Nombre de messages récents conservés en mémoire par canal
+HISTORY_CACHE_SIZE = 500
+
+
+class HistoryCache:
+    """
+    Tampon circulaire des derniers messages de chaque canal.
+
+    Chaque canal conserve au plus `capacity` messages, du plus ancien au plus
+    récent ; les plus anciens sont évincés lorsque le tampon est plein. Les
+    messages d'un canal y sont contigus : une page d'historique peut être servie
+    depuis la mémoire tant qu'elle ne remonte pas au-delà du plus ancien message
+    conservé.
+
+    Attributes:
+        capacity (int): Nombre maximal de messages conservés par canal.
+        hits (int): Nombre de pages servies depuis la mémoire.
+        misses (int): Nombre de pages qui ont nécessité une requête à la base de données.
+    """
+    def __init__(self, channels, capacity=HISTORY_CACHE_SIZE):
+        """
+        Initialise un tampon vide pour chaque canal.
+
+        Args:
+            channels (iterable): Les canaux mis en cache. Les messages des autres canaux sont ignorés.
+            capacity (int): Nombre maximal de messages conservés par canal.
+        """
+        self.capacity = capacity
+        self.buffers = {channel: deque(maxlen=capacity) for channel in channels}
+        # True tant que le tampon contient tout l'historique du canal
+        self.complete = {channel: False for channel in channels}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # Remplit le tampon d'un canal à partir de la base de données
+    def warm(self, channel, rows):
+        """
+        Remplit le tampon d'un canal avec ses messages les plus récents.
+
+        Args:
+            channel (str): Le canal.
+            rows (list): Les messages (message_id, username, message, timestamp),
+                du plus récent au plus ancien, au plus `capacity` messages.
+        """
+        if channel not in self.buffers:
+            return
+        with self.lock:
+            buffer = self.buffers[channel]
+            buffer.clear()
+            buffer.extend(reversed(rows))
+            self.complete[channel] = len(rows) < self.capacity
+
+    # Ajoute un message au tampon de son canal
+    def append(self, channel, entry):
+        """
+        Ajoute un message au tampon de son canal.
+
+        Args:
+            channel (str): Le canal du message.
+            entry (tuple): Le message (message_id, username, message, timestamp).
+        """
+        buffer = self.buffers.get(channel)
+        if buffer is None:
+            return
+        with self.lock:
+            if len(buffer) == self.capacity:
+                # Le plus ancien message va être évincé : l'historique n'est plus complet
+                self.complete[channel] = False
+                if entry[0] < buffer[0][0]:
+                    return
+            if not buffer or entry[0] > buffer[-1][0]:
+                buffer.append(entry)
+                return
+            # Message relayé par un autre processus, arrivé après un message plus récent :
+            # il est inséré à sa place pour que le tampon reste trié par identifiant
+            if len(buffer) == self.capacity:
+                buffer.popleft()
+            position = len(buffer)
+            while position and buffer[position - 1][0] > entry[0]:
+                position -= 1
+            buffer.insert(position, entry)
+
+    # Retourne une page d'historique depuis la mémoire
+    def get_page(self, channel, before_id=None, limit=50):
+        """
+        Retourne une page d'historique d'un canal depuis la mémoire.
+
+        Args:
+            channel (str): Le canal demandé.
+            before_id (int, optional): Ne retourner que les messages plus anciens que celui-ci.
+            limit (int): Nombre maximal de messages retournés.
+
+        Returns:
+            list or None: Les messages (message_id, username, message, timestamp), du plus
+            récent au plus ancien, ou None si la page ne peut pas être servie depuis la mémoire.
+        """
+        buffer = self.buffers.get(channel)
+        with self.lock:
+            if buffer is None:
+                self.misses += 1
+                return None
+            page = []
+            for entry in reversed(buffer):
+                if before_id and entry[0] >= before_id:
+                    continue
+                page.append(entry)
+                if len(page) == limit:
+                    break
+            # Une page incomplète n'est fiable que si le tampon contient tout le canal
+            if len(page) < limit and not self.complete[channel]:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return page
+
+    # Retourne les statistiques du cache
+    def stats(self):
+        """
+        Retourne les statistiques du cache.
+
+        Returns:
+            dict: Capacité par canal, messages en mémoire, succès et échecs.
+        """
+        with self.lock:
+            return {
+                'capacity': self.capacity,
+                'entries': sum(len(buffer) for buffer in self.buffers.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
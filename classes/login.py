@@ -1,15 +1,27 @@
 import sys
 import bcrypt
-import mysql.connector
-from mysql.connector import Error
+import threading
+from mysql.connector import Error, IntegrityError
 from PyQt5 import QtWidgets
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QDialog, QLabel, QMessageBox
 from PyQt5.uic import loadUi
 from classes.client import ClientUI, Client
+from classes.message_list import MAX_CHANNEL_MESSAGES
+from classes.db_pool import get_pool
+from classes.moderation import get_username_filter, REASON_RESERVED
+from classes.auth_worker import AuthProgress, AuthTask
 from PyQt5.QtWidgets import QApplication, QStackedWidget
 
 
+# Facteur de coût de bcrypt pour les nouveaux mots de passe (2^12 itérations)
+BCRYPT_ROUNDS = 12
+# Résultats de la création de compte
+ACCOUNT_CREATED = "created"
+ACCOUNT_TAKEN = "taken"
+ACCOUNT_RESERVED = "reserved"
+ACCOUNT_REFUSED = "refused"
+
 
 class DatabaseManager:
     """
@@ -17,6 +29,7 @@ class DatabaseManager:
 
     Attributes:
         db_config (dict): Configuration pour la connexion à la base de données MySQL.
+        pool (ConnectionPool): Pool de connexions partagé par tout le processus.
     """
     def __init__(self):
         """
@@ -29,6 +42,7 @@ class DatabaseManager:
             "password": "password",
             "database": "SAE"
         }
+        self.pool = get_pool(self.db_config)
         
     # Exécute une requête SQL et gère la connexion à la base de données
     def execute_query(self, query, params=None):
@@ -43,47 +57,129 @@ class DatabaseManager:
             list or None: Résultats de la requête pour les requêtes SELECT, sinon None.
         """
         try:
-            connection = mysql.connector.connect(**self.db_config)
-            cursor = connection.cursor()
-            cursor.execute(query, params or ())
-            if query.strip().upper().startswith("SELECT"):
-                return cursor.fetchall()
-            connection.commit()
-            return None
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(query, params or ())
+                    if query.strip().upper().startswith("SELECT"):
+                        return cursor.fetchall()
+                    connection.commit()
+                    return None
+                finally:
+                    cursor.close()
         except Error as e:
             print(f"Erreur base de données: {e}")
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
                 
+    # Vérifie si un nom d'utilisateur est déjà pris
+    def username_exists(self, username):
+        """
+        Vérifie si le nom d'utilisateur existe déjà dans la base de données.
+
+        La recherche passe par l'index unique de la colonne username_lower, sans
+        parcourir la table.
+
+        Args:
+            username (str): Nom d'utilisateur à vérifier.
+
+        Returns:
+            bool: True si le nom d'utilisateur existe, False sinon.
+        """
+        result = self.execute_query("SELECT 1 FROM user WHERE username_lower = LOWER(%s) LIMIT 1", (username,))
+        return bool(result)
+
+    # Crée un compte utilisateur
+    def create_user(self, username, hashed_password):
+        """
+        Crée un compte utilisateur.
+
+        L'index unique sur username_lower refuse un nom déjà pris, même si deux
+        inscriptions du même nom passent la vérification en même temps.
+
+        Args:
+            username (str): Le nom d'utilisateur.
+            hashed_password (str): Le mot de passe hashé.
+
+        Returns:
+            bool: True si le compte a été créé, False si le nom d'utilisateur est déjà pris.
+        """
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("INSERT INTO user (username, password) VALUES (%s, %s)", (username, hashed_password))
+                connection.commit()
+                return True
+            except IntegrityError:
+                return False
+            finally:
+                cursor.close()
+
     # Hash un mot de passe avec bcrypt
-    def hash_password(self, password):
+    def hash_password(self, password, rounds=BCRYPT_ROUNDS):
         """
         Hash un mot de passe avec bcrypt.
 
         Args:
             password (str): Le mot de passe à hasher.
+            rounds (int): Facteur de coût de bcrypt ; chaque unité double la durée du calcul.
 
         Returns:
             str: Le mot de passe hashé.
         """
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds))
         return hashed.decode('utf-8')
 
-    # Vérifie si un mot de passe fourni correspond au hash stocké
-    def check_password(self, stored_password, provided_password):
-        """
-        Vérifie si un mot de passe fourni correspond au hash stocké.
 
-        Args:
-            stored_password (str): Le mot de passe hashé stocké.
-            provided_password (str): Le mot de passe fourni à vérifier.
+# Ouvre la session d'un client auprès du serveur, dans le pool de threads
+def open_session(task, client):
+    """
+    Se connecte au serveur, qui vérifie les identifiants. Exécutée hors du thread de l'interface.
 
-        Returns:
-            bool: True si les mots de passe correspondent, False sinon.
-        """
-        return bcrypt.checkpw(provided_password.encode('utf-8'), stored_password.encode('utf-8'))
+    Args:
+        task (AuthTask): La tâche, pour signaler les étapes.
+        client (Client): Le client, créé avec le mot de passe saisi.
+
+    Returns:
+        str or None: Le motif du refus du serveur, ou None si la session est ouverte.
+    """
+    task.step("Connexion au serveur...")
+    error = client.open_session()
+    if task.cancelled.is_set():
+        # Le résultat ne sera pas transmis : la connexion ouverte est abandonnée
+        client.close_connection()
+    return error
+
+
+# Crée un compte, dans le pool de threads
+def create_account(task, username, password, rounds):
+    """
+    Crée un compte utilisateur. Exécutée hors du thread de l'interface.
+
+    Args:
+        task (AuthTask): La tâche, pour signaler les étapes.
+        username (str): Le nom d'utilisateur, déjà validé.
+        password (str): Le mot de passe, déjà validé.
+        rounds (int): Facteur de coût de bcrypt.
+
+    Returns:
+        str: ACCOUNT_CREATED, ACCOUNT_RESERVED ou ACCOUNT_REFUSED si le nom est réservé
+        ou injurieux, ACCOUNT_TAKEN s'il est déjà pris.
+    """
+    task.step("Vérification du nom d'utilisateur...")
+    # Noms réservés et injurieux : le filtre est compilé une seule fois, ici plutôt que dans l'interface
+    reason = get_username_filter().check(username)
+    if reason == REASON_RESERVED:
+        return ACCOUNT_RESERVED
+    if reason is not None:
+        return ACCOUNT_REFUSED
+    db_manager = DatabaseManager()
+    if db_manager.username_exists(username):
+        return ACCOUNT_TAKEN
+    task.step("Chiffrement du mot de passe...")
+    hashed_password = db_manager.hash_password(password, rounds)
+    task.step("Création du compte...")
+    if not db_manager.create_user(username, hashed_password):
+        return ACCOUNT_TAKEN
+    return ACCOUNT_CREATED
 
 
 class Login(QDialog):
@@ -93,13 +189,17 @@ class Login(QDialog):
     Attributes:
         stacked_widget (QStackedWidget): Le widget empilé pour la navigation entre les fenêtres.
         client (Client, optional): L'instance client pour la connexion au serveur.
+        bcrypt_rounds (int): Facteur de coût de bcrypt des comptes créés depuis cette fenêtre.
+        max_messages (int): Nombre maximal de messages gardés par canal dans l'interface du client.
     """
-    def __init__(self, stacked_widget):
+    def __init__(self, stacked_widget, bcrypt_rounds=BCRYPT_ROUNDS, max_messages=MAX_CHANNEL_MESSAGES):
         """
         Initialise l'interface de connexion.
 
         Args:
             stacked_widget (QStackedWidget): Widget empilé pour la navigation.
+            bcrypt_rounds (int): Facteur de coût de bcrypt des comptes créés depuis cette fenêtre.
+            max_messages (int): Nombre maximal de messages gardés par canal dans l'interface du client.
         """
         super(Login, self).__init__()
         # Initialisation de la fenêtre de connexion
@@ -113,6 +213,11 @@ class Login(QDialog):
         self.errorLabel.setGeometry(10, 10, 400, 30)
         self.errorLabel.setStyleSheet("color: red;")
 
+        # La connexion au serveur, qui vérifie le mot de passe, se fait hors du thread de l'interface
+        self.progress = AuthProgress(self, [self.loginbutton, self.createaccbutton])
+        self.bcrypt_rounds = bcrypt_rounds
+        self.max_messages = max_messages
+
         self.setMinimumSize(439, 454)
         self.client = None
         
@@ -122,14 +227,26 @@ class Login(QDialog):
         Gère la tentative de connexion de l'utilisateur.
         """
         self.errorLabel.clear()
-        if self.isValidLogin():
-            username = self.user.text()
-            self.client = Client(username)
-            self.client.connection_failed.connect(self.on_connection_failed)
-            self.client.connection_success.connect(self.on_connection_success)
-            self.client.connect_to_server()
-        else:
-            self.errorLabel.setText("Nom d'utilisateur ou mot de passe invalide.")
+        # Les identifiants sont vérifiés par le serveur, qui délivre un jeton de session
+        self.client = Client(self.user.text(), password=self.password.text())
+        task = AuthTask(open_session, self.client)
+        self.progress.start(task, self.on_session_opened, self.on_connection_failed)
+
+    # Poursuit la connexion une fois la session ouverte
+    def on_session_opened(self, error):
+        """
+        Affiche l'interface du client si le serveur a accepté les identifiants.
+
+        Args:
+            error (str or None): Le motif du refus du serveur.
+        """
+        if error is not None:
+            self.errorLabel.setText(error)
+            self.client = None
+            return
+        self.on_connection_success()
+        # La réception démarre une fois les signaux de l'interface connectés
+        self.client.start_receiving()
 
     # Affiche un message d'erreur si la connexion au serveur échoue
     def on_connection_failed(self, error_message):
@@ -139,7 +256,8 @@ class Login(QDialog):
         Args:
             error_message (str): Le message d'erreur à afficher.
         """
-        QMessageBox.critical(self, "Erreur de connexion", error_message)
+        print(f"Erreur lors de la connexion au serveur: {error_message}")
+        QMessageBox.critical(self, "Erreur de connexion", "Connexion au serveur impossible, réessayez plus tard.")
         self.client = None
 
         # Traite la connexion réussie et affiche l'interface du client
@@ -148,8 +266,7 @@ class Login(QDialog):
         Gère une connexion réussie au serveur.
         """
         QMessageBox.information(self, "Connexion Réussie", "Vous êtes connecté(e) au serveur.")
-        username = self.user.text()
-        client_ui = ClientUI(username)
+        client_ui = ClientUI(self.client.username, self.client, self.max_messages)
         client_ui.setupClient(self.client)  # Configure le client et connecte le signal
         client_ui.setGeometry(300, 300, 600, 400)
 
@@ -162,30 +279,12 @@ class Login(QDialog):
         # Changez pour le nouvel écran
         self.stacked_widget.setCurrentIndex(new_screen_index)
 
-    # Vérifie si les identifiants de l'utilisateur sont valides
-    def isValidLogin(self):
-        """
-        Vérifie si les identifiants de l'utilisateur sont valides.
-
-        Returns:
-            bool: True si les identifiants sont valides, False sinon.
-        """
-        user = self.user.text()
-        password = self.password.text()
-
-        db_manager = DatabaseManager()
-        result = db_manager.execute_query("SELECT password FROM user WHERE username = %s", (user,))
-        if result:
-            stored_password = result[0][0]
-            return db_manager.check_password(stored_password, password)
-        return False
-
     # Dirige l'utilisateur vers la fenêtre de création de compte
     def gotocreate(self):
         """
         Dirige l'utilisateur vers la fenêtre de création de compte.
         """
-        createacc = CreateAcc()
+        createacc = CreateAcc(self.bcrypt_rounds)
         createacc.set_stacked_widget(self.stacked_widget)
         self.stacked_widget.addWidget(createacc)
         self.stacked_widget.setCurrentIndex(self.stacked_widget.currentIndex() + 1)
@@ -196,10 +295,14 @@ class CreateAcc(QDialog):
 
     Attributes:
         stacked_widget (QStackedWidget): Widget empilé pour la navigation.
+        bcrypt_rounds (int): Facteur de coût de bcrypt des comptes créés.
     """
-    def __init__(self):
+    def __init__(self, bcrypt_rounds=BCRYPT_ROUNDS):
         """
         Initialise l'interface de création de compte.
+
+        Args:
+            bcrypt_rounds (int): Facteur de coût de bcrypt des comptes créés.
         """
         # Initialisation de la fenêtre de création de compte
         super(CreateAcc, self).__init__()
@@ -207,6 +310,11 @@ class CreateAcc(QDialog):
         self.signupbutton.clicked.connect(self.createaccfunction)
         self.password.setEchoMode(QtWidgets.QLineEdit.Password)
         self.confirmpass.setEchoMode(QtWidgets.QLineEdit.Password)
+        self.bcrypt_rounds = bcrypt_rounds
+        # La base de données et bcrypt sont utilisés hors du thread de l'interface
+        self.progress = AuthProgress(self, [self.signupbutton], top=10)
+        # Le filtre des noms d'utilisateur est compilé pendant la saisie, hors du thread de l'interface
+        threading.Thread(target=get_username_filter, name="username-filter", daemon=True).start()
         
     # Gère la création du compte utilisateur
     def createaccfunction(self):
@@ -220,15 +328,34 @@ class CreateAcc(QDialog):
         if not self.validate_credentials(username, password, confirm_password):
             return
 
-        db_manager = DatabaseManager()
-        hashed_password = db_manager.hash_password(password)
-        try:
-            db_manager.execute_query("INSERT INTO user (username, password) VALUES (%s, %s)", (username, hashed_password))
-            print("Compte créé avec succès avec l'username:", username)
-            QMessageBox.information(self, "Succès", "Compte créé avec succès.")
-            self.go_to_login()
-        except Exception as e:
-            print("Error:", str(e))
+        task = AuthTask(create_account, username, password, self.bcrypt_rounds)
+        self.progress.start(task, self.on_account_created, self.on_account_error)
+
+    # Termine l'inscription une fois le compte créé
+    def on_account_created(self, status):
+        """
+        Affiche le résultat de la création du compte.
+
+        Args:
+            status (str): ACCOUNT_CREATED, ACCOUNT_RESERVED, ACCOUNT_REFUSED ou ACCOUNT_TAKEN.
+        """
+        if status == ACCOUNT_RESERVED:
+            QMessageBox.warning(self, "Erreur d'inscription", "Ce nom d'utilisateur est réservé.")
+            return
+        if status == ACCOUNT_REFUSED:
+            QMessageBox.warning(self, "Erreur d'inscription", "Ce nom d'utilisateur n'est pas autorisé.")
+            return
+        if status == ACCOUNT_TAKEN:
+            QMessageBox.warning(self, "Erreur d'inscription", "Ce nom d'utilisateur est déjà pris.")
+            return
+        print("Compte créé avec succès avec l'username:", self.username.text())
+        QMessageBox.information(self, "Succès", "Compte créé avec succès.")
+        self.go_to_login()
+
+    # Affiche une erreur survenue pendant la création du compte
+    def on_account_error(self, error_message):
+        print("Error:", error_message)
+        QMessageBox.warning(self, "Erreur d'inscription", "Le compte n'a pas pu être créé, réessayez plus tard.")
 
     # Ramène l'utilisateur à l'écran de connexion
     def go_to_login(self):
@@ -277,12 +404,6 @@ class CreateAcc(QDialog):
         Returns:
             bool: True si les informations sont valides, False sinon.
         """
-        
-        # Vérifier si le nom d'utilisateur existe déjà
-        if self.username_exists(username):
-            QMessageBox.warning(self, "Erreur d'inscription", "Ce nom d'utilisateur est déjà pris.")
-            return False
-
         if len(username) < 4:
             QMessageBox.warning(self, "Erreur d'inscription", "Le nom d'utilisateur est trop court (minimum 4 caractères).")
             return False
@@ -312,21 +433,6 @@ class CreateAcc(QDialog):
             QMessageBox.warning(self, "Erreur d'inscription", "Les mots de passe ne correspondent pas.")
             return False
 
+        # Les noms réservés et injurieux et la disponibilité du nom sont vérifiés par
+        # create_account, hors du thread de l'interface
         return True
-    
-    # Vérifie si le nom d'utilisateur existe déjà dans la base de données
-    def username_exists(self, username):
-        """
-        Vérifie si le nom d'utilisateur existe déjà dans la base de données.
-
-        Args:
-            username (str): Nom d'utilisateur à vérifier.
-
-        Returns:
-            bool: True si le nom d'utilisateur existe, False sinon.
-        """
-        db_manager = DatabaseManager()
-        result = db_manager.execute_query("SELECT COUNT(*) FROM user WHERE LOWER(username) = LOWER(%s)", (username,))
-        if result and result[0][0] > 0:
-            return True
-        return False
@@ -0,0 +1,147 @@
+import time
+import threading
+from collections import OrderedDict
+from classes.ban_list import normalize_username
+
+
+# Tentatives de connexion par mot de passe depuis une même adresse : rafale, puis débit par seconde
+SOURCE_BURST = 20
+SOURCE_RATE = 1.0
+# Tentatives de connexion par mot de passe sur un même compte : rafale, puis débit par seconde
+USERNAME_BURST = 5
+USERNAME_RATE = 0.1
+# Nombre maximal de clés suivies par un limiteur ; au-delà, les moins récentes sont oubliées
+RATE_LIMITER_KEYS = 10000
+# Durée pendant laquelle un nom d'utilisateur inconnu est refusé sans requête (en secondes)
+UNKNOWN_USER_TTL = 30.0
+# Nombre maximal de noms d'utilisateur inconnus gardés en mémoire
+UNKNOWN_USER_CACHE_SIZE = 10000
+
+
+class RateLimiter:
+    """
+    Limiteur de débit à seau de jetons, un seau par clé (adresse ou nom d'utilisateur).
+
+    Chaque seau contient au plus `burst` jetons et se remplit de `rate` jetons par
+    seconde ; une tentative consomme un jeton. Le remplissage est calculé à la
+    demande : aucun thread ne parcourt les seaux.
+
+    Attributes:
+        rate (float): Jetons ajoutés par seconde.
+        burst (int): Capacité d'un seau.
+        max_keys (int): Nombre maximal de seaux gardés en mémoire.
+    """
+    def __init__(self, rate, burst, max_keys=RATE_LIMITER_KEYS, clock=time.monotonic):
+        """
+        Initialise le limiteur.
+
+        Args:
+            rate (float): Jetons ajoutés par seconde.
+            burst (int): Capacité d'un seau.
+            max_keys (int): Nombre maximal de seaux gardés en mémoire.
+            clock (callable): Retourne un instant en secondes ; remplacée dans les tests.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        # clé -> (jetons restants, instant du dernier calcul), de la moins à la plus récente
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+        self.allowed = 0
+        self.refused = 0
+
+    # Consomme un jeton du seau d'une clé
+    def allow(self, key):
+        """
+        Consomme un jeton du seau d'une clé.
+
+        Args:
+            key (str): La clé (adresse ou nom d'utilisateur).
+
+        Returns:
+            bool: True si la tentative est autorisée, False si le seau est vide.
+        """
+        now = self.clock()
+        with self.lock:
+            tokens, updated_at = self.buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+                self.allowed += 1
+            else:
+                self.refused += 1
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                # Un seau oublié repart plein : seules les clés inactives depuis longtemps sont perdues
+                self.buckets.popitem(last=False)
+            return allowed
+
+    # Retourne les statistiques du limiteur
+    def stats(self):
+        with self.lock:
+            return {'keys': len(self.buckets), 'allowed': self.allowed, 'refused': self.refused}
+
+
+class NegativeCache:
+    """
+    Noms d'utilisateur récemment cherchés sans succès dans la base de données.
+
+    Une rafale de tentatives sur des comptes inexistants est refusée en mémoire,
+    sans emprunter de connexion au pool. La durée est courte : un compte créé
+    entre-temps est reconnu au plus tard après `ttl` secondes.
+
+    Attributes:
+        ttl (float): Durée de vie d'une entrée, en secondes.
+        max_size (int): Nombre maximal d'entrées.
+    """
+    def __init__(self, ttl=UNKNOWN_USER_TTL, max_size=UNKNOWN_USER_CACHE_SIZE, clock=time.monotonic):
+        """
+        Initialise le cache.
+
+        Args:
+            ttl (float): Durée de vie d'une entrée, en secondes.
+            max_size (int): Nombre maximal d'entrées.
+            clock (callable): Retourne un instant en secondes ; remplacée dans les tests.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        # nom normalisé -> instant d'expiration, de la plus ancienne à la plus récente
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+
+    # Enregistre un nom d'utilisateur inconnu
+    def add(self, username):
+        """
+        Enregistre un nom d'utilisateur absent de la base de données.
+
+        Args:
+            username (str): Le nom d'utilisateur.
+        """
+        key = normalize_username(username)
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = self.clock() + self.ttl
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    # Vérifie si un nom d'utilisateur est connu pour être absent
+    def __contains__(self, username):
+        key = normalize_username(username)
+        with self.lock:
+            expires_at = self.entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at < self.clock():
+                del self.entries[key]
+                return False
+            self.hits += 1
+            return True
+
+    # Retourne les statistiques du cache
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'hits': self.hits}
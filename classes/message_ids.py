@@ -0,0 +1,50 @@
+import threading
+
+
+class MessageIdAllocator:
+    """
+    Attribue les identifiants des nouveaux messages.
+
+    Lorsque plusieurs processus ou nœuds écrivent dans la même table, chacun
+    attribue un identifiant sur `step` à partir d'un rang qui lui est propre : les
+    identifiants ne se recoupent jamais. observe() fait passer le compteur après
+    un identifiant attribué ailleurs, pour que les identifiants d'un canal restent
+    croissants lorsqu'il change de nœud propriétaire.
+
+    Attributes:
+        next_id (int): Le prochain identifiant attribué.
+        step (int): L'écart entre deux identifiants attribués.
+    """
+    def __init__(self, first, step=1):
+        """
+        Initialise le compteur.
+
+        Args:
+            first (int): Le premier identifiant attribué.
+            step (int): L'écart entre deux identifiants attribués.
+        """
+        self.next_id = first
+        self.step = step
+        self.lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    # Attribue un identifiant
+    def __next__(self):
+        with self.lock:
+            message_id = self.next_id
+            self.next_id += self.step
+            return message_id
+
+    # Prend en compte un identifiant attribué ailleurs
+    def observe(self, message_id):
+        """
+        Fait passer le compteur après un identifiant attribué par un autre processus ou nœud.
+
+        Args:
+            message_id (int): L'identifiant observé.
+        """
+        with self.lock:
+            if message_id >= self.next_id:
+                self.next_id += ((message_id - self.next_id) // self.step + 1) * self.step
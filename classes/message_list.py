@@ -0,0 +1,139 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+# Nombre maximal de messages gardés en mémoire et affichés par canal
+MAX_CHANNEL_MESSAGES = 1000
+# Ligne affichée en haut d'un canal lorsque l'historique plus ancien ne peut plus y être chargé
+OLDER_HISTORY_MARKER = "[Historique plus ancien non affiché]"
+
+
+class MessageListModel(QAbstractListModel):
+    """
+    Messages d'un canal, affichés par une QListView.
+
+    Le modèle ne garde que les `max_rows` messages les plus récents : la vue ne
+    met en page que les lignes visibles, et le coût d'un ajout ne dépend pas du
+    nombre de messages reçus depuis l'ouverture de l'onglet.
+
+    Une ligne de repère peut être affichée au-dessus des messages (set_marker()),
+    par exemple pour signaler que l'historique plus ancien n'est pas affiché. Elle
+    ne compte pas dans max_rows.
+
+    Attributes:
+        max_rows (int): Nombre maximal de messages gardés.
+        lines (list): Les messages formatés, du plus ancien au plus récent.
+        marker (str or None): La ligne de repère affichée en haut de la liste.
+    """
+    def __init__(self, max_rows=MAX_CHANNEL_MESSAGES, parent=None):
+        """
+        Initialise un modèle vide.
+
+        Args:
+            max_rows (int): Nombre maximal de messages gardés.
+            parent (QObject, optional): Le parent Qt du modèle.
+        """
+        super().__init__(parent)
+        self.max_rows = max_rows
+        self.lines = []
+        self.marker = None
+
+    # Nombre de lignes affichées avant les messages
+    def offset(self):
+        return 0 if self.marker is None else 1
+
+    def rowCount(self, parent=QModelIndex()):
+        # Liste à plat : seule la racine a des lignes
+        return 0 if parent.isValid() else len(self.lines) + self.offset()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        row = index.row() - self.offset()
+        return self.marker if row < 0 else self.lines[row]
+
+    # Retourne l'index de la ligne d'un message
+    def message_index(self, position):
+        return self.index(position + self.offset())
+
+    # Affiche ou retire la ligne de repère en haut de la liste
+    def set_marker(self, marker):
+        """
+        Affiche une ligne de repère au-dessus des messages, ou la retire.
+
+        Args:
+            marker (str or None): Le texte de la ligne, ou None pour la retirer.
+        """
+        if marker == self.marker:
+            return
+        if self.marker is None:
+            self.beginInsertRows(QModelIndex(), 0, 0)
+            self.marker = marker
+            self.endInsertRows()
+        elif marker is None:
+            self.beginRemoveRows(QModelIndex(), 0, 0)
+            self.marker = None
+            self.endRemoveRows()
+        else:
+            self.marker = marker
+            self.dataChanged.emit(self.index(0), self.index(0))
+
+    # Ajoute des messages à la fin de la liste
+    def append_lines(self, lines):
+        """
+        Ajoute des messages à la fin de la liste, en retirant les plus anciens au-delà de max_rows.
+
+        Args:
+            lines (list): Les messages formatés, du plus ancien au plus récent.
+
+        Returns:
+            int: Nombre de messages anciens retirés.
+        """
+        lines = lines[-self.max_rows:]
+        if not lines:
+            return 0
+        offset = self.offset()
+        evicted = max(0, len(self.lines) + len(lines) - self.max_rows)
+        if evicted:
+            self.beginRemoveRows(QModelIndex(), offset, offset + evicted - 1)
+            del self.lines[:evicted]
+            self.endRemoveRows()
+        first = offset + len(self.lines)
+        self.beginInsertRows(QModelIndex(), first, first + len(lines) - 1)
+        self.lines.extend(lines)
+        self.endInsertRows()
+        return evicted
+
+    # Ajoute des messages plus anciens au début de la liste
+    def prepend_lines(self, lines):
+        """
+        Ajoute des messages plus anciens au début de la liste, dans la limite de la place libre.
+
+        Les messages récents ne sont jamais retirés pour faire place aux anciens :
+        seuls les plus récents de la page, contigus à la liste, sont ajoutés.
+
+        Args:
+            lines (list): Les messages formatés, du plus ancien au plus récent.
+
+        Returns:
+            int: Nombre de messages ajoutés.
+        """
+        free = self.max_rows - len(self.lines)
+        lines = lines[-free:] if free > 0 else []
+        if not lines:
+            return 0
+        offset = self.offset()
+        self.beginInsertRows(QModelIndex(), offset, offset + len(lines) - 1)
+        self.lines[:0] = lines
+        self.endInsertRows()
+        return len(lines)
+
+    # Indique si la liste a atteint sa taille maximale
+    def full(self):
+        return len(self.lines) >= self.max_rows
+
+    # Retire tous les messages et la ligne de repère
+    def clear(self):
+        self.beginResetModel()
+        self.lines = []
+        self.marker = None
+        self.endResetModel()
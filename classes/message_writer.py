@@ -0,0 +1,151 @@
+import queue
+import threading
+import time
+
+
+# Nombre maximal de messages écrits par requête INSERT
+BATCH_SIZE = 500
+# Délai maximal entre la réception d'un message et son écriture (en secondes)
+FLUSH_INTERVAL = 0.2
+# Nombre maximal de messages en attente d'écriture
+MAX_PENDING = 100000
+# Délai maximal accordé à la vidange de la file à l'arrêt (en secondes)
+CLOSE_TIMEOUT = 10.0
+
+INSERT_MESSAGE = "INSERT INTO messages (message_id, username, channel, content, timestamp) VALUES (%s, %s, %s, %s, %s)"
+
+# Marqueur d'arrêt placé dans la file
+_STOP = object()
+
+
+class MessageWriter:
+    """
+    Écrit les messages dans la base de données depuis un thread dédié, par lots.
+
+    Les messages soumis sont regroupés et écrits avec un seul executemany
+    (traduit en INSERT multi-lignes par le connecteur) dès que BATCH_SIZE
+    messages sont en attente ou que FLUSH_INTERVAL secondes se sont écoulées.
+    La diffusion des messages n'attend donc jamais la base de données.
+
+    Attributes:
+        db_manager (DatabaseManager): Le gestionnaire de base de données utilisé.
+        written (int): Nombre de messages écrits.
+        batches (int): Nombre de lots écrits.
+        dropped (int): Nombre de messages perdus (file pleine ou erreur d'écriture).
+    """
+    def __init__(self, db_manager, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        """
+        Initialise l'écrivain sans démarrer son thread.
+
+        Args:
+            db_manager (DatabaseManager): Le gestionnaire de base de données utilisé.
+            batch_size (int): Nombre maximal de messages par lot.
+            flush_interval (float): Délai maximal avant l'écriture d'un lot, en secondes.
+            max_pending (int): Nombre maximal de messages en attente.
+        """
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.thread = None
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+
+    # Démarre le thread d'écriture
+    def start(self):
+        """
+        Démarre le thread d'écriture.
+        """
+        self.thread = threading.Thread(target=self.run, name="message-writer", daemon=True)
+        self.thread.start()
+
+    # Ajoute un message à la file d'écriture
+    def submit(self, message_id, username, channel, message, timestamp):
+        """
+        Ajoute un message à la file d'écriture, sans attendre.
+
+        Args:
+            message_id (int): L'identifiant attribué au message.
+            username (str): Le nom d'utilisateur qui a envoyé le message.
+            channel (str): Le canal où le message a été envoyé.
+            message (str): Le contenu du message.
+            timestamp (datetime): L'horodatage du message.
+        """
+        try:
+            self.pending.put_nowait((message_id, username, channel, message, timestamp))
+        except queue.Full:
+            self.dropped += 1
+            print("File d'écriture des messages pleine, message non sauvegardé.")
+
+    # Boucle du thread d'écriture
+    def run(self):
+        """
+        Regroupe les messages en attente et les écrit par lots jusqu'à l'arrêt.
+        """
+        stopping = False
+        while not stopping:
+            item = self.pending.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.pending.get(timeout=remaining) if remaining > 0 else self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    # Les messages reçus avant l'arrêt sont tout de même écrits
+                    stopping = True
+                    break
+                batch.append(item)
+            self.flush(batch)
+
+    # Écrit un lot de messages
+    def flush(self, batch):
+        """
+        Écrit un lot de messages avec une seule requête.
+
+        Args:
+            batch (list): Les lignes (message_id, username, channel, content, timestamp) à insérer.
+        """
+        if self.db_manager.execute_many(INSERT_MESSAGE, batch):
+            self.written += len(batch)
+            self.batches += 1
+        else:
+            self.dropped += len(batch)
+
+    # Arrête le thread après avoir écrit les messages en attente
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """
+        Arrête le thread d'écriture après avoir écrit tous les messages en attente.
+
+        Args:
+            timeout (float): Délai maximal d'attente de la vidange, en secondes.
+        """
+        if self.thread is None or not self.thread.is_alive():
+            return
+        # Le marqueur est placé après les messages déjà soumis : ils seront écrits avant l'arrêt
+        try:
+            self.pending.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("File d'écriture des messages toujours pleine à l'arrêt.")
+            return
+        self.thread.join(timeout)
+
+    # Retourne les statistiques d'écriture
+    def stats(self):
+        """
+        Retourne les statistiques d'écriture.
+
+        Returns:
+            dict: Messages en attente, écrits, perdus et nombre de lots.
+        """
+        return {
+            'pending': self.pending.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'dropped': self.dropped,
+        }
@@ -0,0 +1,69 @@
+import threading
+from collections import deque
+
+
+class LatencyStats:
+    """
+    Accumule des mesures de durée et en calcule un résumé (moyenne, percentiles, maximum).
+
+    Seules les dernières mesures sont conservées pour les percentiles, de sorte que
+    la mémoire utilisée reste bornée quel que soit le nombre de mesures.
+
+    Attributes:
+        count (int): Nombre total de mesures enregistrées.
+        total (float): Somme de toutes les durées mesurées, en secondes.
+        max (float): Plus grande durée mesurée, en secondes.
+    """
+    def __init__(self, window=1024):
+        """
+        Initialise les statistiques.
+
+        Args:
+            window (int): Nombre de mesures récentes conservées pour les percentiles.
+        """
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    # Enregistre une nouvelle mesure
+    def record(self, seconds):
+        """
+        Enregistre une nouvelle mesure.
+
+        Args:
+            seconds (float): La durée mesurée, en secondes.
+        """
+        with self.lock:
+            self.samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    # Retourne un résumé des mesures
+    def snapshot(self):
+        """
+        Retourne un résumé des mesures, en millisecondes.
+
+        Returns:
+            dict: Nombre de mesures, moyenne, percentiles 50/95/99 et maximum.
+        """
+        with self.lock:
+            samples = sorted(self.samples)
+            count, total, maximum = self.count, self.total, self.max
+
+        def percentile(p):
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+        return {
+            'count': count,
+            'mean_ms': (total / count * 1000) if count else 0.0,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': maximum * 1000,
+        }
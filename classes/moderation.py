@@ -0,0 +1,401 @@
+import os
+import json
+import threading
+import unicodedata
+from collections import deque
+
+
+# Répertoire des listes de mots livrées avec le projet
+WORD_LISTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bad-words-list")
+# Liste des noms d'utilisateur réservés, qui n'est pas une langue
+RESERVED_USERNAMES = "reserved-username"
+# Langues chargées par défaut
+DEFAULT_LANGUAGES = ("fr", "en")
+
+# Traitement des messages qui contiennent un mot interdit
+ACTION_OFF = "off"          # Aucune vérification
+ACTION_MASK = "mask"        # Le mot est remplacé par des astérisques
+ACTION_DROP = "drop"        # Le message est refusé
+ACTION_FLAG = "flag"        # Le message est diffusé tel quel et signalé dans le journal du serveur
+MODERATION_ACTIONS = (ACTION_OFF, ACTION_MASK, ACTION_DROP, ACTION_FLAG)
+
+# Chiffres et symboles utilisés à la place de lettres ("c0nn4rd")
+LEETSPEAK = {
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '8': 'b', '@': 'a', '$': 's',
+}
+# Longueur à partir de laquelle un mot interdit est refusé au milieu d'un nom d'utilisateur
+USERNAME_INFIX_LENGTH = 5
+# Motifs de refus d'un nom d'utilisateur
+REASON_RESERVED = "reserved"
+REASON_OFFENSIVE = "offensive"
+# Nombre maximal de caractères dont la forme normalisée est gardée en mémoire
+FOLD_CACHE_SIZE = 65536
+
+_fold_cache = {}
+_username_filter = None
+_username_filter_lock = threading.Lock()
+
+
+# Normalise un caractère : sans accent, en minuscule, leetspeak traduit
+def fold_char(char):
+    """
+    Normalise un caractère pour la recherche de mots interdits.
+
+    Args:
+        char (str): Le caractère.
+
+    Returns:
+        str: Sa forme normalisée, vide pour un accent isolé, " " pour un espace.
+    """
+    folded = _fold_cache.get(char)
+    if folded is not None:
+        return folded
+    if char in LEETSPEAK:
+        folded = LEETSPEAK[char]
+    elif char.isspace():
+        folded = " "
+    else:
+        decomposed = unicodedata.normalize("NFKD", char)
+        folded = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    if len(_fold_cache) < FOLD_CACHE_SIZE:
+        _fold_cache[char] = folded
+    return folded
+
+
+# Indique si un caractère appartient à un mot d'une écriture qui sépare les mots par des espaces
+def is_word_char(char):
+    """
+    Indique si un caractère fait partie d'un mot délimité par des espaces.
+
+    Le chinois, le japonais et le thaï n'utilisent pas d'espaces : un mot interdit
+    y est reconnu au milieu du texte. Ailleurs, il doit être un mot entier, pour
+    que "con" ne soit pas reconnu dans "second".
+
+    Args:
+        char (str): Un caractère normalisé.
+
+    Returns:
+        bool: True pour une lettre ou un chiffre d'une écriture à espaces.
+    """
+    if not char.isalnum():
+        return False
+    code = ord(char)
+    return not (
+        0x0E00 <= code <= 0x0EFF        # Thaï, lao
+        or 0x3040 <= code <= 0x30FF     # Hiragana, katakana
+        or 0x3400 <= code <= 0x9FFF     # Idéogrammes CJC
+        or 0xF900 <= code <= 0xFAFF
+        or 0xFF66 <= code <= 0xFF9F     # Katakana demi-chasse
+    )
+
+
+# Normalise un texte et retourne la position d'origine de chaque caractère normalisé
+def fold_text(text):
+    """
+    Normalise un texte pour la recherche de mots interdits.
+
+    Dans le cas courant, chaque caractère est remplacé par un seul caractère et le
+    texte n'a pas d'espaces répétés : la normalisation est faite par str.translate
+    et les positions sont inchangées. Sinon, la position d'origine de chaque
+    caractère normalisé est conservée.
+
+    Args:
+        text (str): Le texte.
+
+    Returns:
+        tuple: Le texte normalisé, et la liste des positions d'origine ou None si elles sont inchangées.
+    """
+    table = {}
+    one_to_one = True
+    for char in set(text):
+        folded = fold_char(char)
+        table[ord(char)] = folded
+        if len(folded) != 1:
+            one_to_one = False
+    folded = text.translate(table)
+    if one_to_one and "  " not in folded:
+        return folded, None
+
+    characters = []
+    origins = []
+    after_space = True
+    for index, char in enumerate(text):
+        for c in table[ord(char)]:
+            if c == " ":
+                if after_space:
+                    continue
+                after_space = True
+            else:
+                after_space = False
+            characters.append(c)
+            origins.append(index)
+    return "".join(characters), origins
+
+
+# Normalise un mot de la liste comme le texte analysé
+def fold_word(word):
+    return " ".join("".join(fold_char(char) for char in word).split())
+
+
+# Retourne les langues disponibles
+def available_languages(directory=WORD_LISTS_DIR):
+    """
+    Retourne les langues dont une liste de mots est disponible.
+
+    Args:
+        directory (str): Le répertoire des listes.
+
+    Returns:
+        list: Les codes de langue, triés.
+    """
+    return sorted(
+        name[:-len(".json")]
+        for name in os.listdir(directory)
+        if name.endswith(".json") and name != f"{RESERVED_USERNAMES}.json"
+    )
+
+
+# Charge les listes de mots de plusieurs langues
+def load_word_lists(languages, directory=WORD_LISTS_DIR):
+    """
+    Charge les listes de mots interdits de plusieurs langues.
+
+    Args:
+        languages (iterable): Les codes de langue, par exemple ("fr", "en").
+        directory (str): Le répertoire des listes.
+
+    Returns:
+        list: Les mots de toutes les langues demandées.
+    """
+    words = []
+    for language in languages:
+        path = os.path.join(directory, f"{language}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                words.extend(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Erreur lors du chargement de la liste de mots {language}: {e}")
+    return words
+
+
+class ProfanityFilter:
+    """
+    Recherche de mots interdits dans les messages, par un automate d'Aho-Corasick.
+
+    Tous les mots sont compilés une seule fois en un automate : un message est
+    parcouru en un seul passage, en temps linéaire quelle que soit la taille des
+    listes. Le texte est normalisé à la volée (casse, accents, leetspeak, espaces
+    répétés) ; chaque caractère normalisé garde la position du caractère d'origine,
+    pour masquer le mot dans le message tel qu'il a été écrit.
+
+    Attributes:
+        patterns (int): Nombre de mots compilés.
+        scanned (int): Nombre de messages analysés.
+        scanned_bytes (int): Volume de texte analysé, en octets UTF-8.
+        matched (int): Nombre de messages contenant au moins un mot interdit.
+    """
+    def __init__(self, words):
+        """
+        Compile les mots en un automate.
+
+        Args:
+            words (iterable): Les mots ou expressions interdits.
+        """
+        self.goto = [{}]
+        self.outputs = [()]
+        self.patterns = 0
+        for word in set(fold_word(word) for word in words):
+            if word:
+                self.insert(word)
+        self.fail = self.build_failure_links()
+        self.lock = threading.Lock()
+        self.scanned = 0
+        self.scanned_bytes = 0
+        self.matched = 0
+
+    # Ajoute un mot au trie de l'automate
+    def insert(self, word):
+        state = 0
+        for char in word:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.outputs.append(())
+            state = next_state
+        self.outputs[state] = (len(word),)
+        self.patterns += 1
+
+    # Calcule les liens d'échec, en largeur
+    def build_failure_links(self):
+        fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = self.goto[fallback].get(char, 0)
+                # Les mots reconnus dans un état incluent ceux de son lien d'échec
+                self.outputs[next_state] += self.outputs[fail[next_state]]
+        return fail
+
+    # Retourne les positions des mots interdits d'un texte
+    def find(self, text, min_infix_length=None):
+        """
+        Retourne les passages d'un texte qui correspondent à un mot interdit.
+
+        Args:
+            text (str): Le texte à analyser.
+            min_infix_length (int, optional): Longueur à partir de laquelle un mot est
+                reconnu au milieu d'un autre. Par défaut, seuls les mots entiers le sont.
+
+        Returns:
+            list: Les passages (début, fin) dans le texte d'origine, triés et sans chevauchement.
+        """
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        folded, origins = fold_text(text)
+        candidates = []
+        state = 0
+        for end, c in enumerate(folded, 1):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            if outputs[state]:
+                candidates.extend((end - length, end) for length in outputs[state])
+
+        spans = []
+        for start, end in candidates:
+            if min_infix_length is not None and end - start >= min_infix_length:
+                spans.append((start, end) if origins is None else (origins[start], origins[end - 1] + 1))
+                continue
+            # Un mot d'une écriture à espaces doit être entier
+            if start > 0 and is_word_char(folded[start]) and is_word_char(folded[start - 1]):
+                continue
+            if end < len(folded) and is_word_char(folded[end - 1]) and is_word_char(folded[end]):
+                continue
+            if origins is None:
+                spans.append((start, end))
+            else:
+                spans.append((origins[start], origins[end - 1] + 1))
+
+        with self.lock:
+            self.scanned += 1
+            self.scanned_bytes += len(text.encode('utf-8'))
+            if spans:
+                self.matched += 1
+        return merge_spans(spans)
+
+    # Remplace les mots interdits par des astérisques
+    def mask(self, text, spans=None):
+        """
+        Remplace les mots interdits d'un texte par des astérisques.
+
+        Args:
+            text (str): Le texte.
+            spans (list, optional): Les passages déjà trouvés par find().
+
+        Returns:
+            str: Le texte masqué.
+        """
+        if spans is None:
+            spans = self.find(text)
+        parts = []
+        position = 0
+        for start, end in spans:
+            parts.append(text[position:start])
+            parts.append("*" * (end - start))
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
+
+    # Retourne les statistiques du filtre
+    def stats(self):
+        with self.lock:
+            return {
+                'patterns': self.patterns,
+                'states': len(self.goto),
+                'scanned': self.scanned,
+                'scanned_bytes': self.scanned_bytes,
+                'matched': self.matched,
+            }
+
+
+# Fusionne des passages qui se chevauchent
+def merge_spans(spans):
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class UsernameFilter:
+    """
+    Vérification des noms d'utilisateur à l'inscription.
+
+    Un nom est refusé s'il est réservé (reserved-username.json), ou s'il contient
+    un mot interdit de l'une des langues : entier, ou au milieu du nom pour les mots
+    d'au moins USERNAME_INFIX_LENGTH caractères ("JeSuisUnConnard"), sans refuser
+    "Constantin" pour "con". Les listes sont normalisées comme les messages.
+
+    Attributes:
+        reserved (frozenset): Les noms réservés, normalisés.
+        profanity_filter (ProfanityFilter): L'automate des mots interdits.
+    """
+    def __init__(self, reserved, words):
+        """
+        Compile les listes.
+
+        Args:
+            reserved (iterable): Les noms réservés.
+            words (iterable): Les mots interdits.
+        """
+        self.reserved = frozenset(fold_word(name) for name in reserved)
+        self.profanity_filter = ProfanityFilter(words)
+
+    # Vérifie un nom d'utilisateur
+    def check(self, username):
+        """
+        Vérifie qu'un nom d'utilisateur n'est ni réservé ni injurieux.
+
+        Args:
+            username (str): Le nom d'utilisateur.
+
+        Returns:
+            str or None: REASON_RESERVED ou REASON_OFFENSIVE si le nom est refusé, None sinon.
+        """
+        if fold_word(username) in self.reserved:
+            return REASON_RESERVED
+        if self.profanity_filter.find(username, USERNAME_INFIX_LENGTH):
+            return REASON_OFFENSIVE
+        return None
+
+
+# Retourne le filtre des noms d'utilisateur, compilé au premier appel
+def get_username_filter(directory=WORD_LISTS_DIR):
+    """
+    Retourne le filtre des noms d'utilisateur partagé par tout le processus.
+
+    Les listes de toutes les langues sont compilées au premier appel seulement.
+
+    Args:
+        directory (str): Le répertoire des listes.
+
+    Returns:
+        UsernameFilter: Le filtre.
+    """
+    global _username_filter
+    with _username_filter_lock:
+        if _username_filter is None:
+            _username_filter = UsernameFilter(
+                load_word_lists([RESERVED_USERNAMES], directory),
+                load_word_lists(available_languages(directory), directory),
+            )
+        return _username_filter
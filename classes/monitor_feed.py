@@ -0,0 +1,111 @@
+import time
+import threading
+from collections import deque
+
+
+# Nombre maximal de messages en attente d'affichage par canal ; au-delà, les plus anciens sont abandonnés
+MONITOR_CHANNEL_LINES = 500
+# Nombre maximal de messages retenus par canal et par seconde ; les suivants sont seulement comptés
+MONITOR_RATE = 100
+
+
+class MonitorFeed:
+    """
+    Flux des messages de discussion destiné à l'interface du serveur.
+
+    Les threads réseau y déposent chaque message sans attendre l'interface, qui
+    le vide à son rythme. Le flux est borné de deux façons :
+
+    - au-delà de `rate` messages par seconde sur un canal, les messages suivants
+      sont comptés mais pas gardés ;
+    - au-delà de `max_lines` messages en attente sur un canal, les plus anciens
+      sont abandonnés : une interface lente ou en pause ne voit que la fin.
+
+    Un dépôt coûte un verrou et un ajout à une deque, quel que soit l'état de
+    l'interface : elle ne peut pas ralentir la diffusion des messages. Sans
+    interface pour le lire (max_lines à 0), le flux ignore les messages.
+
+    Attributes:
+        max_lines (int): Nombre maximal de messages en attente par canal, 0 pour désactiver le flux.
+        rate (int): Nombre maximal de messages retenus par canal et par seconde.
+    """
+    def __init__(self, channels, max_lines=MONITOR_CHANNEL_LINES, rate=MONITOR_RATE):
+        """
+        Initialise le flux.
+
+        Args:
+            channels (iterable): Les canaux suivis.
+            max_lines (int): Nombre maximal de messages en attente par canal, 0 pour désactiver le flux.
+            rate (int): Nombre maximal de messages retenus par canal et par seconde.
+        """
+        self.max_lines = max_lines
+        self.rate = rate
+        self.lock = threading.Lock()
+        # canal -> messages en attente (instant de réception, message formaté)
+        self.pending = {channel: deque(maxlen=max_lines) for channel in channels}
+        # canal -> messages non retenus depuis le dernier vidage
+        self.skipped = dict.fromkeys(self.pending, 0)
+        # canal -> (seconde en cours, messages retenus pendant cette seconde)
+        self.windows = {}
+        self.published = 0
+        self.dropped = 0
+
+    # Dépose un message de discussion
+    def publish(self, channel, message):
+        """
+        Dépose un message de discussion, depuis n'importe quel thread.
+
+        Args:
+            channel (str): Le canal du message.
+            message (str): Le message formaté ("utilisateur:canal:message").
+        """
+        if not self.max_lines:
+            return
+        now = time.time()
+        second = int(now)
+        with self.lock:
+            pending = self.pending.get(channel)
+            if pending is None:
+                return
+            self.published += 1
+            window, count = self.windows.get(channel, (second, 0))
+            if window != second:
+                window, count = second, 0
+            if count >= self.rate:
+                self.skipped[channel] += 1
+                self.dropped += 1
+                return
+            self.windows[channel] = (window, count + 1)
+            if len(pending) == self.max_lines:
+                # Le plus ancien message en attente est abandonné par la deque
+                self.skipped[channel] += 1
+                self.dropped += 1
+            pending.append((now, message))
+
+    # Retire les messages en attente
+    def drain(self):
+        """
+        Retire les messages en attente de tous les canaux.
+
+        Returns:
+            dict: canal -> (messages (instant, message formaté) du plus ancien au plus récent,
+            nombre de messages non retenus depuis le dernier vidage), pour les canaux qui ont changé.
+        """
+        batch = {}
+        with self.lock:
+            for channel, pending in self.pending.items():
+                skipped = self.skipped[channel]
+                if pending or skipped:
+                    batch[channel] = (list(pending), skipped)
+                    pending.clear()
+                    self.skipped[channel] = 0
+        return batch
+
+    # Retourne les statistiques du flux
+    def stats(self):
+        with self.lock:
+            return {
+                'published': self.published,
+                'dropped': self.dropped,
+                'pending': sum(len(pending) for pending in self.pending.values()),
+            }
@@ -0,0 +1,202 @@
+import threading
+from collections import deque
+
+
+# Politiques appliquées lorsque la file d'un client est pleine
+POLICY_DROP_OLDEST = "drop_oldest"  # Le plus ancien message en attente est abandonné
+POLICY_DISCONNECT = "disconnect"    # Le client trop lent est déconnecté
+POLICY_BLOCK = "block"              # L'expéditeur attend que la file se vide
+OUTBOUND_POLICIES = (POLICY_DROP_OLDEST, POLICY_DISCONNECT, POLICY_BLOCK)
+
+# Nombre maximal de messages en attente d'envoi par client
+OUTBOUND_QUEUE_SIZE = 1000
+# Délai d'attente maximal d'un expéditeur avec la politique "block" (en secondes)
+BLOCK_TIMEOUT = 5.0
+# Nombre maximal de tampons passés à un appel sendmsg (IOV_MAX vaut 1024 sous Linux)
+MAX_IOV = 1024
+
+
+# Envoie une liste de tampons sur un socket sans les concaténer
+def send_buffers(sock, buffers):
+    """
+    Envoie une liste de tampons sur un socket bloquant, sans les concaténer.
+
+    Les tampons sont passés tels quels à sendmsg (écriture vectorisée) : un message
+    diffusé à plusieurs clients est partagé par toutes leurs files sans être copié.
+    Un envoi partiel est repris à partir d'un décalage dans le tampon en cours, par
+    une vue memoryview, sans copier le reste. Sans sendmsg (Windows), les tampons
+    sont concaténés avant l'envoi.
+
+    Args:
+        sock (socket): Le socket bloquant du client.
+        buffers (list): Les tampons à envoyer (bytes ou memoryview), dans l'ordre.
+    """
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(buffers))
+        return
+
+    views = [memoryview(buffer) for buffer in buffers]
+    index = 0
+    offset = 0
+    while index < len(views):
+        chunk = views[index:index + MAX_IOV]
+        if offset:
+            chunk[0] = chunk[0][offset:]
+        sent = sock.sendmsg(chunk)
+        # Avance dans les tampons du nombre d'octets effectivement envoyés
+        while sent:
+            remaining = len(views[index]) - offset
+            if sent < remaining:
+                offset += sent
+                break
+            sent -= remaining
+            index += 1
+            offset = 0
+
+
+class OutboundQueue:
+    """
+    File bornée des messages en attente d'envoi à un client.
+
+    Les messages y sont déposés par les expéditeurs et retirés par l'écrivain du
+    client, seul à écrire sur son socket : un client lent ne retarde que sa propre
+    file, jamais la diffusion aux autres clients.
+
+    Attributes:
+        policy (str): La politique appliquée lorsque la file est pleine (POLICY_*).
+        maxsize (int): Nombre maximal de messages en attente.
+        closed (bool): True une fois la file fermée ; les messages en attente sont abandonnés.
+    """
+    def __init__(self, policy=POLICY_DROP_OLDEST, maxsize=OUTBOUND_QUEUE_SIZE,
+                 block_timeout=BLOCK_TIMEOUT, on_ready=None):
+        """
+        Initialise une file vide.
+
+        Args:
+            policy (str): La politique appliquée lorsque la file est pleine (POLICY_*).
+            maxsize (int): Nombre maximal de messages en attente.
+            block_timeout (float): Délai d'attente maximal d'un expéditeur avec POLICY_BLOCK.
+            on_ready (callable, optional): Appelée après chaque dépôt et à la fermeture,
+                pour réveiller un écrivain qui n'attend pas sur get().
+        """
+        if policy not in OUTBOUND_POLICIES:
+            raise ValueError(f"Politique inconnue: {policy}")
+        self.policy = policy
+        self.maxsize = maxsize
+        self.block_timeout = block_timeout
+        self.on_ready = on_ready
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.queued = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    # Dépose un message dans la file
+    def put(self, data, block=True):
+        """
+        Dépose un message dans la file en appliquant la politique si elle est pleine.
+
+        Args:
+            data (bytes or memoryview): Les données à envoyer, partagées sans copie
+                entre les files des destinataires d'une diffusion.
+            block (bool): Avec POLICY_BLOCK, attendre qu'une place se libère. Sinon
+                le message est accepté au-delà de la limite et l'appelant doit
+                ralentir l'expéditeur lui-même.
+
+        Returns:
+            bool: False si le client doit être déconnecté, True sinon.
+        """
+        with self.condition:
+            if self.closed:
+                return False
+            if len(self.items) >= self.maxsize:
+                if self.policy == POLICY_DROP_OLDEST:
+                    self.items.popleft()
+                    self.dropped += 1
+                elif self.policy == POLICY_DISCONNECT:
+                    self._close()
+                    return False
+                elif block:
+                    has_room = self.condition.wait_for(
+                        lambda: self.closed or len(self.items) < self.maxsize, self.block_timeout
+                    )
+                    if not has_room or self.closed:
+                        self._close()
+                        return False
+            self.items.append(data)
+            self.queued += 1
+            self.max_depth = max(self.max_depth, len(self.items))
+            self.condition.notify_all()
+        if self.on_ready:
+            self.on_ready()
+        return True
+
+    # Retire tous les messages en attente, en attendant qu'il y en ait
+    def get(self):
+        """
+        Retire tous les messages en attente, en attendant qu'il y en ait au moins un.
+
+        Returns:
+            list: Les messages, dans l'ordre de dépôt, ou une liste vide si la file est fermée.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.closed or self.items)
+            return self._take()
+
+    # Retire tous les messages en attente, sans attendre
+    def take(self):
+        """
+        Retire tous les messages en attente, sans attendre.
+
+        Returns:
+            list: Les messages, dans l'ordre de dépôt, ou une liste vide si la file est fermée.
+        """
+        with self.condition:
+            return self._take()
+
+    def _take(self):
+        if self.closed:
+            return []
+        items = list(self.items)
+        self.items.clear()
+        # Les expéditeurs bloqués peuvent reprendre
+        self.condition.notify_all()
+        return items
+
+    # Indique si la file a atteint sa taille maximale
+    def congested(self):
+        return len(self.items) >= self.maxsize
+
+    # Ferme la file
+    def close(self):
+        """
+        Ferme la file : les messages en attente sont abandonnés et l'écrivain s'arrête.
+        """
+        with self.condition:
+            self._close()
+        if self.on_ready:
+            self.on_ready()
+
+    def _close(self):
+        self.closed = True
+        self.items.clear()
+        self.condition.notify_all()
+
+    # Retourne les statistiques de la file
+    def stats(self):
+        """
+        Retourne les statistiques de la file.
+
+        Returns:
+            dict: Profondeur actuelle et maximale, messages déposés et abandonnés.
+        """
+        return {
+            'depth': len(self.items),
+            'max_depth': self.max_depth,
+            'queued': self.queued,
+            'dropped': self.dropped,
+        }
@@ -0,0 +1,280 @@
+import struct
+
+# Version du protocole encadré, envoyée dans l'en-tête de chaque trame
+PROTOCOL_VERSION = 1
+
+# Modes de communication entre le client et le serveur
+PROTOCOL_FRAMED = "framed"
+PROTOCOL_TEXT = "text"
+
+# Types de trames
+MSG_HELLO = 0      # Client -> serveur : identifiants ou jeton de session, première trame de la connexion
+MSG_CHAT = 1       # Message de discussion ("canal:message" ou "utilisateur:canal:message")
+MSG_HISTORY = 2    # Serveur -> client : page d'historique d'un canal
+MSG_NOTICE = 3     # Serveur -> client : message du serveur
+MSG_COMMAND = 4    # Client -> serveur : commande
+MSG_AUTH = 5       # Serveur -> client : résultat de l'authentification, réponse à MSG_HELLO
+
+MESSAGE_TYPES = (MSG_HELLO, MSG_CHAT, MSG_HISTORY, MSG_NOTICE, MSG_COMMAND, MSG_AUTH)
+
+# Modes d'authentification d'une trame MSG_HELLO
+AUTH_PASSWORD = "password"     # "password\t<utilisateur>\t<mot de passe>"
+AUTH_TOKEN = "token"           # "token\t<jeton>" : reprise d'une session
+AUTH_NONE = "none"             # "<utilisateur>" : ancien format, sans authentification
+# Réponses d'authentification (charge utile de MSG_AUTH)
+AUTH_OK = "ok"                 # "ok\t<utilisateur>\t<jeton>"
+AUTH_ERROR = "error"           # "error\t<message>"
+
+# En-tête : version (1 octet), type (1 octet), longueur de la charge utile (4 octets, big-endian)
+HEADER = struct.Struct("!BBI")
+# Taille maximale acceptée pour la charge utile d'une trame
+MAX_FRAME_SIZE = 1 << 20
+# Nombre de messages par page d'historique
+HISTORY_PAGE_SIZE = 50
+
+# Canaux de discussion proposés par le serveur et les clients
+CHANNELS = ("Général", "Blabla", "Comptabilité", "Informatique", "Marketing")
+
+
+class ProtocolError(Exception):
+    """
+    Erreur levée lorsqu'un pair envoie une trame invalide.
+    """
+
+
+# Encode une trame à partir de son type et de sa charge utile
+def encode_frame(msg_type, payload):
+    """
+    Encode une trame à partir de son type et de sa charge utile.
+
+    Args:
+        msg_type (int): Le type de la trame (MSG_*).
+        payload (str or bytes): La charge utile, encodée en UTF-8 si c'est du texte.
+
+    Returns:
+        bytes: La trame prête à être envoyée.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Trame trop grande: {len(payload)} octets")
+    return HEADER.pack(PROTOCOL_VERSION, msg_type, len(payload)) + payload
+
+
+# Encode un message pour un client selon son mode de communication
+def encode_message(protocol, msg_type, message):
+    """
+    Encode un message pour un pair selon son mode de communication.
+
+    En mode texte, le type est ignoré et le message est envoyé tel quel,
+    comme avant l'introduction du protocole encadré.
+
+    Args:
+        protocol (str): PROTOCOL_FRAMED ou PROTOCOL_TEXT.
+        msg_type (int): Le type de la trame (MSG_*).
+        message (str): Le message à encoder.
+
+    Returns:
+        bytes: Les données à envoyer.
+    """
+    if protocol == PROTOCOL_FRAMED:
+        return encode_frame(msg_type, message)
+    return message.encode('utf-8')
+
+
+# Encode la première trame d'une connexion
+def encode_hello(username=None, password=None, token=None):
+    """
+    Encode la charge utile de la trame MSG_HELLO.
+
+    Args:
+        username (str, optional): Le nom d'utilisateur.
+        password (str, optional): Le mot de passe, pour une première connexion.
+        token (str, optional): Le jeton de session, pour reprendre une session.
+
+    Returns:
+        str: La charge utile de la trame.
+    """
+    if token:
+        return f"{AUTH_TOKEN}\t{token}"
+    if password is not None:
+        return f"{AUTH_PASSWORD}\t{username}\t{password}"
+    return username
+
+
+# Décode la première trame d'une connexion
+def decode_hello(payload):
+    """
+    Décode la charge utile d'une trame MSG_HELLO produite par encode_hello().
+
+    Args:
+        payload (str): La charge utile.
+
+    Returns:
+        tuple: (AUTH_PASSWORD, utilisateur, mot de passe), (AUTH_TOKEN, jeton, None)
+        ou (AUTH_NONE, utilisateur, None).
+    """
+    kind, separator, rest = payload.partition("\t")
+    if separator and kind == AUTH_PASSWORD:
+        username, _, password = rest.partition("\t")
+        return AUTH_PASSWORD, username, password
+    if separator and kind == AUTH_TOKEN:
+        return AUTH_TOKEN, rest, None
+    return AUTH_NONE, payload, None
+
+
+# Encode la réponse du serveur à la première trame
+def encode_auth_reply(username=None, token=None, error=None):
+    """
+    Encode la charge utile de la trame MSG_AUTH.
+
+    Args:
+        username (str, optional): Le nom d'utilisateur authentifié.
+        token (str, optional): Le jeton de session délivré.
+        error (str, optional): Le motif du refus ; la connexion est alors fermée.
+
+    Returns:
+        str: La charge utile de la trame.
+    """
+    if error is not None:
+        return f"{AUTH_ERROR}\t{error}"
+    return f"{AUTH_OK}\t{username}\t{token or ''}"
+
+
+# Décode la réponse du serveur à la première trame
+def decode_auth_reply(payload):
+    """
+    Décode la charge utile d'une trame MSG_AUTH produite par encode_auth_reply().
+
+    Args:
+        payload (str): La charge utile.
+
+    Returns:
+        tuple: (True, utilisateur, jeton ou None) ou (False, motif du refus, None).
+    """
+    status, _, rest = payload.partition("\t")
+    if status == AUTH_OK:
+        username, _, token = rest.partition("\t")
+        return True, username, token or None
+    return False, rest, None
+
+
+# Encode une page d'historique d'un canal
+def encode_history_page(channel, cursor, lines):
+    """
+    Encode une page d'historique d'un canal, charge utile d'une trame MSG_HISTORY.
+
+    La première ligne contient le canal et le curseur de la page suivante,
+    séparés par une tabulation ; les lignes suivantes sont les messages, du plus
+    ancien au plus récent.
+
+    Args:
+        channel (str): Le canal de la page.
+        cursor (int): L'identifiant à passer pour obtenir les messages plus anciens,
+            ou 0 s'il n'y en a plus.
+        lines (list): Les messages formatés, du plus ancien au plus récent.
+
+    Returns:
+        str: La charge utile de la trame.
+    """
+    return "\n".join([f"{channel}\t{cursor}"] + list(lines))
+
+
+# Décode une page d'historique d'un canal
+def decode_history_page(payload):
+    """
+    Décode une page d'historique produite par encode_history_page().
+
+    Args:
+        payload (str): La charge utile de la trame MSG_HISTORY.
+
+    Returns:
+        tuple: (canal, curseur de la page suivante, liste des messages formatés).
+
+    Raises:
+        ProtocolError: Si l'en-tête de la page est invalide.
+    """
+    header, _, body = payload.partition("\n")
+    channel, _, cursor = header.partition("\t")
+    try:
+        cursor = int(cursor)
+    except ValueError:
+        raise ProtocolError(f"En-tête de page d'historique invalide: {header!r}")
+    return channel, cursor, body.split("\n") if body else []
+
+
+# Détermine le mode de communication d'un client à partir de ses premiers octets
+def detect_protocol(data):
+    """
+    Détermine le mode de communication d'un client à partir de ses premiers octets.
+
+    Une connexion encadrée commence par l'octet de version, qui n'est pas un
+    caractère imprimable, alors qu'une connexion texte commence par "Username:".
+
+    Args:
+        data (bytes): Les premiers octets reçus du client.
+
+    Returns:
+        str: PROTOCOL_FRAMED ou PROTOCOL_TEXT.
+    """
+    if data and data[0] == PROTOCOL_VERSION:
+        return PROTOCOL_FRAMED
+    return PROTOCOL_TEXT
+
+
+class FrameDecoder:
+    """
+    Décodeur incrémental de trames.
+
+    Les données reçues sont accumulées dans un unique bytearray : une lecture
+    partielle attend la suite, et plusieurs trames reçues d'un coup sont toutes
+    retournées. Les octets consommés sont retirés une seule fois par appel à
+    feed(), ce qui évite les concaténations quadratiques.
+
+    Attributes:
+        buffer (bytearray): Les octets reçus et pas encore décodés.
+    """
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        """
+        Initialise le décodeur.
+
+        Args:
+            max_frame_size (int): Taille maximale acceptée pour une charge utile.
+        """
+        self.buffer = bytearray()
+        self.max_frame_size = max_frame_size
+
+    # Ajoute des octets reçus et retourne les trames complètes
+    def feed(self, data):
+        """
+        Ajoute des octets reçus et retourne les trames complètes.
+
+        Args:
+            data (bytes): Les octets reçus du pair.
+
+        Returns:
+            list: Les trames complètes, sous forme de tuples (type, charge utile en bytes).
+
+        Raises:
+            ProtocolError: Si une trame a une version, un type ou une taille invalide.
+        """
+        buffer = self.buffer
+        buffer += data
+        frames = []
+        offset = 0
+        while len(buffer) - offset >= HEADER.size:
+            version, msg_type, length = HEADER.unpack_from(buffer, offset)
+            if version != PROTOCOL_VERSION:
+                raise ProtocolError(f"Version de protocole non supportée: {version}")
+            if msg_type not in MESSAGE_TYPES:
+                raise ProtocolError(f"Type de trame inconnu: {msg_type}")
+            if length > self.max_frame_size:
+                raise ProtocolError(f"Trame trop grande: {length} octets")
+            end = offset + HEADER.size + length
+            if end > len(buffer):
+                break
+            frames.append((msg_type, bytes(buffer[offset + HEADER.size:end])))
+            offset = end
+        if offset:
+            del buffer[:offset]
+        return frames
@@ -0,0 +1,35 @@
+class ServerEvents:
+    """
+    Récepteur des événements du serveur.
+
+    Le serveur ne dépend d'aucune interface : l'interface Qt, le mode sans
+    interface ou un outil de supervision s'abonnent avec
+    ServerBackend.add_event_sink() et redéfinissent les méthodes utiles ; les
+    autres sont sans effet.
+
+    Les méthodes sont appelées depuis les threads réseau du serveur (ou sa boucle
+    asyncio) : elles doivent rendre la main rapidement. Les messages de
+    discussion ne passent pas par ici mais par le flux borné ServerBackend.monitor.
+    """
+
+    # Un client a terminé sa poignée de main
+    def client_connected(self, username, address):
+        """
+        Args:
+            username (str): Le nom d'utilisateur du client.
+            address (tuple): L'adresse du client.
+        """
+
+    # Un client s'est déconnecté
+    def client_disconnected(self, username, address):
+        """
+        Args:
+            username (str): Le nom d'utilisateur du client.
+            address (tuple): L'adresse du client.
+        """
+
+    # Le serveur est arrêté
+    def server_stopped(self):
+        """
+        Appelé une fois, après la fermeture des connexions.
+        """
@@ -0,0 +1,148 @@
+import os
+import hmac
+import time
+import base64
+import hashlib
+import threading
+from classes.ban_list import normalize_username
+
+
+# Durée de validité d'un jeton de session (en secondes)
+SESSION_TTL = 24 * 3600
+
+
+# Encode des octets en base64 sans remplissage, utilisable dans une URL
+def b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode('ascii')
+
+
+# Décode une chaîne produite par b64encode()
+def b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SessionTokens:
+    """
+    Jetons de session signés, délivrés après une authentification par mot de passe.
+
+    Un jeton contient le nom d'utilisateur, ses canaux accessibles, sa date
+    d'émission et sa date d'expiration, signés par HMAC-SHA256 avec le secret du
+    serveur. Sa vérification ne consulte ni la base de données ni bcrypt : un
+    calcul de HMAC, une comparaison de dates et une recherche dans un dictionnaire.
+
+    La révocation (au bannissement) enregistre l'instant à partir duquel les
+    jetons déjà émis pour un utilisateur sont refusés.
+
+    Attributes:
+        secret (bytes): La clé de signature, partagée par les processus et nœuds qui
+            doivent accepter les mêmes jetons.
+        ttl (float): Durée de validité d'un jeton, en secondes.
+    """
+    def __init__(self, secret=None, ttl=SESSION_TTL, clock=time.time):
+        """
+        Initialise le service.
+
+        Args:
+            secret (str or bytes, optional): La clé de signature. Une clé aléatoire est
+                générée par défaut : les jetons ne survivent alors pas au redémarrage.
+            ttl (float): Durée de validité d'un jeton, en secondes.
+            clock (callable): Retourne l'heure courante en secondes ; remplacée dans les tests.
+        """
+        if secret is None:
+            secret = os.urandom(32)
+        elif isinstance(secret, str):
+            secret = secret.encode('utf-8')
+        self.secret = secret
+        self.ttl = ttl
+        self.clock = clock
+        self.revoked_before = {}
+        self.lock = threading.Lock()
+        self.issued = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    # Signe des données
+    def sign(self, data):
+        return hmac.new(self.secret, data, hashlib.sha256).digest()
+
+    # Délivre un jeton pour un utilisateur authentifié
+    def issue(self, username, channels=()):
+        """
+        Délivre un jeton de session.
+
+        Args:
+            username (str): Le nom d'utilisateur authentifié.
+            channels (tuple): Les canaux accessibles à l'utilisateur, rendus à la reprise de la session.
+
+        Returns:
+            str: Le jeton.
+        """
+        issued_at = self.clock()
+        data = f"{issued_at:.6f}\n{issued_at + self.ttl:.3f}\n{','.join(channels)}\n{username}".encode('utf-8')
+        with self.lock:
+            self.issued += 1
+        return f"{b64encode(data)}.{b64encode(self.sign(data))}"
+
+    # Vérifie un jeton et retourne son utilisateur
+    def verify(self, token):
+        """
+        Vérifie un jeton de session.
+
+        Args:
+            token (str): Le jeton présenté par le client.
+
+        Returns:
+            tuple or None: (nom d'utilisateur, canaux accessibles), ou None si le jeton
+            est invalide, expiré ou révoqué.
+        """
+        session = self.check(token)
+        with self.lock:
+            if session is None:
+                self.rejected += 1
+            else:
+                self.accepted += 1
+        return session
+
+    # Vérifie la signature, l'expiration et la révocation d'un jeton
+    def check(self, token):
+        encoded_data, _, encoded_signature = token.partition(".")
+        try:
+            data = b64decode(encoded_data)
+            signature = b64decode(encoded_signature)
+        except ValueError:
+            return None
+        # Comparaison en temps constant : la durée ne révèle pas la signature attendue
+        if not hmac.compare_digest(signature, self.sign(data)):
+            return None
+        issued_at, expires_at, channels, username = data.decode('utf-8').split("\n", 3)
+        if float(expires_at) < self.clock():
+            return None
+        if float(issued_at) <= self.revoked_before.get(normalize_username(username), 0.0):
+            return None
+        return username, tuple(channel for channel in channels.split(",") if channel)
+
+    # Révoque les jetons déjà émis pour un utilisateur
+    def revoke(self, username):
+        """
+        Révoque tous les jetons déjà émis pour un utilisateur.
+
+        Args:
+            username (str): Le nom d'utilisateur.
+        """
+        now = self.clock()
+        with self.lock:
+            # Au-delà de leur durée de validité, les révocations sont inutiles
+            expired = [name for name, revoked_at in self.revoked_before.items() if revoked_at < now - self.ttl]
+            for name in expired:
+                del self.revoked_before[name]
+            self.revoked_before[normalize_username(username)] = now
+
+    # Retourne les statistiques du service
+    def stats(self):
+        with self.lock:
+            return {
+                'issued': self.issued,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'revoked': len(self.revoked_before),
+            }
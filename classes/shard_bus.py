@@ -0,0 +1,265 @@
+import os
+import json
+import socket
+import tempfile
+import threading
+
+
+# Taille lue en une fois sur une connexion du bus
+BUS_READ_SIZE = 65536
+
+
+# Indique si le système permet de lancer plusieurs processus sur le même port
+def sharding_supported():
+    """
+    Indique si le système permet de répartir le serveur sur plusieurs processus.
+
+    Il faut des sockets Unix pour le bus et l'option SO_REUSEPORT pour que
+    plusieurs processus écoutent sur le même port (Linux, macOS, BSD).
+
+    Returns:
+        bool: True si le mode multi-processus est disponible.
+    """
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "SO_REUSEPORT")
+
+
+# Retourne un chemin libre pour le socket Unix du bus
+def default_bus_path():
+    """
+    Retourne le chemin du socket Unix du bus, propre au processus courant.
+
+    Returns:
+        str: Le chemin du socket.
+    """
+    return os.path.join(tempfile.gettempdir(), f"pychat-bus-{os.getpid()}.sock")
+
+
+# Encode un événement du bus
+def encode_event(event):
+    # json.dumps échappe les sauts de ligne : une ligne par événement
+    return (json.dumps(event, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+# Découpe les données reçues en événements
+class EventDecoder:
+    """
+    Décodeur incrémental des événements du bus, un objet JSON par ligne.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Ajoute des octets reçus et retourne les événements complets.
+
+        Args:
+            data (bytes): Les octets reçus.
+
+        Returns:
+            list: Les événements (dict).
+        """
+        self.buffer += data
+        events = []
+        start = 0
+        while True:
+            end = self.buffer.find(b"\n", start)
+            if end == -1:
+                break
+            events.append(json.loads(self.buffer[start:end]))
+            start = end + 1
+        if start:
+            del self.buffer[:start]
+        return events
+
+
+class BusPeer:
+    """
+    Connexion au bus, côté processus de travail.
+
+    Les événements publiés par ce processus sont envoyés au concentrateur, qui les
+    relaie aux autres processus ; les événements reçus sont transmis à `on_event`.
+
+    Attributes:
+        path (str): Le chemin du socket Unix du concentrateur.
+        on_event (callable): Appelée avec chaque événement reçu.
+    """
+    def __init__(self, path, on_event):
+        """
+        Se connecte au concentrateur du bus.
+
+        Args:
+            path (str): Le chemin du socket Unix du concentrateur.
+            on_event (callable): Appelée avec chaque événement reçu.
+        """
+        self.path = path
+        self.on_event = on_event
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.send_lock = threading.Lock()
+        self.published = 0
+        self.received = 0
+
+    # Publie un événement vers les autres processus
+    def publish(self, event):
+        """
+        Publie un événement vers les autres processus.
+
+        Args:
+            event (dict): L'événement, sérialisable en JSON.
+        """
+        data = encode_event(event)
+        try:
+            with self.send_lock:
+                self.sock.sendall(data)
+            self.published += 1
+        except OSError as e:
+            print(f"Erreur lors de la publication sur le bus: {e}")
+
+    # Les canaux ne sont pas répartis entre processus : chacun enregistre ses messages
+    def owner_of(self, channel):
+        return None
+
+    # Reçoit les événements jusqu'à la fermeture du bus
+    def run(self):
+        """
+        Reçoit les événements et les transmet à `on_event`, jusqu'à la fermeture du bus.
+        """
+        decoder = EventDecoder()
+        while True:
+            try:
+                data = self.sock.recv(BUS_READ_SIZE)
+            except OSError:
+                break
+            if not data:
+                break
+            for event in decoder.feed(data):
+                self.received += 1
+                try:
+                    self.on_event(event)
+                except Exception as e:
+                    print(f"Erreur lors du traitement d'un événement du bus: {e}")
+
+    # Ferme la connexion au bus
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    # Retourne les statistiques de la connexion
+    def stats(self):
+        return {'published': self.published, 'received': self.received}
+
+
+class BusHub:
+    """
+    Concentrateur du bus, dans le processus principal.
+
+    Chaque processus de travail s'y connecte par un socket Unix ; un événement
+    reçu d'un processus est relayé à tous les autres, puis transmis à `on_event`
+    dans le processus principal.
+
+    Attributes:
+        path (str): Le chemin du socket Unix.
+        on_event (callable): Appelée avec chaque événement reçu d'un processus.
+        peers (dict): Les connexions des processus, avec leur verrou d'envoi.
+    """
+    def __init__(self, on_event, path=None):
+        """
+        Initialise le concentrateur.
+
+        Args:
+            on_event (callable): Appelée avec chaque événement reçu d'un processus.
+            path (str, optional): Le chemin du socket Unix.
+        """
+        self.path = path or default_bus_path()
+        self.on_event = on_event
+        self.sock = None
+        self.peers = {}
+        self.lock = threading.Lock()
+        self.relayed = 0
+
+    # Ouvre le socket du bus et accepte les processus
+    def start(self):
+        """
+        Ouvre le socket Unix du bus et commence à accepter les processus de travail.
+        """
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        self.sock.listen()
+        threading.Thread(target=self.accept_peers, name="bus-accept", daemon=True).start()
+
+    # Accepte les connexions des processus de travail
+    def accept_peers(self):
+        while True:
+            try:
+                peer, _ = self.sock.accept()
+            except OSError:
+                break
+            with self.lock:
+                self.peers[peer] = threading.Lock()
+            threading.Thread(target=self.read_peer, args=(peer,), name="bus-peer", daemon=True).start()
+
+    # Reçoit les événements d'un processus et les relaie
+    def read_peer(self, peer):
+        decoder = EventDecoder()
+        while True:
+            try:
+                data = peer.recv(BUS_READ_SIZE)
+            except OSError:
+                break
+            if not data:
+                break
+            for event in decoder.feed(data):
+                self.publish(event, source=peer)
+                try:
+                    self.on_event(event)
+                except Exception as e:
+                    print(f"Erreur lors du traitement d'un événement du bus: {e}")
+        with self.lock:
+            self.peers.pop(peer, None)
+        peer.close()
+
+    # Publie un événement vers les processus de travail
+    def publish(self, event, source=None):
+        """
+        Publie un événement vers tous les processus de travail, sauf sa source.
+
+        Args:
+            event (dict): L'événement, sérialisable en JSON.
+            source (socket, optional): La connexion du processus qui l'a publié.
+        """
+        data = encode_event(event)
+        with self.lock:
+            peers = [(peer, lock) for peer, lock in self.peers.items() if peer is not source]
+        for peer, lock in peers:
+            try:
+                with lock:
+                    peer.sendall(data)
+                self.relayed += 1
+            except OSError as e:
+                print(f"Erreur lors du relais sur le bus: {e}")
+
+    # Ferme le bus
+    def close(self):
+        """
+        Ferme le socket du bus et les connexions des processus de travail.
+        """
+        if self.sock is not None:
+            self.sock.close()
+        with self.lock:
+            peers = list(self.peers)
+        for peer in peers:
+            try:
+                peer.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    # Retourne les statistiques du bus
+    def stats(self):
+        return {'peers': len(self.peers), 'relayed': self.relayed}
@@ -1,11 +1,30 @@
 # Importations nécessaires de PyQt5 et autres bibliothèques
-from classes.login import Login
+from classes.login import Login, BCRYPT_ROUNDS
+from classes.message_list import MAX_CHANNEL_MESSAGES
 import sys
+import argparse
 from PyQt5.QtWidgets import QApplication, QStackedWidget
 from PyQt5.QtGui import QIcon
 
+# Analyse les arguments de la ligne de commande
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Client PyChat")
+    parser.add_argument("--bcrypt-rounds", type=int, default=BCRYPT_ROUNDS,
+                        help="Facteur de coût de bcrypt des comptes créés (4 à 31, voir benchmarks/bcrypt_bench.py)")
+    parser.add_argument("--max-messages", type=int, default=MAX_CHANNEL_MESSAGES,
+                        help="Nombre maximal de messages gardés en mémoire et affichés par canal")
+    # Les arguments inconnus sont laissés à Qt
+    args, _ = parser.parse_known_args(argv)
+    return args
+
 # Vérification si le script est exécuté comme programme principal et non importé comme un module
 if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    if not 4 <= args.bcrypt_rounds <= 31:
+        sys.exit("--bcrypt-rounds doit être compris entre 4 et 31.")
+    if args.max_messages < 1:
+        sys.exit("--max-messages doit être positif.")
+
     # Création d'une instance de l'application Qt. sys.argv permet de gérer les arguments en ligne de commande
     app = QApplication(sys.argv)
 
@@ -16,7 +35,7 @@ if __name__ == '__main__':
     widget = QStackedWidget()
 
     # Création d'une instance de la fenêtre de connexion, en passant le widget empilé en paramètre
-    mainwindow = Login(widget) 
+    mainwindow = Login(widget, args.bcrypt_rounds, args.max_messages)
 
     # Ajout de la fenêtre de connexion au widget empilé
     widget.addWidget(mainwindow)
@@ -0,0 +1,186 @@
+# Outil de migration du schéma de la base de données SAE (voir SAE.sql)
+import sys
+import time
+import argparse
+import mysql.connector
+from mysql.connector import Error
+
+
+# Nombre de lignes traitées par lot lors du remplissage
+CHUNK_SIZE = 5000
+# Pause entre deux lots, pour laisser passer les écritures du serveur (en secondes)
+CHUNK_PAUSE = 0.05
+
+
+# Vérifie l'existence d'une colonne
+def column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+        (table, column),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+# Vérifie l'existence d'un index
+def index_exists(cursor, table, index):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+        (table, index),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+# Ajoute la colonne channel à la table messages
+def add_channel_column(cursor):
+    """
+    Ajoute la colonne channel à la table messages.
+
+    ALGORITHM=INSTANT ne modifie que le dictionnaire de données (MySQL 8.0.12+) ;
+    sur les versions plus anciennes, la colonne est ajoutée en ligne.
+    """
+    if column_exists(cursor, "messages", "channel"):
+        return False
+    try:
+        cursor.execute("ALTER TABLE messages ADD COLUMN channel VARCHAR(64) NULL AFTER username, ALGORITHM=INSTANT")
+    except Error:
+        cursor.execute("ALTER TABLE messages ADD COLUMN channel VARCHAR(64) NULL AFTER username, ALGORITHM=INPLACE, LOCK=NONE")
+    return True
+
+
+# Ajoute l'index (channel, message_id) à la table messages
+def add_channel_index(cursor):
+    """
+    Ajoute l'index (channel, message_id) parcouru par la pagination de l'historique.
+
+    Le curseur des pages est un message_id : la requête commence au curseur dans
+    l'index et ne lit qu'une page, quelle que soit sa profondeur. L'index est
+    construit en ligne : les lectures et écritures continuent pendant la construction.
+    """
+    if index_exists(cursor, "messages", "idx_messages_channel_id"):
+        return False
+    cursor.execute(
+        "ALTER TABLE messages ADD INDEX idx_messages_channel_id (channel, message_id), "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    return True
+
+
+# Remplit la colonne channel des messages existants
+def backfill_channel(cursor, chunk_size=CHUNK_SIZE, pause=CHUNK_PAUSE):
+    """
+    Remplit la colonne channel des messages enregistrés au format "canal:message".
+
+    Les lignes sont traitées par plages de message_id : chaque lot est une courte
+    transaction qui ne verrouille que ses propres lignes, et la table reste
+    utilisable pendant toute la durée du remplissage. La migration peut être
+    relancée : seules les lignes dont channel est encore NULL sont modifiées.
+    """
+    cursor.execute("SELECT MIN(message_id), MAX(message_id) FROM messages WHERE channel IS NULL")
+    first_id, last_id = cursor.fetchone()
+    if first_id is None:
+        return False
+
+    updated = 0
+    for start in range(first_id, last_id + 1, chunk_size):
+        cursor.execute(
+            "UPDATE messages "
+            "SET channel = SUBSTRING_INDEX(content, ':', 1), content = SUBSTRING(content, LOCATE(':', content) + 1) "
+            "WHERE message_id BETWEEN %s AND %s AND channel IS NULL AND LOCATE(':', content) > 0",
+            (start, start + chunk_size - 1),
+        )
+        updated += cursor.rowcount
+        print(f"  messages {start}-{min(start + chunk_size - 1, last_id)} : {updated} lignes mises à jour")
+        time.sleep(pause)
+    return True
+
+
+# Ajoute la colonne username_lower à la table user
+def add_username_lower_column(cursor):
+    """
+    Ajoute la colonne générée username_lower, le nom d'utilisateur en minuscules.
+
+    La colonne est virtuelle : elle n'est pas stockée dans les lignes, et son
+    ajout ne modifie que le dictionnaire de données. Seul son index est stocké.
+    """
+    if column_exists(cursor, "user", "username_lower"):
+        return False
+    cursor.execute(
+        "ALTER TABLE user ADD COLUMN username_lower VARCHAR(255) GENERATED ALWAYS AS (LOWER(username)) VIRTUAL, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    return True
+
+
+# Ajoute l'index unique sur username_lower
+def add_username_lower_index(cursor):
+    """
+    Ajoute l'index unique sur username_lower, utilisé par la vérification des noms
+    à l'inscription et qui refuse deux comptes de même nom.
+
+    L'index est construit en ligne. Les doublons existants doivent d'abord être
+    renommés : ils sont listés et la migration s'arrête.
+    """
+    if index_exists(cursor, "user", "uq_user_username_lower"):
+        return False
+    cursor.execute(
+        "SELECT username_lower, COUNT(*) FROM user WHERE username_lower IS NOT NULL "
+        "GROUP BY username_lower HAVING COUNT(*) > 1 LIMIT 20"
+    )
+    duplicates = cursor.fetchall()
+    if duplicates:
+        names = ", ".join(f"{name} ({count})" for name, count in duplicates)
+        raise Error(msg=f"noms d'utilisateur en double, à renommer avant de créer l'index: {names}")
+    cursor.execute(
+        "ALTER TABLE user ADD UNIQUE INDEX uq_user_username_lower (username_lower), ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    return True
+
+
+# Étapes de migration, dans l'ordre d'exécution. Chaque étape est idempotente.
+MIGRATIONS = [
+    add_channel_column,
+    add_channel_index,
+    backfill_channel,
+    add_username_lower_column,
+    add_username_lower_index,
+]
+
+
+# Analyse les arguments de la ligne de commande
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Migration du schéma de la base de données SAE")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="votre_mot_de_passe")
+    parser.add_argument("--database", default="SAE")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Lignes par lot de remplissage")
+    parser.add_argument("--pause", type=float, default=CHUNK_PAUSE, help="Pause entre deux lots, en secondes")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    connection = mysql.connector.connect(
+        host=args.host, user=args.user, password=args.password, database=args.database, autocommit=True
+    )
+    cursor = connection.cursor()
+    try:
+        for migration in MIGRATIONS:
+            print(f"{migration.__name__}...")
+            if migration is backfill_channel:
+                applied = migration(cursor, args.chunk_size, args.pause)
+            else:
+                applied = migration(cursor)
+            print("  appliquée" if applied else "  déjà à jour")
+    except Error as e:
+        print(f"Erreur lors de la migration: {e}")
+        sys.exit(1)
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
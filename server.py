@@ -1,10 +1,50 @@
+import os
 import socket
 import threading
-from PyQt5.QtCore import pyqtSignal, QObject, pyqtSlot
-from PyQt5.QtWidgets import QApplication
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from mysql.connector import Error
 import time
-import mysql.connector
+import bcrypt
+from classes.ban_list import BanList, normalize_username
+from classes.channel_index import ChannelIndex, allowed_channels
+from classes.client_registry import ClientRegistry
+from classes.db_pool import get_pool
+from classes.history_cache import HistoryCache, HISTORY_CACHE_SIZE
+from classes.login_throttle import (
+    NegativeCache, RateLimiter, SOURCE_BURST, SOURCE_RATE, USERNAME_BURST, USERNAME_RATE,
+)
+from classes.message_ids import MessageIdAllocator
+from classes.message_writer import MessageWriter
+from classes.monitor_feed import MonitorFeed, MONITOR_CHANNEL_LINES, MONITOR_RATE
+from classes.outbound_queue import OutboundQueue, OUTBOUND_QUEUE_SIZE, POLICY_DROP_OLDEST, send_buffers
+from classes.metrics import LatencyStats
+from classes.moderation import (
+    ProfanityFilter, load_word_lists, ACTION_DROP, ACTION_FLAG, ACTION_MASK, ACTION_OFF, DEFAULT_LANGUAGES,
+)
+from classes.protocol import (
+    FrameDecoder, ProtocolError, decode_hello, detect_protocol, encode_auth_reply, encode_frame,
+    encode_history_page, encode_message, AUTH_NONE, AUTH_PASSWORD, AUTH_TOKEN, CHANNELS, HISTORY_PAGE_SIZE,
+    MSG_AUTH, MSG_CHAT, MSG_COMMAND, MSG_HELLO, MSG_HISTORY, MSG_NOTICE, PROTOCOL_FRAMED, PROTOCOL_TEXT,
+)
+from classes.session_tokens import SessionTokens, SESSION_TTL
+
+
+# Délai maximal pour recevoir le nom d'utilisateur d'un nouveau client (en secondes)
+HANDSHAKE_TIMEOUT = 5.0
+# Nombre de poignées de main traitées en parallèle
+HANDSHAKE_WORKERS = 32
+# Nombre maximal de transmissions d'un message vers le nœud propriétaire de son canal
+MAX_FORWARD_HOPS = 2
+# Nombre de vérifications bcrypt exécutées en parallèle
+BCRYPT_CONCURRENCY = os.cpu_count() or 2
+# Délai d'attente d'une place pour une vérification bcrypt (en secondes)
+BCRYPT_WAIT_TIMEOUT = 3.0
+
+
+# Levée lorsqu'un client ne peut pas être authentifié ; le message lui est transmis
+class AuthenticationError(Exception):
+    pass
 
 
 # Classe pour gérer les interactions avec la base de données
@@ -14,6 +54,7 @@ class DatabaseManager:
 
     Attributes:
         db_config (dict): Configuration de la base de données.
+        pool (ConnectionPool): Pool de connexions partagé par tout le processus.
     """
     def __init__(self):
         # Configuration de la base de données
@@ -23,6 +64,7 @@ class DatabaseManager:
             "password": "votre_mot_de_passe",
             "database": "SAE"
         }
+        self.pool = get_pool(self.db_config)
     # Exécute une requête SQL
     def execute_query(self, query, params=None):
         """
@@ -36,23 +78,84 @@ class DatabaseManager:
             list: Résultats de la requête pour les requêtes SELECT, sinon None.
         """
 
-        # Gestion de la connexion à la base de données et exécution de la requête
+        # Emprunt d'une connexion au pool et exécution de la requête
         try:
-            connection = mysql.connector.connect(**self.db_config)
-            cursor = connection.cursor()
-            cursor.execute(query, params or ())
-            if query.strip().upper().startswith("SELECT"):
-                results = cursor.fetchall()
-                return results
-            connection.commit()
-            return None
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(query, params or ())
+                    if query.strip().upper().startswith("SELECT"):
+                        results = cursor.fetchall()
+                        return results
+                    connection.commit()
+                    return None
+                finally:
+                    cursor.close()
         except Error as e:
             print(f"Erreur base de données: {e}")
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+
+    # Exécute une même requête pour plusieurs jeux de paramètres
+    def execute_many(self, query, seq_params):
+        """
+        Exécute une même requête pour plusieurs jeux de paramètres, en une seule transaction.
+
+        Pour un INSERT, le connecteur envoie une seule requête multi-lignes.
+
+        Args:
+            query (str): La requête SQL à exécuter.
+            seq_params (list): Les jeux de paramètres.
+
+        Returns:
+            bool: True si la requête a été exécutée, False en cas d'erreur.
+        """
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.executemany(query, seq_params)
+                    connection.commit()
+                    return True
+                finally:
+                    cursor.close()
+        except Error as e:
+            print(f"Erreur base de données: {e}")
+            return False
                 
+    # Retourne le plus grand identifiant de message enregistré
+    def get_max_message_id(self):
+        """
+        Retourne le plus grand identifiant de message enregistré.
+
+        Returns:
+            int: Le plus grand message_id, ou 0 si la table est vide.
+        """
+        result = self.execute_query("SELECT COALESCE(MAX(message_id), 0) FROM messages")
+        return result[0][0] if result else 0
+
+    # Retourne le nom d'utilisateur enregistré et le hash du mot de passe d'un compte
+    def get_credentials(self, username):
+        """
+        Retourne le nom d'utilisateur enregistré et le hash du mot de passe d'un compte.
+
+        Args:
+            username (str): Le nom d'utilisateur saisi par le client.
+
+        Returns:
+            tuple or None: (username, password), ou None si le compte n'existe pas.
+
+        Raises:
+            Error: En cas d'erreur de la base de données, pour qu'un compte existant ne
+                passe pas pour inexistant.
+        """
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT username, password FROM user WHERE username = %s", (username,))
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        return rows[0] if rows else None
+
     # Bannit un utilisateur en ajoutant son nom d'utilisateur à la table des utilisateurs bannis            
     def ban_user(self, username):
         """
@@ -66,22 +169,29 @@ class DatabaseManager:
         val = (username,)
         self.execute_query(sql, val)
         
-    # Vérifie si un utilisateur est banni
-    def is_user_banned(self, username):
+    # Retourne la liste des utilisateurs bannis
+    def get_banned_users(self):
+        """
+        Retourne la liste des utilisateurs bannis.
+
+        Returns:
+            list or None: Les lignes (username,), ou None en cas d'erreur.
+        """
+        return self.execute_query("SELECT username FROM banned_users")
+
+    # Retourne les droits d'accès d'un utilisateur aux canaux
+    def get_channel_access(self, username):
         """
-        Vérifie si un utilisateur est banni.
+        Retourne les droits d'accès d'un utilisateur aux canaux.
 
         Args:
-            username (str): Le nom d'utilisateur à vérifier.
+            username (str): Le nom d'utilisateur (colonne user_id de user_channel_access).
 
         Returns:
-            bool: True si l'utilisateur est banni, False sinon.
+            list or None: Les lignes (channel_name, access_granted), ou None en cas d'erreur.
         """
-        # Requête SQL pour vérifier si un utilisateur est banni
-        sql = "SELECT username FROM banned_users WHERE username = %s"
-        val = (username,)
-        result = self.execute_query(sql, val)
-        return len(result) > 0
+        sql = "SELECT channel_name, access_granted FROM user_channel_access WHERE user_id = %s"
+        return self.execute_query(sql, (username,))
     
     # Débannit un utilisateur
     def deban_user(self, username):
@@ -92,47 +202,152 @@ class DatabaseManager:
             username (str): Le nom d'utilisateur à débannir.
         """
         # Requête SQL pour débannir un utilisateur
-        try:
-            connection = mysql.connector.connect(**self.db_config)
-            cursor = connection.cursor()
-            sql = "DELETE FROM banned_users WHERE username = %s"
-            val = (username,)
-            cursor.execute(sql, val)
-            connection.commit()
-        except Error as e:
-            print(f"Erreur lors de la suppression de l'utilisateur banni: {e}")
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+        sql = "DELETE FROM banned_users WHERE username = %s"
+        val = (username,)
+        self.execute_query(sql, val)
 
 # Classe principale du serveur
-class ServerBackend(QObject):
+class ServerBackend:
     """
     Classe principale du serveur, gérant les connexions clients et la communication.
 
+    Le serveur ne dépend pas de Qt : l'interface, ou le mode sans interface,
+    s'abonne à ses événements avec add_event_sink().
+
     Attributes:
-        new_message (pyqtSignal): Signal émis lors de la réception d'un nouveau message.
-        new_connection (pyqtSignal): Signal émis lors de la connexion d'un nouveau client.
+        monitor (MonitorFeed): Flux borné des messages de discussion, lu par l'interface du serveur.
+        event_sinks (list): Les récepteurs d'événements (ServerEvents) abonnés.
     """
-    new_message = pyqtSignal(str)
-    new_connection = pyqtSignal(str)
 
-    def __init__(self, host, port):
+    def __init__(self, host, port, history_cache_size=HISTORY_CACHE_SIZE,
+                 outbound_policy=POLICY_DROP_OLDEST, outbound_queue_size=OUTBOUND_QUEUE_SIZE,
+                 moderation=ACTION_MASK, moderation_languages=DEFAULT_LANGUAGES,
+                 auth_required=True, auth_secret=None, session_ttl=SESSION_TTL,
+                 monitor_lines=MONITOR_CHANNEL_LINES, monitor_rate=MONITOR_RATE,
+                 shard_index=0, shard_count=1, reuse_port=False):
         """
         Initialise le serveur avec l'adresse et le port spécifiés.
 
         Args:
             host (str): L'adresse du serveur.
             port (int): Le port du serveur.
+            history_cache_size (int): Nombre de messages récents gardés en mémoire par canal.
+            outbound_policy (str): Politique appliquée lorsque la file d'envoi d'un client est pleine.
+            outbound_queue_size (int): Nombre maximal de messages en attente d'envoi par client.
+            moderation (str): Traitement des messages qui contiennent un mot interdit.
+            moderation_languages (iterable): Langues des listes de mots interdits.
+            auth_required (bool): Refuser les clients qui ne s'authentifient ni par mot de
+                passe ni par jeton (ancien format, nom d'utilisateur seul).
+            auth_secret (str or bytes, optional): Clé de signature des jetons de session,
+                commune aux processus et nœuds d'un même service. Aléatoire par défaut.
+            session_ttl (float): Durée de validité des jetons de session, en secondes.
+            monitor_lines (int): Nombre maximal de messages en attente d'affichage par canal.
+            monitor_rate (int): Nombre maximal de messages affichés par canal et par seconde.
+            shard_index (int): Numéro de ce processus lorsque le serveur en utilise plusieurs.
+            shard_count (int): Nombre de processus ou de nœuds qui attribuent des identifiants de message.
+            reuse_port (bool): Partager le port avec d'autres processus (SO_REUSEPORT).
         """
-        super().__init__()
         self.host = host
         self.port = port
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.clients = {}
+        if reuse_port:
+            # Tous les processus écoutent sur le même port ; le noyau répartit les connexions
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        # Bus vers les autres processus (voir server_shards.py) ou les autres nœuds
+        # d'une grappe (voir classes/cluster.py), None pour un serveur seul
+        self.bus = None
+        self.clients = ClientRegistry()
         self.running = True
         self.db_manager = DatabaseManager()
+        self.handshake_pool = ThreadPoolExecutor(max_workers=HANDSHAKE_WORKERS, thread_name_prefix="handshake")
+        self.handshake_latency = LatencyStats()
+        self.message_writer = MessageWriter(self.db_manager)
+        self.history_cache = HistoryCache(CHANNELS, history_cache_size)
+        self.ban_list = BanList(self.db_manager)
+        self.outbound_policy = outbound_policy
+        self.outbound_queue_size = outbound_queue_size
+        self.channel_index = ChannelIndex(CHANNELS)
+        self.message_ids = None
+        self.moderation = moderation
+        # Les listes de mots sont compilées une seule fois, au démarrage
+        self.profanity_filter = None
+        if moderation != ACTION_OFF:
+            self.profanity_filter = ProfanityFilter(load_word_lists(moderation_languages))
+        self.auth_required = auth_required
+        self.sessions = SessionTokens(auth_secret, session_ttl)
+        # Les tentatives par mot de passe sont limitées par adresse et par compte, avant
+        # toute requête ; les comptes inexistants sont refusés en mémoire quelques secondes
+        self.source_limiter = RateLimiter(SOURCE_RATE, SOURCE_BURST)
+        self.username_limiter = RateLimiter(USERNAME_RATE, USERNAME_BURST)
+        self.unknown_users = NegativeCache()
+        # bcrypt occupe un cœur par vérification : au-delà, les tentatives attendent leur tour
+        self.bcrypt_slots = threading.BoundedSemaphore(BCRYPT_CONCURRENCY)
+        self.bcrypt_latency = LatencyStats()
+        # L'interface lit les messages à son rythme : elle ne ralentit jamais leur diffusion
+        self.monitor = MonitorFeed(CHANNELS, monitor_lines, monitor_rate)
+        self.event_sinks = []
+
+    # Abonne un récepteur aux événements du serveur
+    def add_event_sink(self, sink):
+        """
+        Abonne un récepteur aux événements du serveur.
+
+        Args:
+            sink (ServerEvents): Le récepteur.
+        """
+        self.event_sinks.append(sink)
+
+    # Transmet un événement à tous les récepteurs abonnés
+    def emit_event(self, name, *args):
+        """
+        Transmet un événement à tous les récepteurs abonnés.
+
+        Une erreur dans un récepteur est affichée et n'empêche ni les autres
+        récepteurs ni le serveur de fonctionner.
+
+        Args:
+            name (str): Le nom de la méthode de ServerEvents à appeler.
+            *args: Les arguments de l'événement.
+        """
+        for sink in self.event_sinks:
+            try:
+                getattr(sink, name)(*args)
+            except Exception as e:
+                print(f"Erreur du récepteur d'événements {type(sink).__name__}.{name}: {e}")
+
+    # Retourne les statistiques de fonctionnement du serveur
+    def get_stats(self):
+        """
+        Retourne les statistiques de fonctionnement du serveur.
+
+        Returns:
+            dict: Les statistiques, regroupées par composant.
+        """
+        return {
+            'clients': len(self.clients),
+            'handshake': self.handshake_latency.snapshot(),
+            'sessions': self.sessions.stats(),
+            'login': {
+                'sources': self.source_limiter.stats(),
+                'usernames': self.username_limiter.stats(),
+                'unknown_users': self.unknown_users.stats(),
+                'bcrypt': self.bcrypt_latency.snapshot(),
+            },
+            'db_pool': self.db_manager.pool.stats(),
+            'message_writer': self.message_writer.stats(),
+            'history_cache': self.history_cache.stats(),
+            'ban_list': self.ban_list.stats(),
+            'channels': self.channel_index.stats(),
+            'outbound': {
+                f"{info['username']} {info['address']}": info['outbound'].stats()
+                for _, info in self.clients.snapshot()
+            },
+            'bus': self.bus.stats() if self.bus else None,
+            'moderation': dict(self.profanity_filter.stats(), action=self.moderation) if self.profanity_filter else None,
+            'monitor': self.monitor.stats(),
+        }
 
     # Envoie un message à tous les clients connectés
     def send_server_message(self, message):
@@ -143,143 +358,676 @@ class ServerBackend(QObject):
             message (str): Le message à envoyer.
         """
         formatted_message = f"Server:{message}"
-        self.broadcast_message(formatted_message)
+        self.broadcast_message(formatted_message, MSG_NOTICE)
         
     # Envoie l'historique des messages à un client spécifique
-    def send_message_history_to_client(self, client_socket):
+    def send_message_history_to_client(self, client_socket, protocol=PROTOCOL_TEXT, channels=CHANNELS):
         """
         Envoie l'historique des messages à un client spécifique.
 
         Args:
             client_socket (socket): Le socket du client auquel envoyer l'historique.
+            protocol (str): Le mode de communication du client.
+            channels (tuple): Les canaux accessibles au client.
         """
-        message_history = self.get_message_history()
-        history_messages = []
+        client_socket.sendall(self.build_connect_history(protocol, channels))
+
+    # Construit l'historique envoyé à un client lors de sa connexion
+    def build_connect_history(self, protocol, channels=CHANNELS):
+        """
+        Construit l'historique envoyé à un client lors de sa connexion : la page la
+        plus récente de chaque canal accessible.
 
-        for message in message_history:
-            username, content, timestamp = message
+        En mode encadré, chaque canal fait l'objet d'une trame MSG_HISTORY portant
+        le curseur des messages plus anciens. En mode texte, les messages de tous
+        les canaux sont envoyés dans l'ordre chronologique, au format historique.
+
+        Args:
+            protocol (str): Le mode de communication du client.
+            channels (tuple): Les canaux accessibles au client.
+
+        Returns:
+            bytes: Les données à envoyer.
+        """
+        if protocol == PROTOCOL_FRAMED:
+            return b"".join(encode_frame(MSG_HISTORY, self.format_history_page(channel)) for channel in channels)
+
+        history = []
+        for channel in channels:
+            for message_id, username, message, timestamp in self.get_channel_history(channel):
+                history.append((message_id, channel, username, message, timestamp))
+        history.sort()
+
+        history_messages = []
+        for message_id, channel, username, message, timestamp in history:
             # Formatez l'horodatage pour n'inclure que l'heure et les minutes
             formatted_timestamp = timestamp.strftime("%H:%M")
-            formatted_message = f"history {formatted_timestamp} - {username}: {content}"
-            history_messages.append(formatted_message)
+            history_messages.append(f"history {formatted_timestamp} - {username}: {channel}:{message}")
 
         # Joindre tous les messages historiques avec des sauts de ligne
-        full_history = "\n".join(history_messages)
-        self.send_message_to_client(client_socket, full_history)
-        
+        return "\n".join(history_messages).encode()
+
+    # Construit une page d'historique d'un canal
+    def format_history_page(self, channel, before_id=None):
+        """
+        Construit une page d'historique d'un canal, charge utile d'une trame MSG_HISTORY.
+
+        Args:
+            channel (str): Le canal demandé.
+            before_id (int, optional): Ne retourner que les messages plus anciens que celui-ci.
+
+        Returns:
+            str: La page encodée par encode_history_page().
+        """
+        rows = self.get_channel_history(channel, before_id)
+        # Une page incomplète signifie qu'il n'y a pas de messages plus anciens
+        cursor = rows[-1][0] if len(rows) == HISTORY_PAGE_SIZE else 0
+        lines = [f"{timestamp.strftime('%H:%M')} - {username}: {message}"
+                 for message_id, username, message, timestamp in reversed(rows)]
+        return encode_history_page(channel, cursor, lines)
+
+    # Envoie une page d'historique d'un canal à un client
+    def send_history_page(self, client_socket, channel, before_id):
+        """
+        Envoie à un client une page d'historique d'un canal.
+
+        Args:
+            client_socket (socket): Le socket du client.
+            channel (str): Le canal demandé.
+            before_id (int): Ne retourner que les messages plus anciens que celui-ci.
+        """
+        self.send_message_to_client(client_socket, self.format_history_page(channel, before_id), MSG_HISTORY)
+
+    # Charge la liste des canaux accessibles à un utilisateur
+    def load_channel_access(self, username):
+        """
+        Charge la liste des canaux accessibles à un utilisateur depuis user_channel_access.
+
+        En cas d'erreur de la base de données, l'utilisateur a accès à tous les canaux,
+        comme avant l'utilisation de cette table.
+
+        Args:
+            username (str): Le nom d'utilisateur.
+
+        Returns:
+            tuple: Les canaux accessibles.
+        """
+        return allowed_channels(self.db_manager.get_channel_access(username), CHANNELS)
+
+    # Authentifie un nouveau client
+    def authenticate(self, credentials, source=None):
+        """
+        Authentifie un nouveau client à partir de sa première trame.
+
+        Un mot de passe est vérifié une seule fois, avec bcrypt, et donne lieu à un
+        jeton de session. Un jeton est vérifié en mémoire, sans bcrypt ni requête :
+        il porte aussi les canaux accessibles, calculés lors de la connexion.
+
+        Les tentatives par mot de passe sont limitées par adresse et par compte :
+        une rafale de mauvais identifiants est refusée avant la base de données et bcrypt.
+
+        Args:
+            credentials (tuple): Les identifiants décodés par decode_hello().
+            source (str, optional): L'adresse IP du client.
+
+        Returns:
+            tuple: (nom d'utilisateur, canaux accessibles, jeton ou None).
+
+        Raises:
+            AuthenticationError: Si le client est refusé.
+        """
+        kind, value, password = credentials
+        if kind == AUTH_TOKEN:
+            session = self.sessions.verify(value)
+            if session is None:
+                raise AuthenticationError("Session expirée, reconnectez-vous.")
+            username, channels = session
+        elif kind == AUTH_PASSWORD or not self.auth_required:
+            username = value
+        else:
+            raise AuthenticationError("Authentification requise.")
+
+        # La liste est vérifiée avant bcrypt : un utilisateur banni ne coûte rien
+        if username in self.ban_list:
+            raise AuthenticationError("Vous êtes banni de ce serveur.")
+        if kind == AUTH_TOKEN:
+            return username, channels, value
+        if kind == AUTH_PASSWORD:
+            # Les deux seaux sont consommés : une adresse qui essaie de nombreux comptes
+            # et de nombreuses adresses qui visent un même compte sont ralenties
+            source_allowed = source is None or self.source_limiter.allow(source)
+            if not self.username_limiter.allow(normalize_username(username)) or not source_allowed:
+                raise AuthenticationError("Trop de tentatives de connexion, réessayez plus tard.")
+            username = self.check_password(username, password)
+            if username is None:
+                raise AuthenticationError("Nom d'utilisateur ou mot de passe invalide.")
+        channels = self.load_channel_access(username)
+        token = self.sessions.issue(username, channels) if kind == AUTH_PASSWORD else None
+        return username, channels, token
+
+    # Vérifie le mot de passe d'un compte
+    def check_password(self, username, password):
+        """
+        Vérifie le mot de passe d'un compte avec bcrypt.
+
+        Un compte récemment cherché sans succès est refusé sans requête. Le nombre de
+        vérifications bcrypt simultanées est borné : une rafale ne monopolise pas les
+        cœurs, et les autres connexions gardent une latence faible.
+
+        Args:
+            username (str): Le nom d'utilisateur saisi par le client.
+            password (str): Le mot de passe fourni.
+
+        Returns:
+            str or None: Le nom d'utilisateur enregistré, ou None si les identifiants sont invalides.
+
+        Raises:
+            AuthenticationError: Si aucune place ne se libère pour bcrypt dans le délai.
+        """
+        if username in self.unknown_users:
+            return None
+        row = self.db_manager.get_credentials(username)
+        if row is None:
+            self.unknown_users.add(username)
+            return None
+        stored_username, stored_password = row
+        if not self.bcrypt_slots.acquire(timeout=BCRYPT_WAIT_TIMEOUT):
+            raise AuthenticationError("Serveur occupé, réessayez dans quelques instants.")
+        started = time.monotonic()
+        try:
+            if bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
+                return stored_username
+        except ValueError:
+            # Mot de passe enregistré sans bcrypt
+            pass
+        finally:
+            self.bcrypt_slots.release()
+            self.bcrypt_latency.record(time.monotonic() - started)
+        return None
+
     # Sauvegarde un message dans la base de données
-    def save_message_to_db(self, username, channel, message):
+    def save_message_to_db(self, message_id, username, channel, message, timestamp):
         """
-        Sauvegarde un message dans la base de données.
+        Confie un message à l'écrivain en arrière-plan, qui l'écrira dans la base de données.
 
         Args:
+            message_id (int): L'identifiant attribué au message.
             username (str): Le nom d'utilisateur qui a envoyé le message.
             channel (str): Le canal où le message a été envoyé.
             message (str): Le contenu du message.
+            timestamp (datetime): L'horodatage du message.
         """
-        try:
-            sql = "INSERT INTO messages (username, content) VALUES (%s, %s)"
-            val = (username, f"{channel}:{message}")
+        self.message_writer.submit(message_id, username, channel, message, timestamp)
+
+    # Enregistre un nouveau message dans le cache et la base de données
+    def record_message(self, username, channel, message):
+        """
+        Attribue un identifiant et un horodatage à un nouveau message, l'ajoute au
+        cache d'historique de son canal et le confie à l'écrivain.
+
+        L'identifiant est attribué par le serveur (et non par AUTO_INCREMENT) pour que
+        le cache puisse servir des pages paginées avant même l'écriture en base.
+
+        Args:
+            username (str): Le nom d'utilisateur qui a envoyé le message.
+            channel (str): Le canal où le message a été envoyé.
+            message (str): Le contenu du message.
 
-            result = self.db_manager.execute_query(sql, val)
-        except mysql.connector.Error as err:
-            print(f"Erreur lors de l'insertion du message: {err}")
+        Returns:
+            tuple: Le message enregistré (message_id, username, message, timestamp).
+        """
+        message_id = next(self.message_ids)
+        timestamp = datetime.now().replace(microsecond=0)
+        entry = (message_id, username, message, timestamp)
+        self.history_cache.append(channel, entry)
+        self.save_message_to_db(message_id, username, channel, message, timestamp)
+        return entry
+
+    # Charge les derniers messages de chaque canal dans le cache
+    def warm_history_cache(self):
+        """
+        Charge les derniers messages de chaque canal dans le cache d'historique et
+        initialise l'attribution des identifiants de message.
+
+        Lorsque plusieurs processus ou nœuds écrivent dans la base, chacun attribue
+        un identifiant sur `shard_count`, à partir de son numéro : ils ne se recoupent pas.
+        """
+        first_id = self.db_manager.get_max_message_id() + 1 + self.shard_index
+        self.message_ids = MessageIdAllocator(first_id, self.shard_count)
+        for channel in CHANNELS:
+            self.history_cache.warm(channel, self.query_channel_history(channel, None, self.history_cache.capacity))
             
-    # Récupère l'historique des messages de la base de données        
-    def get_message_history(self):
+    # Récupère une page de l'historique d'un canal
+    def get_channel_history(self, channel, before_id=None, limit=HISTORY_PAGE_SIZE):
         """
-        Récupère l'historique des messages de la base de données.
+        Récupère une page de l'historique d'un canal, du message le plus récent au plus ancien.
+
+        La page est servie depuis le cache lorsqu'il contient les messages demandés,
+        sinon depuis la base de données.
+
+        Args:
+            channel (str): Le canal demandé.
+            before_id (int, optional): Ne retourner que les messages plus anciens que celui-ci.
+            limit (int): Nombre maximal de messages retournés.
 
         Returns:
-            list: Une liste des messages enregistrés dans la base de données.
+            list: Des tuples (message_id, username, message, timestamp).
         """
-        query = "SELECT username, content, timestamp FROM messages"
-        return self.db_manager.execute_query(query)
+        page = self.history_cache.get_page(channel, before_id, limit)
+        if page is not None:
+            return page
+        return self.query_channel_history(channel, before_id, limit)
+
+    # Lit une page de l'historique d'un canal dans la base de données
+    def query_channel_history(self, channel, before_id=None, limit=HISTORY_PAGE_SIZE):
+        """
+        Lit une page de l'historique d'un canal dans la base de données.
+
+        La pagination se fait par curseur (message_id) : la requête parcourt l'index
+        (channel, message_id) à rebours à partir du curseur et s'arrête dès que la
+        page est pleine. Une page profonde lit autant de lignes que la première.
+        L'ordre est celui de HistoryCache : pages en cache et pages lues en base se
+        suivent sans trou ni doublon.
+
+        Args:
+            channel (str): Le canal demandé.
+            before_id (int, optional): Ne retourner que les messages plus anciens que celui-ci.
+            limit (int): Nombre maximal de messages retournés.
+
+        Returns:
+            list: Des tuples (message_id, username, message, timestamp).
+        """
+        if before_id:
+            query = ("SELECT message_id, username, content, timestamp FROM messages "
+                     "WHERE channel = %s AND message_id < %s ORDER BY message_id DESC LIMIT %s")
+            params = (channel, before_id, limit)
+        else:
+            query = ("SELECT message_id, username, content, timestamp FROM messages "
+                     "WHERE channel = %s ORDER BY message_id DESC LIMIT %s")
+            params = (channel, limit)
+        return self.db_manager.execute_query(query, params) or []
     
 
     def start(self):
         """
         Démarre le serveur et commence à écouter les nouvelles connexions.
         """
+        self.warm_history_cache()
+        self.ban_list.start()
+        self.message_writer.start()
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen()
         threading.Thread(target=self.accept_clients, daemon=True).start()
         
-    # Accepte les clients et les ajoute à la liste des clients
+    # Accepte les clients et confie leur poignée de main au pool dédié
     def accept_clients(self):
         """
-        Accepte les clients et les ajoute à la liste des clients.
+        Accepte les clients et confie leur poignée de main au pool dédié.
+
+        La boucle d'acceptation ne fait jamais d'entrée/sortie bloquante sur les
+        clients : les poignées de main s'exécutent en parallèle dans handshake_pool.
         """
         while self.running:
             try:
                 client_socket, client_address = self.server_socket.accept()
                 print(f"Nouvelle tentative de connexion de {client_address}")
+                self.handshake_pool.submit(self.handshake_client, client_socket, client_address, time.monotonic())
+            except Exception as e:
+                print(f"Erreur lors de l'acceptation d'une nouvelle connexion: {e}")
 
-                # Attendre brièvement pour que le message du client arrive
-                time.sleep(0.5)  # Attendre 0.5 seconde (ajuster selon les besoins)
+    # Authentifie un nouveau client et démarre son thread
+    def handshake_client(self, client_socket, client_address, accepted_at):
+        """
+        Reçoit les identifiants d'un nouveau client, l'authentifie, lui envoie
+        l'historique puis démarre son thread.
 
-                try:
-                    message = client_socket.recv(1024).decode()
-                    if message.startswith("Username:"):
-                        username = message.split(":", 1)[1]
-                    else:
-                        print("Format de message inattendu pour le nom d'utilisateur")
-                        client_socket.close()
-                        continue
-                except Exception as e:
-                    print(f"Erreur lors de la réception du nom d'utilisateur: {e}")
+        Args:
+            client_socket (socket): Le socket du client.
+            client_address (tuple): L'adresse du client.
+            accepted_at (float): Instant de l'acceptation (time.monotonic()).
+        """
+        # Un client muet ne peut pas bloquer un worker plus de HANDSHAKE_TIMEOUT secondes
+        client_socket.settimeout(HANDSHAKE_TIMEOUT)
+        decoder = None
+        pending = []
+        try:
+            data = client_socket.recv(1024)
+            protocol = detect_protocol(data)
+            if protocol == PROTOCOL_FRAMED:
+                # La trame MSG_HELLO peut arriver en plusieurs morceaux
+                decoder = FrameDecoder()
+                frames = decoder.feed(data)
+                while not frames:
+                    data = client_socket.recv(1024)
+                    if not data:
+                        raise ConnectionError("connexion fermée pendant la poignée de main")
+                    frames = decoder.feed(data)
+                (msg_type, payload), pending = frames[0], frames[1:]
+                if msg_type != MSG_HELLO:
+                    print("Trame inattendue pour le nom d'utilisateur")
                     client_socket.close()
-                    continue
+                    return
+                credentials = decode_hello(payload.decode('utf-8'))
+            else:
+                # Le mode texte historique ne transmet que le nom d'utilisateur
+                message = data.decode()
+                if message.startswith("Username:"):
+                    credentials = (AUTH_NONE, message.split(":", 1)[1], None)
+                else:
+                    print("Format de message inattendu pour le nom d'utilisateur")
+                    client_socket.close()
+                    return
+        except socket.timeout:
+            print(f"Délai dépassé pour la poignée de main de {client_address}")
+            client_socket.close()
+            return
+        except Exception as e:
+            print(f"Erreur lors de la réception du nom d'utilisateur: {e}")
+            client_socket.close()
+            return
 
-                # Vérifier si l'utilisateur est banni
-                if self.db_manager.is_user_banned(username):
-                    print(f"L'utilisateur banni {username} a tenté de se connecter.")
-                    client_socket.close()  # Fermer la connexion
-                    continue  # Passer à la prochaine tentative de connexion
-                
-                self.send_message_history_to_client(client_socket)
+        try:
+            username, channels, token = self.authenticate(credentials, client_address[0])
+        except AuthenticationError as e:
+            print(f"Authentification refusée pour {client_address}: {e}")
+            try:
+                client_socket.sendall(self.encode_auth_reply(protocol, error=str(e)))
+            except OSError:
+                pass
+            client_socket.close()
+            return
+        except Exception as e:
+            print(f"Erreur lors de l'authentification de {client_address}: {e}")
+            client_socket.close()
+            return
+
+        try:
+            client_socket.sendall(self.encode_auth_reply(protocol, username, token))
+            self.send_message_history_to_client(client_socket, protocol, channels)
+        except Exception as e:
+            print(f"Erreur lors de la poignée de main de {client_address}: {e}")
+            client_socket.close()
+            return
 
-                # Si l'utilisateur n'est pas banni, procédez normalement
-                threading.Thread(target=self.client_thread, args=(client_socket, username)).start()
+        client_socket.settimeout(None)
+        self.handshake_latency.record(time.monotonic() - accepted_at)
+
+        # Si l'utilisateur n'est pas banni, procédez normalement
+        threading.Thread(
+            target=self.client_thread, args=(client_socket, username, protocol, decoder, pending, channels)
+        ).start()
+
+    # Encode la réponse d'authentification envoyée à un nouveau client
+    def encode_auth_reply(self, protocol, username=None, token=None, error=None):
+        """
+        Encode la réponse d'authentification envoyée à un nouveau client.
+
+        En mode texte, seul un refus est signalé, par un message du serveur.
+
+        Args:
+            protocol (str): Le mode de communication du client.
+            username (str, optional): Le nom d'utilisateur authentifié.
+            token (str, optional): Le jeton de session délivré.
+            error (str, optional): Le motif du refus.
+
+        Returns:
+            bytes: Les données à envoyer.
+        """
+        if protocol == PROTOCOL_FRAMED:
+            return encode_frame(MSG_AUTH, encode_auth_reply(username, token, error))
+        return f"Server:{error}".encode() if error is not None else b""
 
-            except Exception as e:
-                print(f"Erreur lors de l'acceptation d'une nouvelle connexion: {e}")
-                
     # Gère la communication avec un client
-    def client_thread(self, client_socket, username):
+    def client_thread(self, client_socket, username, protocol=PROTOCOL_TEXT, decoder=None, pending=(), channels=CHANNELS):
         """
         Gère la communication avec un client connecté.
 
         Args:
             client_socket (socket): Le socket du client.
             username (str): Le nom d'utilisateur du client.
+            protocol (str): Le mode de communication du client.
+            decoder (FrameDecoder, optional): Le décodeur de trames du client en mode encadré.
+            pending (list): Les trames déjà reçues pendant la poignée de main.
+            channels (tuple): Les canaux accessibles au client, auxquels il est abonné.
         """
         # Ajoutez le client à la liste des clients actifs
-        print(username)
-        self.clients[client_socket] = {'address': client_socket.getpeername(), 'username': username}
-        print(f"Nom d'utilisateur '{username}' reçu de {client_socket.getpeername()}")
+        outbound = OutboundQueue(self.outbound_policy, self.outbound_queue_size)
+        self.clients.add(client_socket, {
+            'address': client_socket.getpeername(), 'username': username, 'protocol': protocol,
+            'outbound': outbound, 'channels': channels,
+        })
+        for channel in channels:
+            self.channel_index.subscribe(client_socket, channel)
+        address = client_socket.getpeername()
+        print(f"Nom d'utilisateur '{username}' reçu de {address}")
+        self.emit_event('client_connected', username, address)
+        threading.Thread(target=self.client_writer, args=(client_socket, username, outbound), daemon=True).start()
+
+        for msg_type, payload in pending:
+            self.handle_frame(client_socket, username, msg_type, payload)
 
         while self.running:
             try:
-                message = client_socket.recv(1024).decode()
-                if not message:
-                    break  # Sortir de la boucle si aucun message n'est reçu
-
-                # Traitement des messages normaux
-                formatted_message = f"{username}:{message}"
-                self.new_message.emit(formatted_message)  # Emettre un signal pour l'UI
-                self.broadcast_message(formatted_message)  # Diffuser le message à tous les clients
+                if protocol == PROTOCOL_FRAMED:
+                    data = client_socket.recv(65536)
+                    if not data:
+                        break
+                    for msg_type, payload in decoder.feed(data):
+                        self.handle_frame(client_socket, username, msg_type, payload)
+                else:
+                    # Mode texte historique : chaque lecture est traitée comme un message
+                    message = client_socket.recv(1024).decode()
+                    if not message:
+                        break  # Sortir de la boucle si aucun message n'est reçu
+                    self.handle_chat_message(client_socket, username, message)
 
+            except ProtocolError as e:
+                print(f"Erreur de protocole de {username}: {e}")
+                break
             except Exception as e:
                 print(f"Erreur: {e}")
                 break
 
         # Nettoyage après la déconnexion du client
+        self.channel_index.remove(client_socket)
+        outbound.close()
         client_socket.close()
-        if client_socket in self.clients:
-            del self.clients[client_socket]
+        self.clients.remove(client_socket)
         print(f"Client déconnecté: {username}")
+        self.emit_event('client_disconnected', username, address)
 
+    # Envoie au client les messages de sa file d'envoi
+    def client_writer(self, client_socket, username, outbound):
+        """
+        Envoie au client les messages de sa file d'envoi, jusqu'à sa fermeture.
+
+        Seul ce thread écrit sur le socket du client : un client lent ne bloque que
+        lui, et les messages accumulés pendant un envoi partent ensemble, sans être
+        concaténés (voir send_buffers()).
+
+        Args:
+            client_socket (socket): Le socket du client.
+            username (str): Le nom d'utilisateur du client.
+            outbound (OutboundQueue): La file d'envoi du client.
+        """
+        while True:
+            batch = outbound.get()
+            if not batch:
+                break
+            try:
+                send_buffers(client_socket, batch)
+            except OSError as e:
+                print(f"Erreur lors de l'envoi à {username}: {e}")
+                outbound.close()
+                self.disconnect_client(client_socket)
+                break
+
+    # Dépose un message dans la file d'envoi d'un client
+    def queue_message(self, client_socket, data):
+        """
+        Dépose un message dans la file d'envoi d'un client et déconnecte le client
+        si la politique de sa file l'exige.
+
+        Args:
+            client_socket (socket): Le socket du client.
+            data (bytes): Les données à envoyer.
+        """
+        info = self.clients.get(client_socket)
+        if info is None:
+            return
+        if not info['outbound'].put(data):
+            print(f"Client trop lent, déconnexion: {info['username']}")
+            self.disconnect_client(client_socket)
+
+    # Interrompt la connexion d'un client
+    def disconnect_client(self, client_socket):
+        """
+        Interrompt la connexion d'un client ; son thread de réception fait le nettoyage.
+
+        Args:
+            client_socket (socket): Le socket du client.
+        """
+        try:
+            client_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Déjà fermé
+
+
+    # Traite une trame reçue d'un client en mode encadré
+    def handle_frame(self, client_socket, username, msg_type, payload):
+        """
+        Traite une trame reçue d'un client en mode encadré.
+
+        Args:
+            client_socket (socket): Le socket du client.
+            username (str): Le nom d'utilisateur du client.
+            msg_type (int): Le type de la trame.
+            payload (bytes): La charge utile de la trame.
+        """
+        text = payload.decode('utf-8', errors='replace')
+        if msg_type == MSG_CHAT:
+            self.handle_chat_message(client_socket, username, text)
+        elif msg_type == MSG_COMMAND:
+            self.handle_client_command(client_socket, username, text)
+        else:
+            print(f"Trame inattendue de {username}: type {msg_type}")
+
+    # Traite un message de discussion reçu d'un client
+    def handle_chat_message(self, client_socket, username, message):
+        """
+        Traite un message de discussion reçu d'un client.
+
+        Le message n'est diffusé qu'aux abonnés de son canal, et seulement si
+        l'expéditeur en fait lui-même partie.
+
+        Args:
+            client_socket (socket): Le socket de l'expéditeur.
+            username (str): Le nom d'utilisateur de l'expéditeur.
+            message (str): Le message, au format "canal:message".
+        """
+        channel, separator, msg = message.partition(':')
+        if not separator or not self.channel_index.is_member(client_socket, channel):
+            print(f"Message de {username} refusé pour le canal {channel!r}")
+            self.send_message_to_client(client_socket, f"Server:Vous n'êtes pas membre du canal {channel}", MSG_NOTICE)
+            return
+
+        msg = self.moderate_message(client_socket, username, channel, msg)
+        if msg is None:
+            return
+        self.commit_chat_message(username, channel, msg, f"{username}:{channel}:{msg}")
+
+    # Applique la modération à un message de discussion
+    def moderate_message(self, client_socket, username, channel, message):
+        """
+        Recherche les mots interdits d'un message et applique la politique de modération.
+
+        Args:
+            client_socket (socket): Le socket de l'expéditeur.
+            username (str): Le nom d'utilisateur de l'expéditeur.
+            channel (str): Le canal du message.
+            message (str): Le contenu du message.
+
+        Returns:
+            str or None: Le message à diffuser, éventuellement masqué, ou None s'il est refusé.
+        """
+        if self.profanity_filter is None:
+            return message
+        spans = self.profanity_filter.find(message)
+        if not spans:
+            return message
+        if self.moderation == ACTION_DROP:
+            print(f"Message de {username} refusé par la modération sur le canal {channel}")
+            self.send_message_to_client(client_socket, "Server:Votre message contient un mot interdit.", MSG_NOTICE)
+            return None
+        if self.moderation == ACTION_FLAG:
+            print(f"Message signalé de {username} sur le canal {channel}: {message}")
+            return message
+        return self.profanity_filter.mask(message, spans)
+
+    # Enregistre un message de discussion et le diffuse aux abonnés de son canal
+    def commit_chat_message(self, username, channel, message, formatted_message, hops=0):
+        """
+        Enregistre un message de discussion et le diffuse aux abonnés de son canal.
+
+        Dans une grappe, le message est transmis au nœud propriétaire du canal, qui
+        lui attribue son identifiant : les messages d'un canal restent ordonnés
+        quel que soit le nœud de leur expéditeur.
+
+        Args:
+            username (str): Le nom d'utilisateur de l'expéditeur.
+            channel (str): Le canal du message.
+            message (str): Le contenu du message.
+            formatted_message (str): Le message tel qu'il est diffusé.
+            hops (int): Nombre de transmissions déjà subies par le message.
+        """
+        owner = self.bus.owner_of(channel) if self.bus is not None else None
+        # Pendant un rééquilibrage, les nœuds peuvent ne pas s'accorder sur le propriétaire :
+        # au-delà de MAX_FORWARD_HOPS, ou si le propriétaire est injoignable, le message est enregistré ici
+        if owner is not None and hops < MAX_FORWARD_HOPS:
+            event = {
+                'event': 'forward', 'username': username, 'channel': channel,
+                'content': message, 'message': formatted_message, 'hops': hops + 1,
+            }
+            if self.bus.forward(owner, event):
+                return
+
+        self.monitor.publish(channel, formatted_message)  # Transmettre le message à l'interface
+
+        # Le message est sauvegardé une seule fois, quel que soit le nombre de destinataires
+        entry = self.record_message(username, channel, message)
+        self.publish_to_channel(channel, formatted_message, MSG_CHAT, entry)  # Diffuser le message aux abonnés du canal
+
+    # Traite une commande envoyée par un client
+    def handle_client_command(self, client_socket, username, command):
+        """
+        Traite une commande envoyée par un client.
+
+        Args:
+            client_socket (socket): Le socket du client.
+            username (str): Le nom d'utilisateur du client.
+            command (str): La commande et ses arguments.
+        """
+        name, _, args = command.partition(" ")
+        info = self.clients.get(client_socket, {})
+        if name == "history":
+            # history <before_id> <canal> : page de messages plus anciens que before_id
+            before_id, _, channel = args.partition(" ")
+            if before_id.isdigit() and channel in info.get('channels', ()):
+                self.send_history_page(client_socket, channel, int(before_id))
+                return
+        elif name == "join":
+            # join <canal> : abonnement à un canal accessible
+            if args in info.get('channels', ()):
+                self.channel_index.subscribe(client_socket, args)
+                return
+            self.send_message_to_client(client_socket, f"Server:Accès refusé au canal {args}", MSG_NOTICE)
+            return
+        elif name == "leave":
+            # leave <canal> : désabonnement d'un canal
+            self.channel_index.unsubscribe(client_socket, args)
+            return
+        print(f"Commande inconnue de {username}: {command}")
+        self.send_message_to_client(client_socket, f"Server:Commande inconnue: {command}", MSG_NOTICE)
 
     # Envoie un message à un canal spécifique
     def send_message_to_channel(self, channel_name, message):
@@ -290,9 +1038,48 @@ class ServerBackend(QObject):
             channel_name (str): Le nom du canal où envoyer le message.
             message (str): Le message à envoyer.
         """
-        formatted_message = f"{channel_name}: {message}"
-        for client_socket in self.clients.keys():
-            client_socket.send(formatted_message.encode())
+        self.publish_to_channel(channel_name, f"{channel_name}: {message}", MSG_NOTICE)
+
+    # Diffuse un message aux abonnés d'un canal, sur tous les processus
+    def publish_to_channel(self, channel, message, msg_type, entry=None):
+        """
+        Diffuse un message aux abonnés d'un canal, connectés à ce processus ou à un autre.
+
+        Args:
+            channel (str): Le canal.
+            message (str): Le message à diffuser.
+            msg_type (int): Le type de trame, utilisé en mode encadré.
+            entry (tuple, optional): Le message enregistré, ajouté au cache des autres processus.
+        """
+        self.deliver_to_channel(channel, message, msg_type)
+        if self.bus is not None:
+            event = {'event': 'channel', 'channel': channel, 'message': message, 'msg_type': msg_type}
+            if entry is not None:
+                message_id, username, content, timestamp = entry
+                event['entry'] = [message_id, username, content, timestamp.isoformat()]
+            self.bus.publish(event)
+
+    # Diffuse un message aux abonnés d'un canal connectés à ce processus
+    def deliver_to_channel(self, channel, message, msg_type):
+        """
+        Diffuse un message aux seuls abonnés d'un canal connectés à ce processus.
+
+        Args:
+            channel (str): Le canal.
+            message (str): Le message à diffuser.
+            msg_type (int): Le type de trame, utilisé en mode encadré.
+        """
+        # Le message n'est encodé qu'une fois par mode de communication, et le même
+        # tampon immuable est partagé par les files de tous les destinataires
+        encoded = {}
+        for client_socket in self.channel_index.members(channel):
+            info = self.clients.get(client_socket)
+            if info is None:
+                continue
+            protocol = info['protocol']
+            if protocol not in encoded:
+                encoded[protocol] = memoryview(encode_message(protocol, msg_type, message))
+            self.queue_message(client_socket, encoded[protocol])
 
      # Traite les commandes d'administration (kick, ban, etc.)
     def handle_command(self, command, args):
@@ -315,28 +1102,41 @@ class ServerBackend(QObject):
     # Expulse un utilisateur
     def kick_user(self, username):
         """
-        Expulse un utilisateur du serveur.
+        Expulse un utilisateur, de ce serveur et des autres processus ou nœuds.
+
+        Ses jetons de session sont révoqués : il doit saisir de nouveau son mot de passe.
 
         Args:
             username (str): Le nom d'utilisateur de l'utilisateur à expulser.
         """
-        client_to_kick = None
-        for client_socket, info in self.clients.items():
-            if info['username'] == username and client_socket.fileno() != -1:
-                client_to_kick = client_socket
-                break
+        self.sessions.revoke(username)
+        self.disconnect_user(username)
+        if self.bus is not None:
+            self.bus.publish({'event': 'kick', 'username': username})
+
+    # Ferme les sessions locales d'un utilisateur
+    def disconnect_user(self, username):
+        """
+        Ferme toutes les sessions d'un utilisateur connectées à ce processus.
+
+        Args:
+            username (str): Le nom d'utilisateur de l'utilisateur à expulser.
+        """
+        sessions = self.clients.sessions(username)
+        if not sessions:
+            print(f"L'utilisateur {username} introuvable ou déjà déconnecté.")
+            return
 
-        if client_to_kick:
+        for client_to_kick in sessions:
             try:
+                self.disconnect_client(client_to_kick)
                 client_to_kick.close()
             except Exception as e:
                 print(f"Erreur lors de la fermeture du socket pour {username}: {e}")
 
-            if client_to_kick in self.clients:
-                del self.clients[client_to_kick]
+            self.channel_index.remove(client_to_kick)
+            if self.clients.remove(client_to_kick) is not None:
                 print(f"L'utilisateur {username} a été expulsé.")
-        else:
-            print(f"L'utilisateur {username} introuvable ou déjà déconnecté.")
             
     # Ferme le serveur
     def kill_server(self):
@@ -346,10 +1146,19 @@ class ServerBackend(QObject):
         print("Fermeture du serveur...")  # Message de débogage
         self.running = False
         self.server_socket.close()
-        for client_socket in list(self.clients.keys()):
+        self.handshake_pool.shutdown(wait=False)
+        self.ban_list.stop()
+        self.message_writer.close()
+        self.db_manager.pool.close()
+        if self.bus is not None:
+            self.bus.close()
+        for client_socket, info in self.clients.snapshot():
+            info['outbound'].close()
+            # Réveille le thread de réception, bloqué dans recv()
+            self.disconnect_client(client_socket)
             client_socket.close()
         self.clients.clear()
-        QApplication.quit()
+        self.emit_event('server_stopped')
          
     # Bannit un utilisateur
     def ban_user(self, username):
@@ -359,9 +1168,14 @@ class ServerBackend(QObject):
         Args:
             username (str): Le nom d'utilisateur de l'utilisateur à bannir.
         """
+        # La liste est mise à jour en premier pour refuser une reconnexion immédiate
+        self.ban_list.add(username)
+        if self.bus is not None:
+            self.bus.publish({'event': 'ban', 'username': username})
+        # Ferme ses sessions et révoque ses jetons, sur tous les processus et nœuds
         self.kick_user(username)
         self.db_manager.ban_user(username)
-        self.broadcast_message(f"Server: L'utilisateur {username} a été banni.")
+        self.broadcast_message(f"Server: L'utilisateur {username} a été banni.", MSG_NOTICE)
         print(f"L'utilisateur {username} a été banni.")
         
     # Débannit un utilisateur
@@ -373,38 +1187,101 @@ class ServerBackend(QObject):
             username (str): Le nom d'utilisateur de l'utilisateur à débannir.
         """
         self.db_manager.deban_user(username)
-        self.broadcast_message(f"Server: L'utilisateur {username} a été débanni.")
+        self.ban_list.remove(username)
+        if self.bus is not None:
+            self.bus.publish({'event': 'deban', 'username': username})
+        self.broadcast_message(f"Server: L'utilisateur {username} a été débanni.", MSG_NOTICE)
         print(f"L'utilisateur {username} a été débanni.")
         
     # Envoie un message à un client spécifique
-    def send_message_to_client(self, client_socket, message):
+    def send_message_to_client(self, client_socket, message, msg_type=MSG_CHAT):
         """
         Envoie un message à un client spécifique.
 
         Args:
             client_socket (socket): Le socket du client.
             message (str): Le message à envoyer.
+            msg_type (int): Le type de trame, utilisé en mode encadré.
         """
-        client_socket.send(message.encode())
+        protocol = self.clients.get(client_socket, {}).get('protocol', PROTOCOL_TEXT)
+        self.queue_message(client_socket, encode_message(protocol, msg_type, message))
 
     # Diffuse un message à tous les clients connectés
-    def broadcast_message(self, message):
+    def broadcast_message(self, message, msg_type=MSG_CHAT):
+        """
+        Diffuse un message à tous les clients connectés, à ce processus ou à un autre.
+
+        Args:
+            message (str): Le message à diffuser.
+            msg_type (int): Le type de trame, utilisé en mode encadré.
+        """
+        self.deliver_broadcast(message, msg_type)
+        if self.bus is not None:
+            self.bus.publish({'event': 'broadcast', 'message': message, 'msg_type': msg_type})
+
+    # Diffuse un message à tous les clients connectés à ce processus
+    def deliver_broadcast(self, message, msg_type=MSG_CHAT):
         """
-        Diffuse un message à tous les clients connectés.
+        Diffuse un message à tous les clients connectés à ce processus.
 
         Args:
             message (str): Le message à diffuser.
+            msg_type (int): Le type de trame, utilisé en mode encadré.
         """
-        for client_socket in self.clients.keys():
+        # Le message n'est encodé qu'une fois par mode de communication ; le parcours
+        # se fait sur un instantané du registre, sans verrou
+        encoded = {}
+        for client_socket, info in self.clients.snapshot():
             try:
                 if client_socket.fileno() != -1:  # Vérifiez si le socket est toujours ouvert
-                    client_socket.send(message.encode())
-                    print(f"Message envoyé à {self.clients[client_socket]['username']}")  # Debug
-
-                    # Extraction des informations du message pour les stocker dans la base de données
-                    parts = message.split(':', 2)
-                    if len(parts) == 3:
-                        username, channel, msg = parts
-                        self.save_message_to_db(username, channel, msg)
+                    protocol = info['protocol']
+                    if protocol not in encoded:
+                        encoded[protocol] = memoryview(encode_message(protocol, msg_type, message))
+                    # L'envoi est fait par l'écrivain du client : un client lent ne bloque pas les autres
+                    self.queue_message(client_socket, encoded[protocol])
             except Exception as e:
                 print(f"Erreur lors de l'envoi du message: {e}")
+
+    # Applique un événement reçu d'un autre processus par le bus
+    def handle_bus_event(self, event):
+        """
+        Applique un événement publié par un autre processus ou nœud sur le bus.
+
+        Les messages sont remis aux clients locaux ; les bannissements, expulsions
+        et l'arrêt décidés depuis l'interface du serveur sont appliqués localement.
+        Les messages transmis par les autres nœuds pour un canal de ce nœud y sont
+        enregistrés.
+
+        Args:
+            event (dict): L'événement reçu.
+        """
+        kind = event.get('event')
+        if kind == 'channel':
+            if 'entry' in event:
+                message_id, username, content, timestamp = event['entry']
+                self.history_cache.append(
+                    event['channel'], (message_id, username, content, datetime.fromisoformat(timestamp))
+                )
+                # Si ce nœud devient propriétaire du canal, ses identifiants suivront celui-ci
+                if self.message_ids is not None:
+                    self.message_ids.observe(message_id)
+            if event['msg_type'] == MSG_CHAT:
+                self.monitor.publish(event['channel'], event['message'])
+            self.deliver_to_channel(event['channel'], event['message'], event['msg_type'])
+        elif kind == 'forward':
+            self.commit_chat_message(
+                event['username'], event['channel'], event['content'], event['message'], event['hops']
+            )
+        elif kind == 'broadcast':
+            self.deliver_broadcast(event['message'], event['msg_type'])
+        elif kind == 'kick':
+            self.sessions.revoke(event['username'])
+            self.disconnect_user(event['username'])
+        elif kind == 'ban':
+            self.ban_list.add(event['username'])
+        elif kind == 'deban':
+            self.ban_list.remove(event['username'])
+        elif kind == 'kill':
+            self.kill_server()
+        else:
+            print(f"Événement du bus inconnu: {kind}")
@@ -0,0 +1,444 @@
+import asyncio
+import threading
+import time
+from server import ServerBackend, AuthenticationError, HANDSHAKE_TIMEOUT
+from classes.fd_limit import raise_fd_limit
+from classes.outbound_queue import OutboundQueue, POLICY_BLOCK
+from classes.protocol import (
+    FrameDecoder, ProtocolError, decode_hello, detect_protocol, encode_message,
+    AUTH_NONE, AUTH_TOKEN, MSG_CHAT, MSG_HELLO, MSG_HISTORY, PROTOCOL_FRAMED, PROTOCOL_TEXT,
+)
+
+# Taille maximale lue en une fois sur un socket client
+READ_SIZE = 1024
+# Taille lue en une fois sur un socket client en mode encadré
+FRAMED_READ_SIZE = 65536
+# File d'attente des connexions en attente d'acceptation
+LISTEN_BACKLOG = 4096
+# Délai accordé aux tâches des clients pour se terminer à l'arrêt (en secondes)
+SHUTDOWN_TIMEOUT = 2.0
+
+
+# Serveur basé sur une boucle d'événements asyncio
+class AsyncServerBackend(ServerBackend):
+    """
+    Variante du serveur qui gère toutes les connexions sur une seule boucle asyncio.
+
+    L'acceptation, la réception du nom d'utilisateur, la lecture des messages et la
+    diffusion s'exécutent dans un unique thread, au lieu d'un thread système par
+    client. Les appels bloquants à la base de données sont délégués à l'exécuteur
+    de la boucle. Les événements sont transmis aux récepteurs comme avec ServerBackend.
+
+    Attributes:
+        loop (asyncio.AbstractEventLoop): La boucle d'événements du serveur.
+        clients (ClientRegistry): Les clients connectés, indexés par leur StreamWriter.
+    """
+    def __init__(self, host, port, **options):
+        """
+        Initialise le serveur asynchrone avec l'adresse et le port spécifiés.
+
+        Args:
+            host (str): L'adresse du serveur.
+            port (int): Le port du serveur.
+            **options: Options transmises à ServerBackend.
+        """
+        super().__init__(host, port, **options)
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = None
+        self.server = None
+        # Clients dont la file pleine doit ralentir les expéditeurs (politique "block")
+        self.congested = set()
+
+    def start(self):
+        """
+        Démarre le serveur et la boucle d'événements dans un thread dédié.
+        """
+        raise_fd_limit()
+        self.warm_history_cache()
+        self.ban_list.start()
+        self.message_writer.start()
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen(LISTEN_BACKLOG)
+        self.server_socket.setblocking(False)
+        self.loop_thread = threading.Thread(target=self.run_loop, daemon=True)
+        self.loop_thread.start()
+
+    # Exécute la boucle d'événements jusqu'à l'arrêt du serveur
+    def run_loop(self):
+        """
+        Exécute la boucle d'événements du serveur jusqu'à son arrêt.
+        """
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self.handle_client, sock=self.server_socket, backlog=LISTEN_BACKLOG)
+        )
+        try:
+            self.loop.run_forever()
+        finally:
+            # Les connexions étant fermées, les tâches des clients se terminent d'elles-mêmes
+            pending = asyncio.all_tasks(self.loop)
+            if pending:
+                self.loop.run_until_complete(asyncio.wait(pending, timeout=SHUTDOWN_TIMEOUT))
+            self.loop.close()
+
+    # Exécute une fonction dans le thread de la boucle d'événements
+    def call_in_loop(self, callback, *args):
+        """
+        Exécute une fonction dans le thread de la boucle d'événements.
+
+        Les méthodes publiques peuvent être appelées depuis le thread Qt : l'état
+        des clients n'est modifié que depuis la boucle, ce qui évite tout verrou.
+
+        Args:
+            callback (callable): La fonction à exécuter.
+            *args: Les arguments de la fonction.
+        """
+        if self.loop_thread is threading.current_thread():
+            callback(*args)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    # Gère la connexion d'un client, de son authentification à la déconnexion
+    async def handle_client(self, reader, writer):
+        """
+        Gère la connexion d'un client, de son authentification à la déconnexion.
+
+        Args:
+            reader (asyncio.StreamReader): Le flux de lecture du client.
+            writer (asyncio.StreamWriter): Le flux d'écriture du client.
+        """
+        accepted_at = time.monotonic()
+        client_address = writer.get_extra_info('peername')
+        print(f"Nouvelle tentative de connexion de {client_address}")
+
+        try:
+            hello = await asyncio.wait_for(self.read_hello(reader), HANDSHAKE_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"Délai dépassé pour la poignée de main de {client_address}")
+            writer.close()
+            return
+        except Exception as e:
+            print(f"Erreur lors de la réception du nom d'utilisateur: {e}")
+            writer.close()
+            return
+        if hello is None:
+            print("Format de message inattendu pour le nom d'utilisateur")
+            writer.close()
+            return
+        credentials, protocol, decoder, pending = hello
+
+        try:
+            if credentials[0] == AUTH_TOKEN:
+                # Un jeton est vérifié en mémoire, sans quitter la boucle
+                username, channels, token = self.authenticate(credentials)
+            else:
+                # bcrypt et les requêtes MySQL sont bloquants : ils s'exécutent hors de la boucle
+                source = client_address[0] if client_address else None
+                username, channels, token = await self.loop.run_in_executor(
+                    None, self.authenticate, credentials, source
+                )
+        except AuthenticationError as e:
+            print(f"Authentification refusée pour {client_address}: {e}")
+            writer.write(self.encode_auth_reply(protocol, error=str(e)))
+            writer.close()
+            return
+        except Exception as e:
+            print(f"Erreur lors de l'authentification de {client_address}: {e}")
+            writer.close()
+            return
+
+        writer.write(self.encode_auth_reply(protocol, username, token))
+        history = await self.loop.run_in_executor(None, self.build_connect_history, protocol, channels)
+        writer.write(history)
+        self.handshake_latency.record(time.monotonic() - accepted_at)
+
+        ready = asyncio.Event()
+        outbound = OutboundQueue(self.outbound_policy, self.outbound_queue_size, on_ready=ready.set)
+        drained = asyncio.Event()
+        drained.set()
+        self.clients.add(writer, {
+            'address': client_address, 'username': username, 'protocol': protocol,
+            'outbound': outbound, 'drained': drained, 'channels': channels,
+        })
+        for channel in channels:
+            self.channel_index.subscribe(writer, channel)
+        print(f"Nom d'utilisateur '{username}' reçu de {client_address}")
+        self.emit_event('client_connected', username, client_address)
+        self.loop.create_task(self.write_outbound(writer, username, outbound, ready, drained))
+
+        for msg_type, payload in pending:
+            self.handle_frame(writer, username, msg_type, payload)
+
+        while self.running:
+            try:
+                if protocol == PROTOCOL_FRAMED:
+                    data = await reader.read(FRAMED_READ_SIZE)
+                    if not data:
+                        break
+                    for msg_type, payload in decoder.feed(data):
+                        self.handle_frame(writer, username, msg_type, payload)
+                else:
+                    data = await reader.read(READ_SIZE)
+                    if not data:
+                        break
+                    self.handle_chat_message(writer, username, data.decode())
+                # Ne lit pas la suite tant que des destinataires "block" sont saturés
+                if self.congested:
+                    await self.wait_for_outbound_space()
+            except ProtocolError as e:
+                print(f"Erreur de protocole de {username}: {e}")
+                break
+            except Exception as e:
+                print(f"Erreur: {e}")
+                break
+
+        self.channel_index.remove(writer)
+        outbound.close()
+        writer.close()
+        self.clients.remove(writer)
+        print(f"Client déconnecté: {username}")
+        self.emit_event('client_disconnected', username, client_address)
+
+    # Écrit sur le flux du client les messages de sa file d'envoi
+    async def write_outbound(self, writer, username, outbound, ready, drained):
+        """
+        Écrit sur le flux du client les messages de sa file d'envoi, jusqu'à sa fermeture.
+
+        Seule cette tâche écrit sur le flux du client et attend qu'il se vide : un
+        client lent ne retarde que sa propre file.
+
+        Args:
+            writer (asyncio.StreamWriter): Le flux d'écriture du client.
+            username (str): Le nom d'utilisateur du client.
+            outbound (OutboundQueue): La file d'envoi du client.
+            ready (asyncio.Event): Signalé à chaque dépôt dans la file et à sa fermeture.
+            drained (asyncio.Event): Signalé lorsque la file a été entièrement envoyée.
+        """
+        try:
+            while not outbound.closed:
+                await ready.wait()
+                ready.clear()
+                batch = outbound.take()
+                if batch:
+                    # Les tampons partagés sont transmis au transport sans être concaténés
+                    writer.writelines(batch)
+                    await writer.drain()
+                if not len(outbound):
+                    drained.set()
+        except Exception as e:
+            print(f"Erreur lors de l'envoi à {username}: {e}")
+            self.disconnect_client(writer)
+
+    # Dépose un message dans la file d'envoi d'un client
+    def queue_message(self, writer, data):
+        """
+        Dépose un message dans la file d'envoi d'un client, depuis la boucle d'événements.
+
+        La boucle ne doit jamais bloquer : avec la politique "block", une file pleine
+        accepte le message et le client est noté saturé ; ce sont les expéditeurs
+        qui attendent ensuite, dans wait_for_outbound_space(), avant de lire la suite.
+
+        Args:
+            writer (asyncio.StreamWriter): Le flux d'écriture du client.
+            data (bytes): Les données à envoyer.
+        """
+        info = self.clients.get(writer)
+        if info is None:
+            return
+        outbound = info['outbound']
+        if not outbound.put(data, block=False):
+            print(f"Client trop lent, déconnexion: {info['username']}")
+            self.disconnect_client(writer)
+        elif outbound.policy == POLICY_BLOCK and outbound.congested():
+            info['drained'].clear()
+            self.congested.add(writer)
+
+    # Attend que les files saturées des destinataires se vident
+    async def wait_for_outbound_space(self):
+        """
+        Attend que les files saturées des destinataires se vident, et déconnecte
+        ceux qui n'y parviennent pas dans le délai de leur file.
+        """
+        while self.congested:
+            writer = self.congested.pop()
+            info = self.clients.get(writer)
+            if info is None:
+                continue
+            try:
+                await asyncio.wait_for(info['drained'].wait(), info['outbound'].block_timeout)
+            except asyncio.TimeoutError:
+                print(f"Client trop lent, déconnexion: {info['username']}")
+                self.disconnect_client(writer)
+
+    # Interrompt la connexion d'un client
+    def disconnect_client(self, writer):
+        """
+        Interrompt la connexion d'un client ; sa tâche de réception fait le nettoyage.
+
+        Args:
+            writer (asyncio.StreamWriter): Le flux d'écriture du client.
+        """
+        info = self.clients.get(writer)
+        if info is not None:
+            info['outbound'].close()
+        # close() attendrait l'envoi des données en tampon, que le client ne lit pas
+        writer.transport.abort()
+
+    # Lit la première trame ou ligne du client et en extrait ses identifiants
+    async def read_hello(self, reader):
+        """
+        Lit le début de la connexion et en extrait les identifiants du client.
+
+        Args:
+            reader (asyncio.StreamReader): Le flux de lecture du client.
+
+        Returns:
+            tuple or None: (identifiants décodés par decode_hello(), mode de communication,
+            décodeur, trames déjà reçues), ou None si le client n'a pas envoyé ses identifiants.
+        """
+        data = await reader.read(READ_SIZE)
+        protocol = detect_protocol(data)
+        if protocol == PROTOCOL_TEXT:
+            # Le mode texte historique ne transmet que le nom d'utilisateur
+            message = data.decode()
+            if not message.startswith("Username:"):
+                return None
+            return (AUTH_NONE, message.split(":", 1)[1], None), protocol, None, []
+
+        decoder = FrameDecoder()
+        frames = decoder.feed(data)
+        while not frames:
+            data = await reader.read(READ_SIZE)
+            if not data:
+                return None
+            frames = decoder.feed(data)
+        msg_type, payload = frames[0]
+        if msg_type != MSG_HELLO:
+            return None
+        return decode_hello(payload.decode('utf-8')), protocol, decoder, frames[1:]
+
+    def deliver_to_channel(self, channel, message, msg_type):
+        """
+        Diffuse un message aux abonnés locaux d'un canal, depuis la boucle d'événements.
+
+        Args:
+            channel (str): Le canal.
+            message (str): Le message à diffuser.
+            msg_type (int): Le type de trame, utilisé en mode encadré.
+        """
+        if self.loop_thread is not threading.current_thread():
+            self.call_in_loop(self.deliver_to_channel, channel, message, msg_type)
+            return
+
+        super().deliver_to_channel(channel, message, msg_type)
+
+    def send_message_to_client(self, writer, message, msg_type=MSG_CHAT):
+        """
+        Envoie un message à un client spécifique.
+
+        Args:
+            writer (asyncio.StreamWriter): Le flux d'écriture du client.
+            message (str): Le message à envoyer.
+            msg_type (int): Le type de trame, utilisé en mode encadré.
+        """
+        protocol = self.clients.get(writer, {}).get('protocol', PROTOCOL_TEXT)
+        self.call_in_loop(self.queue_message, writer, encode_message(protocol, msg_type, message))
+
+    def send_history_page(self, writer, channel, before_id):
+        """
+        Envoie à un client une page d'historique d'un canal, lue hors de la boucle d'événements.
+
+        Args:
+            writer (asyncio.StreamWriter): Le flux d'écriture du client.
+            channel (str): Le canal demandé.
+            before_id (int): Ne retourner que les messages plus anciens que celui-ci.
+        """
+        def send_page(future):
+            if future.exception() is not None:
+                print(f"Erreur lors de la lecture de l'historique de {channel}: {future.exception()}")
+            elif not writer.is_closing():
+                self.send_message_to_client(writer, future.result(), MSG_HISTORY)
+
+        future = self.loop.run_in_executor(None, self.format_history_page, channel, before_id)
+        future.add_done_callback(send_page)
+
+    # Écrit un message sur le flux de chaque client connecté
+    def write_to_all(self, message, msg_type):
+        """
+        Écrit un message sur le flux de chaque client connecté.
+
+        Args:
+            message (str): Le message à envoyer.
+            msg_type (int): Le type de trame, utilisé en mode encadré.
+        """
+        encoded = {}
+        for writer, info in self.clients.snapshot():
+            try:
+                if not writer.is_closing():
+                    protocol = info['protocol']
+                    if protocol not in encoded:
+                        encoded[protocol] = memoryview(encode_message(protocol, msg_type, message))
+                    self.queue_message(writer, encoded[protocol])
+            except Exception as e:
+                print(f"Erreur lors de l'envoi du message: {e}")
+
+    def deliver_broadcast(self, message, msg_type=MSG_CHAT):
+        """
+        Diffuse un message à tous les clients connectés à ce processus.
+
+        Args:
+            message (str): Le message à diffuser.
+            msg_type (int): Le type de trame, utilisé en mode encadré.
+        """
+        if self.loop_thread is not threading.current_thread():
+            self.call_in_loop(self.deliver_broadcast, message, msg_type)
+            return
+
+        self.write_to_all(message, msg_type)
+
+    def disconnect_user(self, username):
+        """
+        Ferme toutes les sessions d'un utilisateur connectées à ce processus.
+
+        Args:
+            username (str): Le nom d'utilisateur de l'utilisateur à expulser.
+        """
+        if self.loop_thread is not threading.current_thread():
+            self.call_in_loop(self.disconnect_user, username)
+            return
+
+        sessions = self.clients.sessions(username)
+        if not sessions:
+            print(f"L'utilisateur {username} introuvable ou déjà déconnecté.")
+            return
+        for writer in sessions:
+            self.disconnect_client(writer)
+            self.channel_index.remove(writer)
+            self.clients.remove(writer)
+            print(f"L'utilisateur {username} a été expulsé.")
+
+    def kill_server(self):
+        """
+        Arrête le serveur, ferme toutes les connexions et la boucle d'événements.
+        """
+        print("Fermeture du serveur...")
+        self.running = False
+        self.call_in_loop(self.close_all)
+        self.ban_list.stop()
+        self.message_writer.close()
+        self.db_manager.pool.close()
+        if self.bus is not None:
+            self.bus.close()
+        self.emit_event('server_stopped')
+
+    # Ferme le socket d'écoute et toutes les connexions, puis arrête la boucle
+    def close_all(self):
+        """
+        Ferme le socket d'écoute et toutes les connexions, puis arrête la boucle.
+        """
+        if self.server:
+            self.server.close()
+        for writer, _ in self.clients.snapshot():
+            self.disconnect_client(writer)
+        self.clients.clear()
+        self.loop.stop()
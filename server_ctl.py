@@ -0,0 +1,35 @@
+# Outil d'administration d'un serveur lancé avec --headless
+import sys
+import json
+import argparse
+from classes.control_socket import CONTROL_COMMANDS, CONTROL_TIMEOUT, default_control_path, send_control_command
+
+# Analyse les arguments de la ligne de commande
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Administration d'un serveur PyChat sans interface")
+    parser.add_argument("command", choices=CONTROL_COMMANDS, help="La commande à exécuter")
+    parser.add_argument("username", nargs="?", help="L'utilisateur visé par kick, ban et deban")
+    parser.add_argument("--port", type=int, default=5566,
+                        help="Port d'écoute du serveur, pour trouver son socket de contrôle par défaut")
+    parser.add_argument("--control-socket", metavar="CHEMIN",
+                        help="Chemin du socket de contrôle, s'il a été choisi au lancement du serveur")
+    parser.add_argument("--timeout", type=float, default=CONTROL_TIMEOUT,
+                        help="Délai maximal d'attente de la réponse, en secondes")
+    return parser.parse_args(argv)
+
+# Définition de la fonction principale 'main'
+def main():
+    args = parse_args(sys.argv[1:])
+    path = args.control_socket or default_control_path(args.port)
+    try:
+        reply = send_control_command(path, args.command, args.username, args.timeout)
+    except OSError as e:
+        sys.exit(f"Serveur injoignable sur {path}: {e}")
+    if not reply.get('ok'):
+        sys.exit(f"Erreur: {reply.get('error')}")
+    if reply.get('result') is not None:
+        print(json.dumps(reply['result'], ensure_ascii=False, indent=2))
+
+# Vérification si le script est exécuté comme programme principal et non importé comme module
+if __name__ == '__main__':
+    main()
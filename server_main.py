@@ -1,22 +1,196 @@
-# Importations nécessaires de PyQt5 et autres bibliothèques
+# Importations nécessaires ; PyQt5 n'est importé qu'avec l'interface (voir main)
+import os
 import sys
-from PyQt5.QtWidgets import QApplication
+import signal
+import socket
+import argparse
+import threading
 from server import ServerBackend
-from server_ui import ServerUI
+from classes.history_cache import HISTORY_CACHE_SIZE
+from classes.outbound_queue import OUTBOUND_POLICIES, OUTBOUND_QUEUE_SIZE, POLICY_DROP_OLDEST
+from server_async import AsyncServerBackend
+from server_shards import ShardCoordinator
+from classes.shard_bus import sharding_supported
+from classes.cluster import ClusterNode, CLUSTER_SLOTS
+from classes.moderation import MODERATION_ACTIONS, ACTION_MASK, DEFAULT_LANGUAGES, available_languages
+from classes.session_tokens import SESSION_TTL
+from classes.monitor_feed import MONITOR_CHANNEL_LINES, MONITOR_RATE
+from classes.server_events import ServerEvents
+from classes.control_socket import ControlServer, default_control_path
+
+# Moteurs réseau disponibles pour le serveur
+ENGINES = {
+    "threads": ServerBackend,
+    "asyncio": AsyncServerBackend,
+}
+
+# Analyse les arguments de la ligne de commande
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Serveur PyChat")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute du serveur")
+    parser.add_argument("--port", type=int, default=5566, help="Port d'écoute du serveur")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="threads",
+                        help="Moteur réseau : un thread par client ou une boucle asyncio unique")
+    parser.add_argument("--history-cache-size", type=int, default=HISTORY_CACHE_SIZE,
+                        help="Nombre de messages récents gardés en mémoire par canal")
+    parser.add_argument("--outbound-policy", choices=OUTBOUND_POLICIES, default=POLICY_DROP_OLDEST,
+                        help="Traitement d'un client trop lent dont la file d'envoi est pleine : "
+                             "abandonner ses plus anciens messages, le déconnecter ou ralentir l'expéditeur")
+    parser.add_argument("--outbound-queue-size", type=int, default=OUTBOUND_QUEUE_SIZE,
+                        help="Nombre maximal de messages en attente d'envoi par client")
+    parser.add_argument("--moderation", choices=MODERATION_ACTIONS, default=ACTION_MASK,
+                        help="Traitement des messages qui contiennent un mot interdit : aucun, "
+                             "mot masqué, message refusé ou message signalé dans le journal")
+    parser.add_argument("--moderation-languages", default=",".join(DEFAULT_LANGUAGES),
+                        help="Langues des listes de mots interdits, séparées par des virgules, ou \"all\"")
+    parser.add_argument("--auth-secret", default=os.environ.get("PYCHAT_AUTH_SECRET"),
+                        help="Clé de signature des jetons de session (par défaut $PYCHAT_AUTH_SECRET, "
+                             "sinon aléatoire) ; obligatoire et identique sur tous les nœuds d'une grappe")
+    parser.add_argument("--session-ttl", type=int, default=SESSION_TTL,
+                        help="Durée de validité des jetons de session, en secondes")
+    parser.add_argument("--allow-unauthenticated", action="store_true",
+                        help="Accepter les anciens clients, qui n'envoient que leur nom d'utilisateur")
+    parser.add_argument("--monitor-lines", type=int, default=MONITOR_CHANNEL_LINES,
+                        help="Nombre maximal de messages en attente d'affichage par canal dans l'interface")
+    parser.add_argument("--monitor-rate", type=int, default=MONITOR_RATE,
+                        help="Nombre maximal de messages affichés par canal et par seconde dans l'interface")
+    parser.add_argument("--max-messages", type=int,
+                        help="Nombre maximal de messages gardés par canal dans l'interface (1000 par défaut)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Démarrer sans interface ni Qt ; les commandes d'administration passent "
+                             "par le socket de contrôle (voir server_ctl.py)")
+    parser.add_argument("--control-socket", metavar="CHEMIN",
+                        help="Chemin du socket de contrôle du mode sans interface "
+                             "(par défaut pychat-control-<port>.sock dans le répertoire temporaire)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Nombre de processus qui se partagent le port (Linux, macOS)")
+    parser.add_argument("--cluster-listen", metavar="HÔTE:PORT",
+                        help="Adresse d'écoute de ce nœud pour les autres nœuds de la grappe")
+    parser.add_argument("--cluster-peers", default="", metavar="HÔTE:PORT,...",
+                        help="Adresses d'autres nœuds de la grappe, séparées par des virgules")
+    parser.add_argument("--node-id", type=int, default=0,
+                        help=f"Numéro de ce nœud, unique dans la grappe (0 à {CLUSTER_SLOTS - 1})")
+    # Les arguments inconnus sont laissés à Qt
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+class HeadlessEvents(ServerEvents):
+    """
+    Récepteur des événements du serveur en mode sans interface.
+
+    Attributes:
+        stopped (threading.Event): Positionné lorsque le serveur est arrêté.
+    """
+    def __init__(self):
+        self.stopped = threading.Event()
+
+    def server_stopped(self):
+        self.stopped.set()
+
+
+# Exécute le serveur sans interface jusqu'à son arrêt
+def run_headless(server_backend, control_path):
+    """
+    Exécute un serveur démarré, sans interface, jusqu'à son arrêt.
+
+    Le serveur s'arrête par la commande kill du socket de contrôle, Ctrl+C ou SIGTERM.
+
+    Args:
+        server_backend (ServerBackend): Le serveur, déjà démarré.
+        control_path (str): Le chemin du socket de contrôle.
+
+    Returns:
+        int: Le code de sortie du processus.
+    """
+    events = HeadlessEvents()
+    server_backend.add_event_sink(events)
+    control = ControlServer(control_path, server_backend)
+    control.start()
+    print(f"Serveur démarré sans interface sur {server_backend.host}:{server_backend.port}, "
+          f"socket de contrôle {control_path}")
+
+    # SIGTERM (arrêt du service) est traité comme Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        # L'attente est découpée pour que Ctrl+C soit pris en compte
+        while not events.stopped.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        server_backend.kill_server()
+    finally:
+        control.close()
+    return 0
 
 # Définition de la fonction principale 'main'
 def main():
-    # Création d'une instance de l'application Qt. sys.argv permet de gérer les arguments en ligne de commande
-    app = QApplication(sys.argv)
+    args = parse_args(sys.argv[1:])
+    if args.workers > 1 and not sharding_supported():
+        sys.exit("--workers nécessite SO_REUSEPORT et les sockets Unix, indisponibles sur ce système.")
+    if args.cluster_listen and args.workers > 1:
+        sys.exit("--cluster-listen et --workers ne peuvent pas être utilisés ensemble.")
+    if not 0 <= args.node_id < CLUSTER_SLOTS:
+        sys.exit(f"--node-id doit être compris entre 0 et {CLUSTER_SLOTS - 1}.")
+    if args.cluster_listen and not args.auth_secret:
+        sys.exit("--cluster-listen nécessite --auth-secret : les nœuds doivent accepter les mêmes jetons de session.")
+    if args.session_ttl <= 0:
+        sys.exit("--session-ttl doit être positif.")
+    if min(args.monitor_lines, args.monitor_rate, args.max_messages or 1) < 1:
+        sys.exit("--monitor-lines, --monitor-rate et --max-messages doivent être positifs.")
+    if args.headless and not hasattr(socket, "AF_UNIX"):
+        sys.exit("--headless nécessite les sockets Unix, indisponibles sur ce système.")
 
-    # Création de l'instance du backend du serveur, avec l'adresse IP et le port spécifiés
-    server_backend = ServerBackend("127.0.0.1", 5566)
+    if args.moderation_languages == "all":
+        languages = available_languages()
+    else:
+        languages = [language.strip() for language in args.moderation_languages.split(",") if language.strip()]
+        unknown = set(languages) - set(available_languages())
+        if unknown:
+            sys.exit(f"Langues inconnues pour --moderation-languages: {', '.join(sorted(unknown))}")
+
+    # Création de l'instance du backend du serveur, avec l'adresse IP, le port et le moteur spécifiés
+    options = {
+        'history_cache_size': args.history_cache_size,
+        'outbound_policy': args.outbound_policy,
+        'outbound_queue_size': args.outbound_queue_size,
+        'moderation': args.moderation,
+        'moderation_languages': languages,
+        'auth_required': not args.allow_unauthenticated,
+        'auth_secret': args.auth_secret,
+        'session_ttl': args.session_ttl,
+        # Sans interface, personne ne lit le flux des messages
+        'monitor_lines': 0 if args.headless else args.monitor_lines,
+        'monitor_rate': args.monitor_rate,
+    }
+    if args.workers > 1:
+        # Les clients sont répartis entre plusieurs processus ; celui-ci garde l'interface
+        server_backend = ShardCoordinator(args.host, args.port, ENGINES[args.engine], args.workers, **options)
+    elif args.cluster_listen:
+        # Chaque nœud attribue les identifiants de message de son numéro
+        server_backend = ENGINES[args.engine](
+            args.host, args.port, shard_index=args.node_id, shard_count=CLUSTER_SLOTS, **options
+        )
+        peers = [peer.strip() for peer in args.cluster_peers.split(",") if peer.strip()]
+        server_backend.bus = ClusterNode(args.cluster_listen, peers, server_backend.handle_bus_event)
+        server_backend.bus.start()
+    else:
+        server_backend = ENGINES[args.engine](args.host, args.port, **options)
 
     # Démarrage du serveur backend
     server_backend.start()
 
+    if args.headless:
+        sys.exit(run_headless(server_backend, args.control_socket or default_control_path(args.port)))
+
+    # L'interface et Qt ne sont chargés qu'ici : le mode sans interface ne les importe jamais
+    from PyQt5.QtWidgets import QApplication
+    from classes.message_list import MAX_CHANNEL_MESSAGES
+    from server_ui import ServerUI
+
+    # Création d'une instance de l'application Qt. sys.argv permet de gérer les arguments en ligne de commande
+    app = QApplication(sys.argv)
+
     # Création de l'interface utilisateur du serveur et passage du backend en tant que paramètre
-    ex = ServerUI(server_backend)
+    ex = ServerUI(server_backend, args.max_messages or MAX_CHANNEL_MESSAGES)
 
     # Affichage de l'interface utilisateur
     ex.show()
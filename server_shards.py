@@ -0,0 +1,152 @@
+import os
+import time
+import multiprocessing
+from server import ServerBackend
+from classes.shard_bus import BusHub, BusPeer
+
+
+# Délai accordé aux processus de travail pour s'arrêter (en secondes)
+WORKER_STOP_TIMEOUT = 5.0
+
+
+# Point d'entrée d'un processus de travail
+def run_worker(backend_class, host, port, shard_index, shard_count, bus_path, options):
+    """
+    Exécute un serveur dans un processus de travail, jusqu'à son arrêt.
+
+    Le processus écoute sur le port partagé, se connecte au bus du processus
+    principal et s'arrête lorsque le bus est fermé.
+
+    Args:
+        backend_class (type): ServerBackend ou AsyncServerBackend.
+        host (str): L'adresse du serveur.
+        port (int): Le port partagé par tous les processus.
+        shard_index (int): Le numéro de ce processus.
+        shard_count (int): Le nombre de processus de travail.
+        bus_path (str): Le chemin du socket Unix du bus.
+        options (dict): Options transmises au serveur.
+    """
+    # Seul le processus principal a une interface : le flux des messages y est inutile
+    options = dict(options, monitor_lines=0)
+    backend = backend_class(
+        host, port, shard_index=shard_index, shard_count=shard_count, reuse_port=True, **options
+    )
+    backend.bus = BusPeer(bus_path, backend.handle_bus_event)
+    backend.start()
+    print(f"Processus {shard_index} démarré (pid {os.getpid()})")
+    backend.bus.run()
+    # Le bus est fermé : arrêt demandé, ou processus principal disparu
+    if backend.running:
+        backend.kill_server()
+
+
+# Processus principal du serveur réparti sur plusieurs processus
+class ShardCoordinator(ServerBackend):
+    """
+    Processus principal du mode multi-processus.
+
+    Un seul processus Python est limité par son GIL : ce mode lance plusieurs
+    processus de travail qui écoutent sur le même port (SO_REUSEPORT), chacun avec
+    ses propres clients. Le processus principal n'accepte aucun client : il héberge
+    l'interface du serveur et le concentrateur du bus qui relaie entre processus
+    les messages, les bannissements, les expulsions et l'arrêt.
+
+    Attributes:
+        backend_class (type): La classe de serveur des processus de travail.
+        workers (int): Le nombre de processus de travail.
+        processes (list): Les processus de travail démarrés.
+    """
+    def __init__(self, host, port, backend_class, workers, **options):
+        """
+        Initialise le processus principal.
+
+        Args:
+            host (str): L'adresse du serveur.
+            port (int): Le port partagé par tous les processus.
+            backend_class (type): ServerBackend ou AsyncServerBackend.
+            workers (int): Le nombre de processus de travail.
+            **options: Options transmises au serveur de chaque processus.
+        """
+        # Une reconnexion peut aboutir sur un autre processus : tous signent avec la même clé
+        if options.get('auth_secret') is None:
+            options['auth_secret'] = os.urandom(32)
+        super().__init__(host, port, **options)
+        self.backend_class = backend_class
+        self.workers = workers
+        self.options = options
+        self.processes = []
+        self.bus = BusHub(self.handle_bus_event)
+
+    def start(self):
+        """
+        Démarre le bus puis les processus de travail.
+        """
+        # Le cache alimente l'historique affiché par l'interface du serveur
+        self.warm_history_cache()
+        self.bus.start()
+        # "spawn" : les processus de travail n'héritent pas de l'état de Qt
+        context = multiprocessing.get_context("spawn")
+        for index in range(self.workers):
+            process = context.Process(
+                target=run_worker,
+                args=(self.backend_class, self.host, self.port, index, self.workers, self.bus.path, self.options),
+                name=f"pychat-shard-{index}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+
+    def get_stats(self):
+        """
+        Retourne les statistiques du processus principal et l'état des processus de travail.
+
+        Returns:
+            dict: Les statistiques, regroupées par composant.
+        """
+        return {
+            'shards': {
+                f"{process.name} (pid {process.pid})": "actif" if process.is_alive() else "arrêté"
+                for process in self.processes
+            },
+            'bus': self.bus.stats(),
+            'db_pool': self.db_manager.pool.stats(),
+            'history_cache': self.history_cache.stats(),
+            'monitor': self.monitor.stats(),
+        }
+
+    def handle_bus_event(self, event):
+        """
+        Met à jour le cache et l'interface avec les messages publiés par les processus de travail.
+
+        Args:
+            event (dict): L'événement reçu.
+        """
+        if event.get('event') == 'channel':
+            super().handle_bus_event(event)
+
+    def disconnect_user(self, username):
+        """
+        N'a rien à fermer : les clients sont connectés aux processus de travail, qui
+        reçoivent l'expulsion par le bus.
+
+        Args:
+            username (str): Le nom d'utilisateur de l'utilisateur à expulser.
+        """
+
+    def kill_server(self):
+        """
+        Arrête tous les processus de travail puis le processus principal.
+        """
+        print("Fermeture du serveur...")
+        self.running = False
+        self.bus.publish({'event': 'kill'})
+        deadline = time.monotonic() + WORKER_STOP_TIMEOUT
+        for process in self.processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                print(f"Le processus {process.name} ne s'est pas arrêté, il est interrompu.")
+                process.terminate()
+        self.bus.close()
+        self.handshake_pool.shutdown(wait=False)
+        self.db_manager.pool.close()
+        self.emit_event('server_stopped')
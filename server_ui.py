@@ -1,30 +1,67 @@
 # Importations nécessaires de PyQt5 et autres bibliothèques
-from PyQt5.QtWidgets import QMainWindow, QTextEdit, QLineEdit, QPushButton, QVBoxLayout, QWidget, QTabWidget, QMessageBox
-from PyQt5.QtCore import pyqtSlot, QEvent, Qt
+from PyQt5.QtWidgets import (
+    QMainWindow, QListView, QLineEdit, QPushButton, QVBoxLayout, QWidget, QTabWidget, QMessageBox,
+    QCheckBox, QAbstractItemView, QApplication,
+)
+from PyQt5.QtCore import pyqtSlot, pyqtSignal, QObject, QEvent, Qt, QTimer
 from PyQt5.QtGui import QIcon
 from datetime import datetime
+from classes.message_list import MessageListModel, MAX_CHANNEL_MESSAGES
+from classes.protocol import CHANNELS
+from classes.server_events import ServerEvents
+
+# Intervalle de lecture du flux des messages du serveur (en millisecondes)
+MONITOR_INTERVAL_MS = 250
+
+
+class QtServerEvents(QObject, ServerEvents):
+    """
+    Récepteur des événements du serveur pour l'interface Qt.
+
+    Les événements arrivent des threads réseau : ils sont relayés par des signaux,
+    remis dans le thread de l'interface.
+
+    Attributes:
+        stopped (pyqtSignal): Signal émis lorsque le serveur est arrêté.
+    """
+    stopped = pyqtSignal()
+
+    def server_stopped(self):
+        self.stopped.emit()
+
 
 class ServerUI(QMainWindow):
     """
     Interface utilisateur pour le serveur de chat.
 
+    Les messages ne sont pas remis un par un : l'interface lit le flux borné du
+    serveur (ServerBackend.monitor) toutes les MONITOR_INTERVAL_MS et ajoute en une
+    fois les messages de chaque canal. En dehors du suivi en direct, le flux n'est
+    plus lu et ne garde que les messages les plus récents.
+
     Attributes:
         server (ServerBackend): Instance du backend du serveur pour la communication.
-        textAreas (dict): Dictionnaire stockant les zones de texte par canal.
+        chatModels (dict): Dictionnaire stockant les messages affichés par canal.
+        chatViews (dict): Dictionnaire stockant les listes de messages par canal.
         inputFields (dict): Dictionnaire stockant les champs de saisie par canal.
     """
-    def __init__(self, server_backend=None):
+    def __init__(self, server_backend=None, max_messages=MAX_CHANNEL_MESSAGES):
         """
         Initialise l'interface utilisateur du serveur.
 
         Args:
             server_backend (ServerBackend, optional): Instance du backend du serveur.
+            max_messages (int): Nombre maximal de messages affichés par canal.
         """
         super().__init__()
-        # Initialisation de la référence au backend du serveur et des dictionnaires pour les zones de texte et les champs de saisie
+        # Initialisation de la référence au backend du serveur et des dictionnaires pour les listes de messages et les champs de saisie
         self.server = server_backend
-        self.textAreas = {}
+        self.max_messages = max_messages
+        self.chatModels = {}
+        self.chatViews = {}
         self.inputFields = {}
+        self.monitorTimer = QTimer(self)
+        self.monitorTimer.timeout.connect(self.readMonitor)
         self.initUI()
         if self.server:
             self.setServer(self.server)
@@ -72,12 +109,15 @@ class ServerUI(QMainWindow):
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
 
+        # Suivi en direct : les nouveaux messages sont affichés et la liste défile jusqu'en bas
+        self.liveTail = QCheckBox("Suivi en direct")
+        self.liveTail.setChecked(True)
+        self.liveTail.toggled.connect(self.setLiveTail)
+        layout.addWidget(self.liveTail)
+
         # Création des onglets pour différents canaux de chat
-        self.createChannelTab("Général")
-        self.createChannelTab("Blabla")
-        self.createChannelTab("Comptabilité")
-        self.createChannelTab("Informatique")
-        self.createChannelTab("Marketing")
+        for channel_name in CHANNELS:
+            self.createChannelTab(channel_name)
 
     def createChannelTab(self, channel_name):
         """
@@ -89,11 +129,17 @@ class ServerUI(QMainWindow):
         tab = QWidget()
         tabLayout = QVBoxLayout()
 
-        # Zone de texte pour afficher les messages
-        textArea = QTextEdit()
-        textArea.setReadOnly(True)
-        tabLayout.addWidget(textArea)
-        self.textAreas[channel_name] = textArea
+        # Liste des messages : seules les lignes visibles sont mises en page
+        chatModel = MessageListModel(self.max_messages, self)
+        chatView = QListView()
+        chatView.setModel(chatModel)
+        chatView.setWordWrap(True)
+        chatView.setUniformItemSizes(False)
+        chatView.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        chatView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        tabLayout.addWidget(chatView)
+        self.chatModels[channel_name] = chatModel
+        self.chatViews[channel_name] = chatView
 
         # Champ de saisie pour taper les messages
         inputField = QLineEdit()
@@ -107,7 +153,7 @@ class ServerUI(QMainWindow):
         # Bouton pour envoyer les messages
         sendButton = QPushButton("Envoyer")
         # S'assure que la connexion au signal est correctement établie
-        sendButton.clicked.connect(lambda: self.sendMessage(channel_name, inputField.text(), textArea))
+        sendButton.clicked.connect(lambda: self.sendMessage(channel_name, inputField.text()))
         tabLayout.addWidget(sendButton)
 
         tab.setLayout(tabLayout)
@@ -129,7 +175,7 @@ class ServerUI(QMainWindow):
         if event.type() == QEvent.KeyPress and event.key() == Qt.Key_Return:
             if isinstance(obj, QLineEdit):
                 channel_name = self.tabs.tabText(self.tabs.currentIndex())
-                self.sendMessage(channel_name, obj.text(), self.textAreas[channel_name])
+                self.sendMessage(channel_name, obj.text())
                 return True
         return super(ServerUI, self).eventFilter(obj, event)
 
@@ -138,31 +184,35 @@ class ServerUI(QMainWindow):
         """
         Charge l'historique des messages du serveur et les affiche.
         """
-        # Charge l'historique des messages du serveur et les affiche dans l'interface utilisateur.
-        history = self.server.get_message_history()
-        if not history:
-            print("Aucun historique de messages à charger.")
-            return
-        for username, content, timestamp in history:
-            try:
-                channel, message = content.split(':', 1)
-                readable_timestamp = self.format_timestamp(timestamp)
-                formatted_message = f"{readable_timestamp} - {username}: {message}"
-                if channel in self.textAreas:
-                    self.textAreas[channel].append(formatted_message)
-                else:
-                    print(f"Canal inconnu: {channel}")
-            except ValueError:
-                print(f"Erreur de format du message: {content}")
+        # Charge la page la plus récente de chaque canal et l'affiche dans l'interface utilisateur, en un ajout par canal.
+        for channel in self.chatModels:
+            history = self.server.get_channel_history(channel)
+            self.appendMessages(channel, [
+                f"{self.format_timestamp(timestamp)} - {username}: {message}"
+                for message_id, username, message, timestamp in reversed(history)
+            ])
+
+    # Ajoute des messages à la fin d'un canal
+    def appendMessages(self, channel, lines):
+        """
+        Ajoute des messages à la fin d'un canal, en retirant les plus anciens au-delà
+        de la taille de la liste, et la fait défiler en suivi en direct.
 
-    def sendMessage(self, channel_name, message, textArea):
+        Args:
+            channel (str): Le canal.
+            lines (list): Les messages formatés, du plus ancien au plus récent.
+        """
+        self.chatModels[channel].append_lines(lines)
+        if self.liveTail.isChecked():
+            self.chatViews[channel].scrollToBottom()
+
+    def sendMessage(self, channel_name, message):
         """
         Envoie un message au canal spécifié et met à jour l'interface utilisateur.
 
         Args:
             channel_name (str): Le nom du canal.
             message (str): Le message à envoyer.
-            textArea (QTextEdit): La zone de texte où afficher le message.
         """
         if message:
             # Vérifier si le message est une commande admin
@@ -172,9 +222,9 @@ class ServerUI(QMainWindow):
                 # Traitement pour les messages normaux
                 if self.server:
                     self.server.send_message_to_channel(channel_name, message)
-                    textArea.append(f"Vous ({channel_name}): {message}")
+                    self.appendMessages(channel_name, [f"Vous ({channel_name}): {message}"])
                 else:
-                    textArea.append("Erreur: le serveur n'est pas connecté.")
+                    self.appendMessages(channel_name, ["Erreur: le serveur n'est pas connecté."])
 
             # Effacer le champ de saisie après l'envoi du message
             self.inputFields[channel_name].clear()
@@ -200,34 +250,72 @@ class ServerUI(QMainWindow):
         elif cmd == 'kill':
             # La commande 'kill' n'a pas besoin d'arguments
             self.server.handle_command(cmd, None)
+        elif cmd == 'stats':
+            QMessageBox.information(self, "Statistiques", self.format_stats(self.server.get_stats()))
         else:
             QMessageBox.warning(self, "Erreur", "Commande inconnue.")
             
-    @pyqtSlot(str)
-    def logMessage(self, message):
+    def format_stats(self, stats, indent=""):
         """
-        Log et affiche un message reçu du serveur.
+        Met en forme les statistiques du serveur pour l'affichage.
 
         Args:
-            message (str): Le message reçu.
+            stats (dict): Les statistiques retournées par ServerBackend.get_stats().
+            indent (str): Indentation des lignes, pour les sous-sections.
+
+        Returns:
+            str: Les statistiques, une par ligne.
         """
+        lines = []
+        for name, value in stats.items():
+            if isinstance(value, dict):
+                lines.append(f"{indent}{name}:")
+                lines.append(self.format_stats(value, indent + "    "))
+            elif isinstance(value, float):
+                lines.append(f"{indent}{name}: {value:.2f}")
+            else:
+                lines.append(f"{indent}{name}: {value}")
+        return "\n".join(lines)
 
-        # Traite et affiche les messages reçus du serveur.
-        print("Message reçu:", message)  # Pour débogage
+    # Affiche les messages déposés dans le flux du serveur depuis la dernière lecture
+    @pyqtSlot()
+    def readMonitor(self):
+        """
+        Affiche les messages déposés dans le flux du serveur depuis la dernière lecture.
 
-        now = datetime.now()
-        formatted_time = now.strftime('%H:%M')  # Formatte l'heure actuelle
-
-        parts = message.split(':', 2)
-        if len(parts) == 3:
-            username, channel, msg = parts
-            formatted_message = f"{formatted_time} - {username}: {msg}"
-            if channel.strip() in self.textAreas:
-                self.textAreas[channel.strip()].append(formatted_message)
-            else:
-                print(f"Canal inconnu: {channel}")
+        Les messages non retenus par le flux (débit trop élevé, interface en pause)
+        sont signalés par une ligne qui indique leur nombre.
+        """
+        for channel, (entries, skipped) in self.server.monitor.drain().items():
+            lines = []
+            if skipped:
+                lines.append(f"[{skipped} messages non affichés]")
+            for received_at, message in entries:
+                parts = message.split(':', 2)
+                if len(parts) == 3:
+                    username, _, msg = parts
+                    lines.append(f"{datetime.fromtimestamp(received_at).strftime('%H:%M')} - {username}: {msg}")
+                else:
+                    print("Format de message incorrect:", message)
+            self.appendMessages(channel, lines)
+
+    # Active ou suspend le suivi en direct
+    @pyqtSlot(bool)
+    def setLiveTail(self, enabled):
+        """
+        Active ou suspend le suivi en direct.
+
+        En pause, la liste ne bouge plus et le flux n'est plus lu : il ne garde que
+        les messages les plus récents, affichés à la reprise.
+
+        Args:
+            enabled (bool): True pour suivre les nouveaux messages.
+        """
+        if enabled:
+            self.readMonitor()
+            self.monitorTimer.start(MONITOR_INTERVAL_MS)
         else:
-            print("Format de message incorrect:", message)
+            self.monitorTimer.stop()
 
     def setServer(self, server):
         """
@@ -238,20 +326,14 @@ class ServerUI(QMainWindow):
         """
         # Configure le serveur et connecte les signaux aux slots.
         self.server = server
-        self.server.new_message.connect(self.logMessage) 
-        self.server.new_connection.connect(self.showNewConnectionPopup)
+        # L'arrêt du serveur (commande /kill) ferme l'application
+        self.serverEvents = QtServerEvents(self)
+        self.serverEvents.stopped.connect(QApplication.quit)
+        self.server.add_event_sink(self.serverEvents)
         
-        # Charger l'historique des messages
+        # Charger l'historique des messages, puis suivre le flux des nouveaux messages ;
+        # les messages déjà déposés dans le flux figurent dans l'historique
+        self.server.monitor.drain()
         self.load_message_history()
-        
-    @pyqtSlot(str)
-    def showNewConnectionPopup(self, message):
-        """
-        Affiche une fenêtre popup pour les nouvelles connexions.
-
-        Args:
-            message (str): Le message à afficher dans la popup.
-        """
-
-        # Affiche une fenêtre popup pour les nouvelles connexions.
-        QMessageBox.information(self, "Nouvelle Connexion", message)
+        if self.liveTail.isChecked():
+            self.monitorTimer.start(MONITOR_INTERVAL_MS)
@@ -0,0 +1,13 @@
+class FakeClock:
+    """
+    Horloge des tests : l'instant ne change que lorsque le test l'avance.
+    """
+    def __init__(self, now=1700000000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    # Avance l'horloge
+    def advance(self, seconds):
+        self.now += seconds
@@ -0,0 +1,56 @@
+from classes.channel_index import ChannelIndex, allowed_channels
+
+
+def test_subscribe_and_members():
+    index = ChannelIndex(("Général", "Blabla"))
+    assert index.subscribe("a", "Général")
+    assert index.subscribe("b", "Général")
+    assert not index.subscribe("a", "Inconnu")
+    assert index.members("Général") == frozenset({"a", "b"})
+    assert index.members("Blabla") == frozenset()
+    assert index.members("Inconnu") == frozenset()
+    assert index.is_member("a", "Général")
+    assert not index.is_member("a", "Blabla")
+
+
+# Un frozenset déjà retourné n'est pas modifié par les abonnements suivants
+def test_published_snapshot_is_stable():
+    index = ChannelIndex(("Général",))
+    index.subscribe("a", "Général")
+    snapshot = index.members("Général")
+    index.subscribe("b", "Général")
+    index.unsubscribe("a", "Général")
+    assert snapshot == frozenset({"a"})
+    assert index.members("Général") == frozenset({"b"})
+
+
+# Une rafale d'abonnements ne reconstruit le frozenset qu'à la lecture suivante
+def test_snapshot_rebuilt_once_per_read_after_changes():
+    index = ChannelIndex(("Général",))
+    for client in range(1000):
+        index.subscribe(client, "Général")
+    assert index.rebuilds == 0
+    assert len(index.members("Général")) == 1000
+    assert index.members("Général") is index.members("Général")
+    assert index.rebuilds == 1
+
+
+def test_remove_leaves_every_channel():
+    index = ChannelIndex(("Général", "Blabla"))
+    index.subscribe("a", "Général")
+    index.subscribe("a", "Blabla")
+    index.subscribe("b", "Blabla")
+    index.members("Blabla")
+    index.remove("a")
+    assert index.members("Général") == frozenset()
+    assert index.members("Blabla") == frozenset({"b"})
+    assert not index.is_member("a", "Blabla")
+    assert index.stats() == {"Général": 0, "Blabla": 1}
+
+
+def test_allowed_channels():
+    channels = ("Général", "Blabla", "Comptabilité")
+    assert allowed_channels(None, channels) == channels
+    assert allowed_channels([("Blabla", 1)], channels) == ("Blabla",)
+    assert allowed_channels([("Blabla", 0)], channels) == ("Général", "Comptabilité")
+    assert allowed_channels([("Blabla", 1), ("Général", None)], channels) == ("Blabla",)
@@ -0,0 +1,192 @@
+import socket
+
+import pytest
+
+from classes.chat_client import (
+    ChatClient, ClientSession, parse_history_line, parse_message, EVENT_CLOSED, EVENT_LINE, EVENT_PAGE,
+)
+from classes.protocol import (
+    FrameDecoder, ProtocolError, decode_hello, encode_auth_reply, encode_frame, encode_history_page,
+    AUTH_PASSWORD, MSG_AUTH, MSG_CHAT, MSG_COMMAND, MSG_HELLO, MSG_HISTORY, MSG_NOTICE, PROTOCOL_TEXT,
+)
+
+
+# Retire l'heure de réception, qui dépend de l'horloge
+def without_time(events):
+    return [(EVENT_LINE, event[1], event[2].split(" - ", 1)[1]) if event[0] == EVENT_LINE else event for event in events]
+
+
+def test_parse_message_from_user():
+    assert parse_message("alice:Général:bonjour: ça va ?", "12:34") == (
+        EVENT_LINE, "Général", "12:34 - alice: bonjour: ça va ?"
+    )
+
+
+# Un message du serveur va à tous les canaux, un message "canal:message" à un seul
+def test_parse_message_from_server():
+    assert parse_message("Server:maintenance", "12:34") == (EVENT_LINE, None, "12:34 - Server: maintenance")
+    assert parse_message("Blabla:bienvenue", "12:34") == (EVENT_LINE, "Blabla", "12:34 - Server: bienvenue")
+
+
+def test_parse_message_invalid():
+    assert parse_message("sans séparateur", "12:34") is None
+
+
+def test_parse_history_line():
+    assert parse_history_line("history 09:15 - bob: Général:salut à tous") == (
+        EVENT_LINE, "Général", "09:15 - bob: salut à tous"
+    )
+    assert parse_history_line("history ligne invalide") is None
+    assert parse_history_line("history 09:15 - bob sans canal") is None
+
+
+# Session encadrée, authentifiée sans réseau
+def framed_session():
+    session = ClientSession("alice", password="secret")
+    hello = session.hello()
+    [(msg_type, payload)] = FrameDecoder().feed(hello)
+    assert msg_type == MSG_HELLO
+    assert decode_hello(payload.decode('utf-8')) == (AUTH_PASSWORD, "alice", "secret")
+    return session
+
+
+def test_framed_auth_then_pending_events():
+    session = framed_session()
+    reply = encode_frame(MSG_AUTH, encode_auth_reply("Alice", "jeton")) + encode_frame(MSG_CHAT, "bob:Général:salut")
+    # La réponse arrive en deux lectures
+    assert session.accept_auth(reply[:3]) == (False, None)
+    assert session.accept_auth(reply[3:]) == (True, None)
+    assert session.username == "Alice"
+    assert session.session_token == "jeton"
+    assert session.password is None
+    assert without_time(session.take_pending()) == [(EVENT_LINE, "Général", "bob: salut")]
+    assert session.take_pending() == []
+
+
+def test_framed_auth_refused():
+    session = framed_session()
+    assert session.accept_auth(encode_frame(MSG_AUTH, encode_auth_reply(error="Mot de passe incorrect"))) == (
+        True, "Mot de passe incorrect"
+    )
+    assert session.session_token is None
+
+
+def test_framed_auth_unexpected_frame():
+    session = framed_session()
+    with pytest.raises(ProtocolError):
+        session.accept_auth(encode_frame(MSG_CHAT, "bob:Général:salut"))
+    with pytest.raises(ConnectionError):
+        session.accept_auth(b"")
+
+
+# Trames coupées à n'importe quel octet : mêmes événements, dans l'ordre
+def test_framed_feed_across_reads():
+    session = framed_session()
+    session.accept_auth(encode_frame(MSG_AUTH, encode_auth_reply("alice", "jeton")))
+    data = (
+        encode_frame(MSG_CHAT, "bob:Général:un")
+        + encode_frame(MSG_HISTORY, encode_history_page("Blabla", 42, ["09:00 - bob: ancien", "09:01 - eve: récent"]))
+        + encode_frame(MSG_NOTICE, "Server:Votre message contient un mot interdit.")
+        + encode_frame(MSG_CHAT, "eve:Blabla:deux")
+    )
+    events = []
+    for i in range(0, len(data), 5):
+        events.extend(session.feed(data[i:i + 5]))
+    assert without_time(events) == [
+        (EVENT_LINE, "Général", "bob: un"),
+        (EVENT_PAGE, "Blabla", 42, ["09:00 - bob: ancien", "09:01 - eve: récent"]),
+        (EVENT_LINE, None, "Server: Votre message contient un mot interdit."),
+        (EVENT_LINE, "Blabla", "eve: deux"),
+    ]
+    assert session.feed(b"") == [(EVENT_CLOSED,)]
+
+
+def test_text_hello_and_encoding():
+    session = ClientSession("alice", protocol=PROTOCOL_TEXT)
+    assert session.hello() == "Username:alice".encode('utf-8')
+    assert not session.awaits_auth()
+    assert session.encode_chat("Général:bonjour") == "Général:bonjour".encode('utf-8')
+    assert session.encode_command("join Blabla") is None
+
+
+# Les lignes d'historique sont reconnues à leur préfixe, le reste de la lecture est un message
+def test_parse_text_history_then_message():
+    session = ClientSession("alice", protocol=PROTOCOL_TEXT)
+    session.hello()
+    data = (
+        "history 09:00 - bob: Général:premier\n"
+        "history 09:01 - eve: Blabla:second\n"
+        "carol:Général:en direct"
+    ).encode('utf-8')
+    assert without_time(session.feed(data)) == [
+        (EVENT_LINE, "Général", "bob: premier"),
+        (EVENT_LINE, "Blabla", "eve: second"),
+        (EVENT_LINE, "Général", "carol: en direct"),
+    ]
+    assert session.text_buffer == ""
+
+
+# Une ligne d'historique sans retour à la ligne final va jusqu'à la fin de la lecture
+def test_parse_text_history_without_newline():
+    session = ClientSession("alice", protocol=PROTOCOL_TEXT)
+    session.hello()
+    assert without_time(session.feed("history 09:00 - bob: Général:été".encode('utf-8'))) == [
+        (EVENT_LINE, "Général", "bob: été"),
+    ]
+    assert session.text_buffer == ""
+
+
+def test_framed_encoding():
+    session = framed_session()
+    [(msg_type, payload)] = FrameDecoder().feed(session.encode_chat("Général:bonjour"))
+    assert (msg_type, payload.decode('utf-8')) == (MSG_CHAT, "Général:bonjour")
+    [(msg_type, payload)] = FrameDecoder().feed(session.encode_command("join Blabla"))
+    assert (msg_type, payload.decode('utf-8')) == (MSG_COMMAND, "join Blabla")
+
+
+# Aller-retour sur une paire de sockets : le test joue le serveur
+def test_chat_client_round_trip():
+    client = ChatClient("alice", password="secret")
+    client.client_socket.close()
+    client.client_socket, server = socket.socketpair()
+    server.settimeout(5)
+    decoder = FrameDecoder()
+    try:
+        client.client_socket.sendall(client.hello())
+        [(msg_type, payload)] = decoder.feed(server.recv(4096))
+        assert msg_type == MSG_HELLO
+        assert decode_hello(payload.decode('utf-8')) == (AUTH_PASSWORD, "alice", "secret")
+
+        server.sendall(encode_frame(MSG_AUTH, encode_auth_reply("alice", "jeton")) + encode_frame(MSG_CHAT, "bob:Général:salut"))
+        done = False
+        while not done:
+            done, error = client.accept_auth(client.client_socket.recv(4096))
+        assert error is None
+        assert without_time(client.receive_events()) == [(EVENT_LINE, "Général", "bob: salut")]
+
+        client.send_message("Général:bonjour")
+        client.join_channel("Blabla")
+        client.request_history("Blabla", 42)
+        frames = []
+        while len(frames) < 3:
+            frames.extend(decoder.feed(server.recv(4096)))
+        assert [(msg_type, payload.decode('utf-8')) for msg_type, payload in frames] == [
+            (MSG_CHAT, "Général:bonjour"),
+            (MSG_COMMAND, "join Blabla"),
+            (MSG_COMMAND, "history 42 Blabla"),
+        ]
+
+        server.sendall(encode_frame(MSG_HISTORY, encode_history_page("Blabla", 0, ["09:00 - bob: ancien"])))
+        server.close()
+        batches = []
+        client.run(batches.append)
+        events = [event for batch in batches for event in batch]
+        assert events == [(EVENT_PAGE, "Blabla", 0, ["09:00 - bob: ancien"]), (EVENT_CLOSED,)]
+    finally:
+        server.close()
+        client.close_connection()
+
+
+# send_messages() reste disponible pour les appelants existants
+def test_send_messages_alias():
+    assert ChatClient.send_messages is ChatClient.send_message
@@ -0,0 +1,122 @@
+import threading
+
+from classes.client_registry import ClientRegistry
+
+
+# Dictionnaire qui refuse d'être parcouru : une recherche par nom ne doit pas passer par tous les clients
+class NoScanDict(dict):
+    def __iter__(self):
+        raise AssertionError("parcours de tous les clients")
+
+    def items(self):
+        raise AssertionError("parcours de tous les clients")
+
+    def values(self):
+        raise AssertionError("parcours de tous les clients")
+
+
+def info(username):
+    return {'username': username, 'channel': "Général"}
+
+
+# Plusieurs sessions sous le même nom, retrouvées sans distinction de casse ni d'accents
+def test_sessions_by_username():
+    registry = ClientRegistry()
+    registry.add("socket-1", info("Éric"))
+    registry.add("socket-2", info("eric"))
+    registry.add("socket-3", info("alice"))
+    assert sorted(registry.sessions("ERIC")) == ["socket-1", "socket-2"]
+    assert registry.sessions("alice") == ("socket-3",)
+    assert registry.sessions("bob") == ()
+    assert len(registry) == 3
+    assert "socket-2" in registry
+    assert registry.get("socket-3")['username'] == "alice"
+
+
+def test_sessions_lookup_does_not_scan_clients():
+    registry = ClientRegistry()
+    for i in range(1000):
+        registry.add(f"socket-{i}", info(f"user{i % 10}"))
+    registry.infos = NoScanDict(registry.infos)
+    assert len(registry.sessions("user7")) == 100
+
+
+def test_remove():
+    registry = ClientRegistry()
+    registry.add("socket-1", info("eric"))
+    registry.add("socket-2", info("Éric"))
+    assert registry.remove("socket-1") == info("eric")
+    assert registry.sessions("eric") == ("socket-2",)
+    assert "socket-1" not in registry
+    registry.remove("socket-2")
+    assert registry.sessions("eric") == ()
+    assert registry.sessions_by_name == {}
+    assert len(registry) == 0
+
+
+# Retirer un client absent, ou déjà retiré, ne change rien
+def test_remove_unknown_client():
+    registry = ClientRegistry()
+    registry.add("socket-1", info("eric"))
+    assert registry.remove("socket-2") is None
+    assert registry.remove("socket-1") is not None
+    assert registry.remove("socket-1") is None
+    assert registry.get("socket-1", "absent") == "absent"
+
+
+# L'instantané est réutilisé tant que le registre ne change pas
+def test_snapshot_is_cached_until_modified():
+    registry = ClientRegistry()
+    registry.add("socket-1", info("eric"))
+    snapshot = registry.snapshot()
+    assert snapshot is registry.snapshot()
+    registry.add("socket-2", info("alice"))
+    assert registry.snapshot() is not snapshot
+    assert dict(registry.snapshot()) == {"socket-1": info("eric"), "socket-2": info("alice")}
+    assert snapshot == (("socket-1", info("eric")),)
+    registry.clear()
+    assert registry.snapshot() == ()
+    assert registry.sessions("eric") == ()
+
+
+# Un parcours de l'instantané reste valide pendant que d'autres threads connectent et déconnectent des clients
+def test_snapshot_is_stable_under_concurrent_changes():
+    registry = ClientRegistry()
+    for i in range(100):
+        registry.add(f"stable-{i}", info(f"stable{i}"))
+    stop = threading.Event()
+    errors = []
+
+    def churn(worker):
+        i = 0
+        while not stop.is_set():
+            client = f"churn-{worker}-{i % 50}"
+            registry.add(client, info(f"churn{worker}"))
+            registry.remove(client)
+            i += 1
+
+    def iterate():
+        try:
+            for _ in range(2000):
+                snapshot = registry.snapshot()
+                clients = [client for client, _ in snapshot]
+                assert len(clients) == len(set(clients))
+                assert sum(client.startswith("stable-") for client in clients) == 100
+                assert [client for client, _ in snapshot] == clients
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=churn, args=(worker,)) for worker in range(4)]
+    readers = [threading.Thread(target=iterate) for _ in range(2)]
+    for thread in threads + readers:
+        thread.start()
+    for reader in readers:
+        reader.join()
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(registry) == 100
+    assert all(registry.sessions(f"churn{worker}") == () for worker in range(4))
+    assert len(registry.snapshot()) == 100
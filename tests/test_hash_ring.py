@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from classes.hash_ring import HashRing
+from classes.message_ids import MessageIdAllocator
+
+NODES = ["node-a", "node-b", "node-c", "node-d"]
+KEYS = [f"canal-{i}" for i in range(2000)] + ["Général", "Blabla", "Comptabilité", "Informatique", "Marketing"]
+
+
+def ownership(ring):
+    return {key: ring.owner(key) for key in KEYS}
+
+
+def test_empty_ring_has_no_owner():
+    assert HashRing().owner("Général") is None
+
+
+# Tous les nœuds calculent le même anneau, quel que soit l'ordre d'ajout
+def test_ownership_is_identical_across_instances():
+    reference = ownership(HashRing(NODES))
+    assert ownership(HashRing(reversed(NODES))) == reference
+    ring = HashRing()
+    for node in sorted(NODES, key=lambda node: node[::-1]):
+        ring.add(node)
+    assert ownership(ring) == reference
+
+
+# Le placement ne dépend pas de PYTHONHASHSEED : un autre processus calcule les mêmes propriétaires
+def test_ownership_is_identical_across_processes():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = (
+        "import json, sys\n"
+        "from classes.hash_ring import HashRing\n"
+        "keys = json.load(sys.stdin)\n"
+        f"ring = HashRing({NODES!r})\n"
+        "json.dump({key: ring.owner(key) for key in keys}, sys.stdout)\n"
+    )
+    results = []
+    for seed in ("1", "2"):
+        output = subprocess.run(
+            [sys.executable, "-c", script], input=json.dumps(KEYS), capture_output=True, text=True,
+            cwd=root, env=dict(os.environ, PYTHONHASHSEED=seed), check=True,
+        ).stdout
+        results.append(json.loads(output))
+    assert results[0] == results[1] == ownership(HashRing(NODES))
+
+
+def test_every_node_owns_keys():
+    owners = set(ownership(HashRing(NODES)).values())
+    assert owners == set(NODES)
+
+
+# Retirer un nœud ne déplace que ses propres clés
+@pytest.mark.parametrize("removed", NODES)
+def test_removing_a_node_moves_only_its_keys(removed):
+    ring = HashRing(NODES)
+    before = ownership(ring)
+    ring.remove(removed)
+    after = ownership(ring)
+    for key in KEYS:
+        if before[key] == removed:
+            assert after[key] != removed
+        else:
+            assert after[key] == before[key]
+    assert ownership(HashRing([node for node in NODES if node != removed])) == after
+
+
+# Ajouter un nœud ne déplace des clés que vers lui
+def test_adding_a_node_moves_keys_only_to_it():
+    ring = HashRing(NODES)
+    before = ownership(ring)
+    ring.add("node-e")
+    after = ownership(ring)
+    moved = [key for key in KEYS if after[key] != before[key]]
+    assert moved
+    assert all(after[key] == "node-e" for key in moved)
+    # Environ un cinquième des clés, loin d'un remaniement complet
+    assert len(moved) < len(KEYS) / 2
+
+
+def test_add_and_remove_are_idempotent():
+    ring = HashRing(NODES)
+    reference = ownership(ring)
+    ring.add("node-a")
+    ring.remove("node-z")
+    assert ownership(ring) == reference
+
+
+def test_allocator_strides_from_its_rank():
+    allocator = MessageIdAllocator(3, step=4)
+    assert [next(allocator) for _ in range(3)] == [3, 7, 11]
+
+
+# observe() passe après l'identifiant observé sans changer le rang du nœud
+@pytest.mark.parametrize("first, step", [(1, 1), (2, 4), (3, 4), (5, 7)])
+@pytest.mark.parametrize("observed", [0, 1, 2, 3, 10, 11, 12, 100, 1001])
+def test_observe_keeps_residue_and_moves_past(first, step, observed):
+    allocator = MessageIdAllocator(first, step=step)
+    next(allocator)
+    before = allocator.next_id
+    allocator.observe(observed)
+    assert allocator.next_id % step == first % step
+    assert allocator.next_id > observed or allocator.next_id == before
+    assert allocator.next_id >= before
+    # Le compteur ne saute pas plus loin que nécessaire
+    assert allocator.next_id - step <= max(observed, before - step)
+    message_id = next(allocator)
+    assert message_id > observed
+    assert message_id % step == first % step
+
+
+def test_observe_older_id_changes_nothing():
+    allocator = MessageIdAllocator(10, step=4)
+    allocator.observe(9)
+    allocator.observe(2)
+    assert allocator.next_id == 10
+
+
+# Deux nœuds qui s'observent mutuellement n'attribuent jamais le même identifiant
+def test_allocators_never_collide_after_observe():
+    first, second = MessageIdAllocator(1, step=2), MessageIdAllocator(2, step=2)
+    seen = set()
+    for i in range(200):
+        allocator, other = (first, second) if i % 3 else (second, first)
+        message_id = next(allocator)
+        assert message_id not in seen
+        seen.add(message_id)
+        other.observe(message_id)
+    assert {message_id % 2 for message_id in seen} == {0, 1}
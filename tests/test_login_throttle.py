@@ -0,0 +1,104 @@
+import pytest
+
+from classes.login_throttle import NegativeCache, RateLimiter
+from tests.fake_clock import FakeClock
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(now=100.0)
+
+
+# La rafale est accordée d'un coup, puis le seau est vide
+def test_burst_then_refused(clock):
+    limiter = RateLimiter(rate=1.0, burst=3, clock=clock)
+    assert [limiter.allow("10.0.0.1") for _ in range(4)] == [True, True, True, False]
+    assert limiter.stats() == {'keys': 1, 'allowed': 3, 'refused': 1}
+
+
+# Le seau se remplit de `rate` jetons par seconde
+def test_refill_at_rate(clock):
+    limiter = RateLimiter(rate=0.5, burst=2, clock=clock)
+    limiter.allow("alice")
+    limiter.allow("alice")
+    clock.advance(1.9)
+    assert not limiter.allow("alice")
+    clock.advance(0.1)
+    assert limiter.allow("alice")
+    assert not limiter.allow("alice")
+
+
+# Une tentative refusée ne consomme rien : le remplissage n'est pas retardé
+def test_refused_attempts_do_not_delay_refill(clock):
+    limiter = RateLimiter(rate=1.0, burst=1, clock=clock)
+    limiter.allow("alice")
+    for _ in range(4):
+        clock.advance(0.125)
+        assert not limiter.allow("alice")
+    clock.advance(0.5)
+    assert limiter.allow("alice")
+
+
+# Le seau ne dépasse jamais sa capacité, même après une longue inactivité
+def test_refill_is_capped_at_burst(clock):
+    limiter = RateLimiter(rate=10.0, burst=2, clock=clock)
+    limiter.allow("alice")
+    clock.advance(3600)
+    assert [limiter.allow("alice") for _ in range(3)] == [True, True, False]
+
+
+def test_keys_are_independent(clock):
+    limiter = RateLimiter(rate=1.0, burst=1, clock=clock)
+    assert limiter.allow("alice")
+    assert not limiter.allow("alice")
+    assert limiter.allow("bob")
+
+
+# Au-delà de max_keys, la clé la moins récemment utilisée est oubliée et repart pleine
+def test_least_recent_key_is_evicted(clock):
+    limiter = RateLimiter(rate=0.0, burst=1, max_keys=2, clock=clock)
+    limiter.allow("a")
+    limiter.allow("b")
+    # "a" redevient la plus récente
+    assert not limiter.allow("a")
+    limiter.allow("c")
+    assert set(limiter.buckets) == {"a", "c"}
+    assert limiter.allow("b")
+
+
+def test_negative_cache_entry_expires_after_ttl(clock):
+    cache = NegativeCache(ttl=30.0, clock=clock)
+    cache.add("Fantôme")
+    clock.advance(30.0)
+    assert "Fantôme" in cache
+    clock.advance(0.1)
+    assert "Fantôme" not in cache
+    # L'entrée expirée est retirée à la lecture
+    assert cache.stats() == {'entries': 0, 'hits': 1}
+
+
+# Les noms sont comparés comme dans MySQL : insensibles à la casse et aux accents
+def test_negative_cache_normalizes_names(clock):
+    cache = NegativeCache(clock=clock)
+    cache.add("Éric")
+    assert "eric" in cache
+    assert "ERIC" in cache
+    assert "erica" not in cache
+
+
+# Un nouvel échec prolonge l'entrée
+def test_negative_cache_add_refreshes_ttl(clock):
+    cache = NegativeCache(ttl=10.0, clock=clock)
+    cache.add("alice")
+    clock.advance(8.0)
+    cache.add("alice")
+    clock.advance(8.0)
+    assert "alice" in cache
+
+
+def test_negative_cache_is_bounded(clock):
+    cache = NegativeCache(max_size=2, clock=clock)
+    for name in ("a", "b", "c"):
+        cache.add(name)
+    assert "a" not in cache
+    assert "b" in cache and "c" in cache
@@ -0,0 +1,114 @@
+import pytest
+
+from classes.moderation import (
+    ProfanityFilter, fold_text, merge_spans, load_word_lists, ACTION_DROP, ACTION_FLAG, ACTION_MASK,
+)
+
+WORDS = ["connard", "con", "scheiße", "笨蛋", "fils de pute"]
+
+
+@pytest.fixture
+def profanity_filter():
+    return ProfanityFilter(WORDS)
+
+
+# Cas courant : un caractère pour un caractère, positions inchangées
+def test_fold_text_one_to_one():
+    assert fold_text("Élève C0nn4rd") == ("eleve connard", None)
+
+
+# Un caractère qui s'étend ou des espaces répétés imposent de garder les positions d'origine
+def test_fold_text_keeps_origins():
+    assert fold_text("Straße") == ("strasse", [0, 1, 2, 3, 4, 4, 5])
+    assert fold_text("a  \tb") == ("a b", [0, 1, 4])
+
+
+def test_merge_spans():
+    assert merge_spans([]) == []
+    assert merge_spans([(5, 8), (0, 3), (2, 4), (8, 10), (12, 13)]) == [(0, 4), (5, 10), (12, 13)]
+    assert merge_spans([(0, 10), (2, 4)]) == [(0, 10)]
+
+
+def test_leetspeak(profanity_filter):
+    assert profanity_filter.find("espèce de c0nn4rd") == [(10, 17)]
+    assert profanity_filter.mask("espèce de c0nn4rd !") == "espèce de ******* !"
+
+
+# Les listes livrées reconnaissent aussi le leetspeak
+def test_leetspeak_with_shipped_list():
+    assert ProfanityFilter(load_word_lists(["fr"])).mask("quel c0nn4rd") == "quel *******"
+
+
+def test_accents_and_case(profanity_filter):
+    assert profanity_filter.mask("CONNARD, Connard et cönnärd") == "*******, ******* et *******"
+
+
+# Un mot d'une écriture à espaces doit être entier
+def test_word_boundaries(profanity_filter):
+    assert profanity_filter.find("Constantin est second") == []
+    assert profanity_filter.find("connards") == []
+    assert profanity_filter.mask("con!") == "***!"
+
+
+# Le chinois n'a pas d'espaces : le mot est reconnu au milieu du texte
+def test_cjk_infix(profanity_filter):
+    assert profanity_filter.mask("你是笨蛋吗") == "你是**吗"
+
+
+# ß devient ss : le masque porte sur les caractères d'origine
+def test_mask_offsets_when_folding_expands(profanity_filter):
+    text = "Straße, Scheiße, connard"
+    assert profanity_filter.find(text) == [(8, 15), (17, 24)]
+    assert profanity_filter.mask(text) == "Straße, *******, *******"
+
+
+# Les espaces répétés d'une expression sont masqués avec elle
+def test_repeated_spaces(profanity_filter):
+    assert profanity_filter.mask("fils  de\tpute !") == "************* !"
+
+
+def test_stats(profanity_filter):
+    profanity_filter.find("bonjour")
+    profanity_filter.find("connard")
+    stats = profanity_filter.stats()
+    assert stats['patterns'] == len(WORDS)
+    assert stats['scanned'] == 2
+    assert stats['scanned_bytes'] == len("bonjourconnard")
+    assert stats['matched'] == 1
+
+
+# Politique de modération du serveur, sans base de données ni connexion
+class ModerationServer:
+    def __init__(self, moderation):
+        server = pytest.importorskip("server")
+        self.notices = []
+        self.backend = server.ServerBackend.__new__(server.ServerBackend)
+        self.backend.moderation = moderation
+        self.backend.profanity_filter = ProfanityFilter(WORDS)
+        self.backend.send_message_to_client = lambda client_socket, message, msg_type: self.notices.append(message)
+
+    def moderate(self, message):
+        return self.backend.moderate_message(None, "alice", "Général", message)
+
+
+def test_mask_mode():
+    server = ModerationServer(ACTION_MASK)
+    assert server.moderate("salut connard") == "salut *******"
+    assert server.moderate("salut Constantin") == "salut Constantin"
+    assert server.notices == []
+
+
+# Le message est refusé et l'expéditeur prévenu
+def test_drop_mode():
+    server = ModerationServer(ACTION_DROP)
+    assert server.moderate("salut connard") is None
+    assert server.moderate("salut") == "salut"
+    assert server.notices == ["Server:Votre message contient un mot interdit."]
+
+
+# Le message est diffusé tel quel et signalé dans le journal
+def test_flag_mode(capsys):
+    server = ModerationServer(ACTION_FLAG)
+    assert server.moderate("salut connard") == "salut connard"
+    assert "Message signalé de alice" in capsys.readouterr().out
+    assert server.notices == []
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from classes.outbound_queue import POLICY_BLOCK, POLICY_DISCONNECT, POLICY_DROP_OLDEST, OutboundQueue
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        OutboundQueue(policy="ignore")
+
+
+def test_messages_are_taken_in_order():
+    queue = OutboundQueue(maxsize=10)
+    for i in range(5):
+        assert queue.put(i)
+    assert queue.take() == [0, 1, 2, 3, 4]
+    assert queue.take() == []
+    assert queue.stats() == {'depth': 0, 'max_depth': 5, 'queued': 5, 'dropped': 0}
+
+
+# drop_oldest : la file garde les messages les plus récents
+def test_drop_oldest_policy():
+    queue = OutboundQueue(policy=POLICY_DROP_OLDEST, maxsize=3)
+    for i in range(5):
+        assert queue.put(i)
+    assert queue.take() == [2, 3, 4]
+    assert queue.stats()['dropped'] == 2
+    assert not queue.closed
+
+
+# disconnect : le dépôt au-delà de la limite ferme la file et abandonne les messages en attente
+def test_disconnect_policy():
+    queue = OutboundQueue(policy=POLICY_DISCONNECT, maxsize=3)
+    for i in range(3):
+        assert queue.put(i)
+    assert queue.congested()
+    assert not queue.put(3)
+    assert queue.closed
+    assert queue.take() == []
+    assert not queue.put(4)
+
+
+# block : l'expéditeur attend que l'écrivain libère de la place
+def test_block_policy_waits_for_room():
+    queue = OutboundQueue(policy=POLICY_BLOCK, maxsize=2, block_timeout=5.0)
+    queue.put(0)
+    queue.put(1)
+    results = []
+    sender = threading.Thread(target=lambda: results.append(queue.put(2)))
+    sender.start()
+    sender.join(0.1)
+    # L'expéditeur est bloqué tant que la file est pleine
+    assert sender.is_alive()
+    assert queue.take() == [0, 1]
+    sender.join(5.0)
+    assert results == [True]
+    assert queue.take() == [2]
+
+
+# block : au-delà du délai, le client est déconnecté
+def test_block_policy_times_out():
+    queue = OutboundQueue(policy=POLICY_BLOCK, maxsize=1, block_timeout=0.05)
+    queue.put(0)
+    assert not queue.put(1)
+    assert queue.closed
+
+
+# block : la fermeture de la file libère un expéditeur bloqué
+def test_block_policy_released_by_close():
+    queue = OutboundQueue(policy=POLICY_BLOCK, maxsize=1, block_timeout=5.0)
+    queue.put(0)
+    results = []
+    sender = threading.Thread(target=lambda: results.append(queue.put(1)))
+    sender.start()
+    sender.join(0.1)
+    queue.close()
+    sender.join(5.0)
+    assert results == [False]
+
+
+# block sans attente : le message est accepté au-delà de la limite
+def test_block_policy_non_blocking_put_overflows():
+    queue = OutboundQueue(policy=POLICY_BLOCK, maxsize=1)
+    assert queue.put(0)
+    assert queue.put(1, block=False)
+    assert queue.congested()
+    assert queue.take() == [0, 1]
+
+
+def test_get_waits_for_messages():
+    queue = OutboundQueue()
+    results = []
+    writer = threading.Thread(target=lambda: results.append(queue.get()))
+    writer.start()
+    writer.join(0.05)
+    assert writer.is_alive()
+    queue.put(b"x")
+    writer.join(5.0)
+    assert results == [[b"x"]]
+
+
+def test_close_wakes_writer_and_calls_on_ready():
+    ready = []
+    queue = OutboundQueue(on_ready=lambda: ready.append(True))
+    queue.put(b"x")
+    assert ready == [True]
+    writer = threading.Thread(target=lambda: ready.append(queue.get()))
+    queue.take()
+    writer.start()
+    queue.close()
+    writer.join(5.0)
+    assert ready.count(True) == 2
+    assert [] in ready
@@ -0,0 +1,154 @@
+import pytest
+
+from classes.protocol import (
+    HEADER, MAX_FRAME_SIZE, MSG_CHAT, MSG_HELLO, MSG_HISTORY, MSG_NOTICE, PROTOCOL_FRAMED, PROTOCOL_TEXT,
+    PROTOCOL_VERSION, FrameDecoder, ProtocolError, decode_hello, decode_history_page, detect_protocol,
+    encode_frame, encode_hello, encode_history_page, encode_message, AUTH_PASSWORD, AUTH_TOKEN, AUTH_NONE,
+)
+
+
+# Trames de test, l'une avec des caractères multi-octets
+def sample_frames():
+    return [
+        encode_frame(MSG_HELLO, encode_hello("alice", "secret")),
+        encode_frame(MSG_CHAT, "Général:bonjour à tous"),
+        encode_frame(MSG_NOTICE, ""),
+        encode_frame(MSG_HISTORY, encode_history_page("Blabla", 42, ["12:00 - bob: salut"])),
+    ]
+
+
+EXPECTED = [
+    (MSG_HELLO, "password\talice\tsecret".encode('utf-8')),
+    (MSG_CHAT, "Général:bonjour à tous".encode('utf-8')),
+    (MSG_NOTICE, b""),
+    (MSG_HISTORY, "Blabla\t42\n12:00 - bob: salut".encode('utf-8')),
+]
+
+
+def test_encode_frame_header():
+    frame = encode_frame(MSG_CHAT, "é")
+    assert HEADER.unpack_from(frame) == (PROTOCOL_VERSION, MSG_CHAT, 2)
+    assert frame[HEADER.size:] == "é".encode('utf-8')
+
+
+def test_encode_frame_rejects_oversized_payload():
+    with pytest.raises(ProtocolError):
+        encode_frame(MSG_CHAT, b"x" * (MAX_FRAME_SIZE + 1))
+
+
+def test_single_frame_in_one_read():
+    decoder = FrameDecoder()
+    assert decoder.feed(sample_frames()[1]) == [EXPECTED[1]]
+    assert decoder.buffer == bytearray()
+
+
+# Lectures partielles : en-tête coupé, puis charge utile coupée
+@pytest.mark.parametrize("cut", [1, HEADER.size - 1, HEADER.size, HEADER.size + 3])
+def test_partial_read_waits_for_the_rest(cut):
+    frame = sample_frames()[1]
+    decoder = FrameDecoder()
+    assert decoder.feed(frame[:cut]) == []
+    assert decoder.feed(frame[cut:]) == [EXPECTED[1]]
+    assert decoder.buffer == bytearray()
+
+
+# Une trame reçue octet par octet n'est retournée qu'une fois complète
+def test_frame_split_across_many_reads():
+    frame = sample_frames()[3]
+    decoder = FrameDecoder()
+    received = []
+    for i in range(len(frame)):
+        received.extend(decoder.feed(frame[i:i + 1]))
+        if i < len(frame) - 1:
+            assert received == []
+    assert received == [EXPECTED[3]]
+
+
+def test_coalesced_frames_in_one_read():
+    decoder = FrameDecoder()
+    assert decoder.feed(b"".join(sample_frames())) == EXPECTED
+    assert decoder.buffer == bytearray()
+
+
+# Plusieurs trames découpées à des positions arbitraires, indépendantes des limites des trames
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 7, 13, 64])
+def test_stream_in_arbitrary_chunks(chunk_size):
+    stream = b"".join(sample_frames()) * 3
+    decoder = FrameDecoder()
+    received = []
+    for i in range(0, len(stream), chunk_size):
+        received.extend(decoder.feed(stream[i:i + chunk_size]))
+    assert received == EXPECTED * 3
+    assert decoder.buffer == bytearray()
+
+
+# Les octets d'une trame incomplète restent en attente après les trames complètes
+def test_complete_frames_then_partial_tail():
+    frames = sample_frames()
+    decoder = FrameDecoder()
+    assert decoder.feed(frames[0] + frames[1][:4]) == [EXPECTED[0]]
+    assert bytes(decoder.buffer) == frames[1][:4]
+    assert decoder.feed(frames[1][4:]) == [EXPECTED[1]]
+
+
+def test_over_length_header_is_rejected_before_payload():
+    decoder = FrameDecoder(max_frame_size=16)
+    with pytest.raises(ProtocolError):
+        decoder.feed(HEADER.pack(PROTOCOL_VERSION, MSG_CHAT, 17))
+
+
+def test_default_limit_rejects_header_above_max_frame_size():
+    with pytest.raises(ProtocolError):
+        FrameDecoder().feed(HEADER.pack(PROTOCOL_VERSION, MSG_CHAT, MAX_FRAME_SIZE + 1))
+
+
+def test_frame_at_limit_is_accepted():
+    decoder = FrameDecoder(max_frame_size=16)
+    assert decoder.feed(encode_frame(MSG_CHAT, b"x" * 16)) == [(MSG_CHAT, b"x" * 16)]
+
+
+def test_unknown_version_is_rejected():
+    with pytest.raises(ProtocolError):
+        FrameDecoder().feed(HEADER.pack(PROTOCOL_VERSION + 1, MSG_CHAT, 0))
+
+
+def test_unknown_type_is_rejected():
+    with pytest.raises(ProtocolError):
+        FrameDecoder().feed(HEADER.pack(PROTOCOL_VERSION, 200, 0))
+
+
+# Une trame invalide après une trame valide est détectée dans la même lecture
+def test_invalid_frame_after_valid_one():
+    data = sample_frames()[1] + HEADER.pack(PROTOCOL_VERSION + 1, MSG_CHAT, 0)
+    with pytest.raises(ProtocolError):
+        FrameDecoder().feed(data)
+
+
+# Le premier octet d'une connexion choisit entre le protocole encadré et le mode texte
+def test_detect_framed_connection():
+    assert detect_protocol(sample_frames()[0]) == PROTOCOL_FRAMED
+    assert detect_protocol(sample_frames()[0][:1]) == PROTOCOL_FRAMED
+
+
+@pytest.mark.parametrize("data", [b"Username:alice", b"U", b"", "Général:salut".encode('utf-8')])
+def test_detect_text_connection(data):
+    assert detect_protocol(data) == PROTOCOL_TEXT
+
+
+def test_encode_message_by_protocol():
+    assert encode_message(PROTOCOL_TEXT, MSG_CHAT, "Général:salut") == "Général:salut".encode('utf-8')
+    assert encode_message(PROTOCOL_FRAMED, MSG_CHAT, "Général:salut") == encode_frame(MSG_CHAT, "Général:salut")
+
+
+def test_hello_round_trip():
+    assert decode_hello(encode_hello("alice", "mot\tde passe")) == (AUTH_PASSWORD, "alice", "mot\tde passe")
+    assert decode_hello(encode_hello("alice", token="abc.def")) == (AUTH_TOKEN, "abc.def", None)
+    assert decode_hello(encode_hello("alice")) == (AUTH_NONE, "alice", None)
+
+
+def test_history_page_round_trip():
+    lines = ["12:00 - bob: salut", "12:01 - alice: re"]
+    assert decode_history_page(encode_history_page("Général", 7, lines)) == ("Général", 7, lines)
+    assert decode_history_page(encode_history_page("Général", 0, [])) == ("Général", 0, [])
+    with pytest.raises(ProtocolError):
+        decode_history_page("Général\tabc")
@@ -0,0 +1,97 @@
+import pytest
+
+from classes.outbound_queue import MAX_IOV, send_buffers
+
+
+class FakeSocket:
+    """
+    Socket qui n'accepte qu'un nombre limité d'octets par appel à sendmsg.
+    """
+    def __init__(self, per_call):
+        self.per_call = per_call
+        self.received = bytearray()
+        self.calls = 0
+
+    def sendmsg(self, buffers):
+        assert len(buffers) <= MAX_IOV
+        self.calls += 1
+        budget = self.per_call
+        for buffer in buffers:
+            if not budget:
+                break
+            taken = bytes(buffer[:budget])
+            self.received += taken
+            budget -= len(taken)
+        return self.per_call - budget
+
+
+class FakeSocketWithoutSendmsg:
+    """
+    Socket sans sendmsg, comme sous Windows.
+    """
+    def __init__(self):
+        self.received = bytearray()
+
+    def sendall(self, data):
+        self.received += data
+
+
+def sample_buffers():
+    return [b"alpha", memoryview(b"beta-gamma"), b"", bytes(range(256)) * 3, b"z"]
+
+
+# Envois partiels de toutes les tailles : aucun octet perdu, dupliqué ou réordonné
+@pytest.mark.parametrize("per_call", [1, 2, 3, 5, 7, 64, 1000, 10000])
+def test_send_buffers_with_partial_sends(per_call):
+    buffers = sample_buffers()
+    sock = FakeSocket(per_call)
+    send_buffers(sock, buffers)
+    assert bytes(sock.received) == b"".join(bytes(buffer) for buffer in buffers)
+
+
+# Un envoi partiel qui s'arrête exactement à la fin d'un tampon
+def test_send_buffers_partial_send_on_buffer_boundary():
+    sock = FakeSocket(5)
+    send_buffers(sock, [b"12345", b"67890", b"abc"])
+    assert bytes(sock.received) == b"1234567890abc"
+    assert sock.calls == 3
+
+
+# Les tampons partagés entre plusieurs files ne sont pas modifiés par un envoi partiel
+def test_send_buffers_does_not_alter_shared_buffers():
+    data = "message diffusé".encode('utf-8')
+    shared = memoryview(data)
+    buffers = [shared, shared]
+    send_buffers(FakeSocket(4), buffers)
+    assert buffers[0] is shared and buffers[1] is shared
+    assert bytes(shared) == data
+
+
+# Plus de tampons que MAX_IOV : plusieurs appels à sendmsg, dans l'ordre
+def test_send_buffers_more_than_max_iov():
+    buffers = [str(i).encode() + b";" for i in range(MAX_IOV * 2 + 10)]
+    sock = FakeSocket(1 << 20)
+    send_buffers(sock, buffers)
+    assert bytes(sock.received) == b"".join(buffers)
+    assert sock.calls == 3
+
+
+def test_send_buffers_more_than_max_iov_with_partial_sends():
+    buffers = [str(i).encode() + b";" for i in range(MAX_IOV + 50)]
+    sock = FakeSocket(333)
+    send_buffers(sock, buffers)
+    assert bytes(sock.received) == b"".join(buffers)
+
+
+def test_send_buffers_without_sendmsg_concatenates():
+    buffers = sample_buffers()
+    sock = FakeSocketWithoutSendmsg()
+    expected = b"".join(bytes(buffer) for buffer in buffers)
+    send_buffers(sock, buffers)
+    assert bytes(sock.received) == expected
+
+
+def test_send_buffers_empty_list():
+    sock = FakeSocket(10)
+    send_buffers(sock, [])
+    assert sock.calls == 0
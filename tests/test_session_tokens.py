@@ -0,0 +1,98 @@
+import pytest
+
+from classes.session_tokens import SessionTokens, b64decode, b64encode
+from tests.fake_clock import FakeClock
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def tokens(clock):
+    return SessionTokens("secret", ttl=3600, clock=clock)
+
+
+def test_issued_token_is_accepted(tokens):
+    token = tokens.issue("Alice", ("Général", "Blabla"))
+    assert tokens.verify(token) == ("Alice", ("Général", "Blabla"))
+    assert tokens.stats() == {'issued': 1, 'accepted': 1, 'rejected': 0, 'revoked': 0}
+
+
+def test_token_without_channels(tokens):
+    assert tokens.verify(tokens.issue("Alice")) == ("Alice", ())
+
+
+# Un jeton signé par un processus est accepté par un autre qui partage le secret
+def test_token_accepted_with_same_secret_only(tokens, clock):
+    token = tokens.issue("Alice")
+    assert SessionTokens("secret", clock=clock).verify(token) == ("Alice", ())
+    assert SessionTokens("autre secret", clock=clock).verify(token) is None
+    assert SessionTokens(clock=clock).verify(token) is None
+
+
+def test_token_expires_after_ttl(tokens, clock):
+    token = tokens.issue("Alice")
+    clock.advance(3599)
+    assert tokens.verify(token) is not None
+    clock.advance(2)
+    assert tokens.verify(token) is None
+    assert tokens.stats()['rejected'] == 1
+
+
+# Toute modification des données ou de la signature invalide le jeton
+def test_tampered_data_is_rejected(tokens):
+    token = tokens.issue("Alice", ("Général",))
+    encoded_data, _, encoded_signature = token.partition(".")
+    data = b64decode(encoded_data)
+    for forged in (data.replace(b"Alice", b"Admin"),
+                   data.replace("Général".encode('utf-8'), "Général,Comptabilité".encode('utf-8')),
+                   # Date d'expiration repoussée
+                   data.replace(b"\n17", b"\n27", 1)):
+        assert forged != data
+        assert tokens.verify(f"{b64encode(forged)}.{encoded_signature}") is None
+
+
+def test_tampered_signature_is_rejected(tokens):
+    token = tokens.issue("Alice")
+    encoded_data, _, encoded_signature = token.partition(".")
+    signature = bytearray(b64decode(encoded_signature))
+    signature[0] ^= 1
+    assert tokens.verify(f"{encoded_data}.{b64encode(bytes(signature))}") is None
+    assert tokens.verify(f"{encoded_data}.") is None
+    assert tokens.verify(encoded_data) is None
+
+
+@pytest.mark.parametrize("token", ["", ".", "n'importe quoi", "abc.déf", "!!!.???"])
+def test_malformed_token_is_rejected(tokens, token):
+    assert tokens.verify(token) is None
+
+
+# La révocation refuse les jetons déjà émis, mais pas ceux émis ensuite
+def test_revocation(tokens, clock):
+    token = tokens.issue("Alice")
+    other = tokens.issue("Bob")
+    clock.advance(10)
+    tokens.revoke("Alice")
+    assert tokens.verify(token) is None
+    assert tokens.verify(other) == ("Bob", ())
+    clock.advance(1)
+    assert tokens.verify(tokens.issue("Alice")) == ("Alice", ())
+
+
+# La révocation suit la collation de MySQL : insensible à la casse et aux accents
+def test_revocation_ignores_case_and_accents(tokens, clock):
+    token = tokens.issue("Éric")
+    clock.advance(1)
+    tokens.revoke("eric")
+    assert tokens.verify(token) is None
+
+
+# Une révocation plus ancienne que la durée de validité est oubliée à la révocation suivante
+def test_old_revocations_are_forgotten(tokens, clock):
+    tokens.revoke("Alice")
+    clock.advance(3601)
+    tokens.revoke("Bob")
+    assert tokens.stats()['revoked'] == 1
+    assert "alice" not in tokens.revoked_before